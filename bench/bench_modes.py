@@ -0,0 +1,81 @@
+"""
+Сравнение памяти и CPU на один контекст браузера в разных режимах.
+
+Запуск (из корня проекта):
+    python -m bench.bench_modes --contexts 5 --url https://www.wildberries.ru
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import psutil
+from playwright.async_api import async_playwright
+
+from core.modes import ExecutionMode, launch_options, context_options
+
+
+def _tree_usage() -> tuple[int, float]:
+    """RSS (байт) и суммарное CPU-время (сек) всех дочерних процессов бенчмарка."""
+    rss = 0
+    cpu = 0.0
+    for child in psutil.Process(os.getpid()).children(recursive=True):
+        try:
+            rss += child.memory_info().rss
+            t = child.cpu_times()
+            cpu += t.user + t.system
+        except psutil.Error:
+            pass
+    return rss, cpu
+
+
+async def bench_mode(mode: ExecutionMode, contexts: int, url: str, hold: float) -> dict:
+    async with async_playwright() as p:
+        base_rss, base_cpu = _tree_usage()
+        started = time.perf_counter()
+
+        browser = await p.chromium.launch(channel="chrome", **launch_options(mode))
+        opened = []
+        for _ in range(contexts):
+            context = await browser.new_context(**context_options(mode))
+            page = await context.new_page()
+            await page.goto(url, wait_until="domcontentloaded")
+            opened.append(context)
+
+        launch_time = time.perf_counter() - started
+
+        # даём страницам «пожить», чтобы увидеть фоновую нагрузку рендера
+        cpu_before = _tree_usage()[1]
+        await asyncio.sleep(hold)
+        rss, cpu_after = _tree_usage()
+
+        for context in opened:
+            await context.close()
+        await browser.close()
+
+    return {
+        "mode": mode.value,
+        "launch_s": launch_time,
+        "rss_per_context_mb": (rss - base_rss) / contexts / 1024 / 1024,
+        "cpu_idle_pct_per_context": (cpu_after - cpu_before) / hold / contexts * 100,
+        "cpu_total_s": cpu_after - base_cpu,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк режимов браузера")
+    parser.add_argument("--contexts", type=int, default=5)
+    parser.add_argument("--url", default="https://www.wildberries.ru")
+    parser.add_argument("--hold", type=float, default=10.0, help="секунд простоя для замера CPU")
+    parser.add_argument("--modes", nargs="*", default=[m.value for m in ExecutionMode])
+    args = parser.parse_args()
+
+    print(f"{'режим':<10} {'запуск, с':>10} {'RSS/ктx, МБ':>12} {'CPU/ктx, %':>11} {'CPU всего, с':>13}")
+    for name in args.modes:
+        r = await bench_mode(ExecutionMode(name), args.contexts, args.url, args.hold)
+        print(f"{r['mode']:<10} {r['launch_s']:>10.2f} {r['rss_per_context_mb']:>12.1f} "
+              f"{r['cpu_idle_pct_per_context']:>11.1f} {r['cpu_total_s']:>13.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
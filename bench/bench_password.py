@@ -0,0 +1,52 @@
+"""
+Подбор рабочего фактора scrypt для паролей (core/credentials.py).
+
+Запуск (из корня проекта):
+    python -m bench.bench_password --target-ms 100
+"""
+import argparse
+import statistics
+import time
+
+from core.credentials import hash_password, verify_password, scrypt_params
+
+
+def measure(n: int, r: int, p: int, rounds: int) -> float:
+    """Медианное время проверки пароля, мс."""
+    stored = hash_password("benchmark-password", n=n, r=r, p=p)
+    times = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        verify_password("benchmark-password", stored)
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк хэширования паролей")
+    parser.add_argument("--target-ms", type=float, default=100.0, help="допустимая задержка входа")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-log-n", type=int, default=12)
+    parser.add_argument("--max-log-n", type=int, default=18)
+    args = parser.parse_args()
+
+    scrypt_n, scrypt_r, scrypt_p = scrypt_params()
+    print(f"текущие параметры: N=2^{scrypt_n.bit_length() - 1}, r={scrypt_r}, p={scrypt_p}")
+    print(f"{'N':>8} {'память, МБ':>11} {'проверка, мс':>13}")
+
+    best = None
+    for log_n in range(args.min_log_n, args.max_log_n + 1):
+        n = 2 ** log_n
+        ms = measure(n, scrypt_r, scrypt_p, args.rounds)
+        print(f"{'2^' + str(log_n):>8} {128 * n * scrypt_r / 1024 / 1024:>11.0f} {ms:>13.1f}")
+        if ms <= args.target_ms:
+            best = log_n
+
+    if best is None:
+        print(f"ни один вариант не укладывается в {args.target_ms:.0f} мс")
+    else:
+        print(f"рекомендуется \"password_scrypt_n\": {2 ** best} в templates/config.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Скорость таблицы аккаунтов главного окна на синтетических данных (Qt offscreen).
+
+Замеряются fill_table, filter_table, on_header_checkbox_clicked и пересчёт
+tri-state заголовка в on_row_checkbox_changed. Аккаунты кладутся в локальный
+снимок SQLite (AccountSnapshot во временном каталоге) — PostgreSQL не нужен.
+
+Результаты сравниваются с bench/baselines/table.json: медиана хуже базовой
+больше чем в --tolerance раз — код возврата 1. Без базового значения для
+какого-либо замера — тоже код возврата 1 (кроме запуска с --update-baseline).
+
+Запуск (из корня проекта):
+    python -m bench.bench_table --sizes 1000 10000 50000
+    python -m bench.bench_table --update-baseline   # записать текущие значения как базовые
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import Qt, QCoreApplication, QEvent
+from PySide6.QtWidgets import QApplication
+
+import core.account_snapshot as account_snapshot
+from core.account_snapshot import AccountSnapshot
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "table.json"
+
+STATUSES = ("enable", "disable", None)
+
+
+def synthetic_accounts(count: int) -> list[tuple]:
+    """(phone, comment, status, updated_at) — как их кладёт в снимок синхронизация."""
+    return [
+        (f"9{i:09d}", f"партия {i // 100}" if i % 3 else None, STATUSES[i % len(STATUSES)], None)
+        for i in range(count)
+    ]
+
+
+def flush_deleted():
+    """Удалить виджеты прошлого заполнения (deleteLater), чтобы замеры не копили память."""
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    QApplication.processEvents()
+
+
+def median_time(func, rounds: int, prepare=None) -> float:
+    times = []
+    for _ in range(rounds):
+        if prepare:
+            prepare()
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def bench_size(window, snapshot: AccountSnapshot, size: int, rounds: int) -> dict:
+    scope, _login = window._snapshot_scope()
+    snapshot.clear(scope)
+    snapshot.apply(scope, synthetic_accounts(size), set(), None)
+    rows = [(phone, comment, status, None, None) for phone, comment, status in snapshot.rows(scope)]
+
+    def clear_table():
+        window.table.setRowCount(0)
+        flush_deleted()
+
+    results = {"fill_table": median_time(lambda: window.fill_table(rows), rounds, prepare=clear_table)}
+    QApplication.processEvents()
+
+    # поиск по части номера, затем сброс фильтра — оба прохода по всем строкам
+    results["filter_table"] = median_time(lambda: window.filter_table("900 000"), rounds,
+                                          prepare=lambda: window.filter_table(""))
+    results["filter_table_clear"] = median_time(lambda: window.filter_table(""), rounds,
+                                                prepare=lambda: window.filter_table("900 000"))
+
+    results["header_check_all"] = median_time(lambda: window.on_header_checkbox_clicked(Qt.Checked), rounds,
+                                              prepare=lambda: window.on_header_checkbox_clicked(Qt.Unchecked))
+
+    # первая строка видна в окне — indexAt() по позиции её контейнера находит строку
+    window.on_header_checkbox_clicked(Qt.Unchecked)
+    checkbox = window._row_checkbox(0)
+
+    def toggle_row():
+        checkbox.blockSignals(True)
+        checkbox.setChecked(not checkbox.isChecked())
+        checkbox.blockSignals(False)
+
+    results["row_check_tristate"] = median_time(lambda: window.on_row_checkbox_changed(checkbox), rounds,
+                                                prepare=toggle_row)
+
+    clear_table()
+    snapshot.clear(scope)
+    return results
+
+
+def load_baseline(path: Path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baseline(path: Path, results: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4, ensure_ascii=False, sort_keys=True)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк таблицы аккаунтов")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 10000, 50000])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=1.5, help="во сколько раз можно быть медленнее базовой")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # окно берёт снимок через get_account_snapshot() — подменяем его временным
+        snapshot = AccountSnapshot(Path(tmp) / "accounts_snapshot.sqlite3")
+        account_snapshot._snapshot = snapshot
+
+        from gui.main_window import MainWindow
+
+        window = MainWindow(SimpleNamespace(login="bench", is_admin=False), defer_sync=True)
+        window.show()
+        app.processEvents()
+
+        results = {}
+        for size in args.sizes:
+            for name, seconds in bench_size(window, snapshot, size, args.rounds).items():
+                results[f"{name}@{size}"] = seconds
+
+        window.close()
+        snapshot._db.close()
+
+    if args.update_baseline:
+        save_baseline(args.baseline, load_baseline(args.baseline) | results)
+        print(f"базовые значения записаны: {args.baseline}")
+
+    baseline = load_baseline(args.baseline)
+    failed = []
+    missing = []
+
+    print(f"{'замер':<28} {'время, мс':>10} {'база, мс':>10} {'отношение':>10}")
+    for key, seconds in results.items():
+        base = baseline.get(key)
+        if base:
+            ratio = seconds / base
+            mark = " !" if ratio > args.tolerance else ""
+            print(f"{key:<28} {seconds * 1000:>10.1f} {base * 1000:>10.1f} {ratio:>10.2f}{mark}")
+            if ratio > args.tolerance:
+                failed.append(key)
+        else:
+            print(f"{key:<28} {seconds * 1000:>10.1f} {'—':>10} {'—':>10}")
+            missing.append(key)
+
+    if missing:
+        print(f"нет базовых значений ({args.baseline}): {', '.join(missing)} — запишите их флагом --update-baseline")
+    if failed:
+        print(f"медленнее базовой больше чем в {args.tolerance:g} раза: {', '.join(failed)}")
+    if failed or missing:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from database.db import Database
+from database.queries import account_rows, visible_phones
+
+SNAPSHOT_PATH = Path(os.getcwd()) / "templates" / "accounts_snapshot.sqlite3"
+
+# updated_at ставится временем начала транзакции: транзакция, начатая до
+# синхронизации и закоммиченная после, получит метку старше watermark.
+# Перекрытие окна забирает такие строки на следующей синхронизации.
+SYNC_OVERLAP = timedelta(minutes=2)
+
+
+class AccountSnapshot:
+    """
+    Локальный снимок таблицы аккаунтов в SQLite: окно показывает его сразу,
+    а с сервером догружается только дельта по accounts.updated_at.
+    Снимков несколько — по одному на область видимости (scope): оператор,
+    админ в режиме «все аккаунты».
+    """
+
+    def __init__(self, path: Path = SNAPSHOT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS accounts (
+                scope TEXT NOT NULL,
+                phone TEXT NOT NULL,
+                comment TEXT,
+                status TEXT,
+                updated_at TEXT,
+                PRIMARY KEY (scope, phone)
+            );
+            CREATE TABLE IF NOT EXISTS sync_state (
+                scope TEXT PRIMARY KEY,
+                watermark TEXT
+            );
+        """)
+
+    def rows(self, scope: str) -> list[tuple[str, str | None, str | None]]:
+        """(phone, comment, status) в порядке таблицы."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT phone, comment, status FROM accounts WHERE scope = ? ORDER BY phone DESC", (scope,)
+            ).fetchall()
+
+    def phones(self, scope: str) -> set[str]:
+        with self._lock:
+            return {p for (p,) in self._db.execute("SELECT phone FROM accounts WHERE scope = ?", (scope,))}
+
+    def watermark(self, scope: str) -> datetime | None:
+        with self._lock:
+            row = self._db.execute("SELECT watermark FROM sync_state WHERE scope = ?", (scope,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
+
+    def apply(self, scope: str, changed: list[tuple], removed: set[str], watermark: datetime | None):
+        """Применить дельту одной транзакцией: upsert изменённых, удаление пропавших, новый watermark."""
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO accounts (scope, phone, comment, status, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    [(scope, phone, comment, status, updated_at.isoformat() if updated_at else None)
+                     for phone, comment, status, updated_at in changed],
+                )
+                self._db.executemany(
+                    "DELETE FROM accounts WHERE scope = ? AND phone = ?", [(scope, p) for p in removed]
+                )
+                if watermark is not None:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO sync_state (scope, watermark) VALUES (?, ?)",
+                        (scope, watermark.isoformat()),
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def clear(self, scope: str | None = None):
+        with self._lock:
+            if scope is None:
+                self._db.execute("DELETE FROM accounts")
+                self._db.execute("DELETE FROM sync_state")
+            else:
+                self._db.execute("DELETE FROM accounts WHERE scope = ?", (scope,))
+                self._db.execute("DELETE FROM sync_state WHERE scope = ?", (scope,))
+
+    async def sync(self, scope: str, login: str | None) -> tuple[set[str], set[str], set[str]]:
+        """
+        Дельта-синхронизация с сервером. login=None — все аккаунты (режим админа).
+        Возвращает телефоны (изменённые, добавленные, удалённые); все пустые —
+        перерисовывать таблицу не нужно.
+        """
+        watermark = self.watermark(scope)
+        since = watermark - SYNC_OVERLAP if watermark is not None else None
+
+        async with Database().get_session() as session:
+            changed = await account_rows(session, login, since=since)
+            # ключи — дёшево: по ним находим удалённые и заново привязанные аккаунты
+            visible = await visible_phones(session, login)
+
+            local = self.phones(scope) | {r[0] for r in changed}
+            missing = visible - local
+            if missing:
+                # аккаунт привязали к оператору, но сам он не менялся — в дельту по времени не попал
+                changed += await account_rows(session, login, phones=missing)
+
+        removed = self.phones(scope) - visible
+        changed = [r for r in changed if r[0] in visible]
+
+        stamps = [r[3] for r in changed if r[3] is not None] + ([watermark] if watermark else [])
+        new_watermark = max(stamps) if stamps else None
+
+        # строки, попавшие в окно перекрытия без изменений, перерисовки не требуют
+        current = {p: (p, c, s) for p, c, s in self.rows(scope)}
+        added = {r[0] for r in changed if r[0] not in current}
+        updated = {r[0] for r in changed if r[0] in current and r[:3] != current[r[0]]}
+
+        self.apply(scope, changed, removed, new_watermark)
+        return updated, added, removed
+
+
+_snapshot: AccountSnapshot | None = None
+
+
+def get_account_snapshot() -> AccountSnapshot:
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = AccountSnapshot()
+    return _snapshot
@@ -1,7 +1,24 @@
+import os
+import socket
+
+from core.modes import ExecutionMode
 from database.db import Database, Base
+from database.models import User, SCHEMA_PATCHES
 
 db: Database | None = None
 
+# пользователь, вошедший в приложение (выставляется окном авторизации)
+current_user: User | None = None
+
+# режим браузера по умолчанию для запусков (задаётся из командной строки)
+run_mode: ExecutionMode = ExecutionMode.HEADED
+
+
+def worker_id() -> str:
+    """Имя рабочей станции: машина + процесс, чтобы в БД было видно, кто держит задачу или аккаунт."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
 class DBConnectionError(Exception):
     pass
 
@@ -14,3 +31,4 @@ async def init_application():
         raise DBConnectionError("Не удалось подключиться к базе данных.")
 
     await db.init_models(Base)
+    await db.apply_patches(SCHEMA_PATCHES)
@@ -0,0 +1,237 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+ASSET_CACHE_DIR = Path(os.getcwd()) / "profiles" / "_assets"
+
+_MAX_AGE_RE = re.compile(r"(?:s-maxage|max-age)=(\d+)")
+
+
+def freshness_lifetime(headers: dict) -> int | None:
+    """
+    Сколько секунд ответ можно отдавать без перепроверки.
+    None — ответ кэшировать нельзя (no-store/private).
+    """
+    cc = headers.get("cache-control", "").lower()
+    if "no-store" in cc or "private" in cc:
+        return None
+    if "no-cache" in cc:
+        return 0
+
+    m = _MAX_AGE_RE.search(cc)
+    if m:
+        return int(m.group(1))
+
+    expires = headers.get("expires")
+    if expires:
+        try:
+            return max(0, int(parsedate_to_datetime(expires).timestamp() - time.time()))
+        except Exception:
+            return 0
+
+    # без явных заголовков: эвристика по Last-Modified (10% возраста, как в браузерах)
+    last_modified = headers.get("last-modified")
+    if last_modified:
+        try:
+            age = time.time() - parsedate_to_datetime(last_modified).timestamp()
+            return max(0, int(age * 0.1))
+        except Exception:
+            return 0
+    return 0
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.stores = 0
+        self.evictions = 0
+        self.errors = 0
+        self.bytes_served = 0
+
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict:
+        return {**self.__dict__, "hit_ratio": round(self.hit_ratio(), 3)}
+
+
+class AssetCache:
+    """
+    Общий для всех контекстов контентно-адресуемый кэш HTTP-ответов.
+    Тела лежат в blobs/<sha256> (одинаковые бандлы хранятся один раз),
+    индекс url -> blob в SQLite, вытеснение LRU по суммарному размеру.
+    """
+
+    def __init__(self, root: Path = ASSET_CACHE_DIR, max_bytes: int = 512 * 1024 * 1024):
+        self.root = Path(root)
+        self.blobs = self.root / "blobs"
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+
+        self.blobs.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.root / "index.sqlite3", check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_entries_last_access ON entries (last_access)")
+
+    # -------------------- синхронная часть (в пуле потоков) --------------------
+
+    def _get(self, url: str) -> dict | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest, status, headers, expires_at FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+            if not row:
+                return None
+            digest, status, headers, expires_at = row
+            try:
+                body = (self.blobs / digest).read_bytes()
+            except OSError:
+                self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+                return None
+            self._db.execute("UPDATE entries SET last_access = ? WHERE url = ?", (time.time(), url))
+
+        return {
+            "body": body,
+            "status": status,
+            "headers": json.loads(headers),
+            "fresh": expires_at > time.time(),
+        }
+
+    def _put(self, url: str, body: bytes, status: int, headers: dict, lifetime: int):
+        digest = hashlib.sha256(body).hexdigest()
+        blob = self.blobs / digest
+        if not blob.exists():
+            tmp = blob.with_suffix(".tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, blob)
+
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, digest, len(body), status, json.dumps(headers), now + lifetime, now),
+            )
+            self._evict()
+
+    def _touch(self, url: str, lifetime: int):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET expires_at = ?, last_access = ? WHERE url = ?", (now + lifetime, now, url)
+            )
+
+    def _evict(self):
+        """Удалять самые давно использованные записи, пока кэш больше лимита."""
+        # размер считаем по уникальным blob'ам: один бандл под разными URL занимает место один раз
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT digest, MAX(size) AS size FROM entries GROUP BY digest)"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._db.execute("SELECT url, digest, size FROM entries ORDER BY last_access").fetchall()
+        for url, digest, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self.stats.evictions += 1
+
+            still_used = self._db.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+            if not still_used:
+                (self.blobs / digest).unlink(missing_ok=True)
+                total -= size
+
+    # -------------------- перехват Playwright --------------------
+
+    async def handle(self, route) -> int:
+        """
+        Обслужить запрос через кэш. Возвращает число байт, отданных из кэша
+        (0 — ответ пришёл из сети). Ошибки хранилища (SQLite, диск) запрос не
+        роняют — он идёт мимо кэша; ошибки сети поднимаются в NetworkRouter.
+        """
+        url = route.request.url
+        try:
+            entry = await asyncio.to_thread(self._get, url)
+        except (sqlite3.Error, OSError, ValueError):
+            self.stats.errors += 1
+            entry = None
+
+        if entry and entry["fresh"]:
+            self.stats.hits += 1
+            self.stats.bytes_served += len(entry["body"])
+            await route.fulfill(status=entry["status"], headers=entry["headers"], body=entry["body"])
+            return len(entry["body"])
+
+        headers = dict(route.request.headers)
+        if entry:
+            # устаревшая запись: условный запрос вместо полной загрузки
+            etag = entry["headers"].get("etag")
+            last_modified = entry["headers"].get("last-modified")
+            if etag:
+                headers["if-none-match"] = etag
+            if last_modified:
+                headers["if-modified-since"] = last_modified
+
+        response = await route.fetch(headers=headers)
+
+        if entry and response.status == 304:
+            self.stats.hits += 1
+            self.stats.revalidated += 1
+            self.stats.bytes_served += len(entry["body"])
+            lifetime = freshness_lifetime({**entry["headers"], **response.headers}) or 0
+            await self._store(self._touch, url, lifetime)
+            await route.fulfill(status=entry["status"], headers=entry["headers"], body=entry["body"])
+            return len(entry["body"])
+
+        self.stats.misses += 1
+        body = await response.body()
+        lifetime = freshness_lifetime(response.headers)
+        if response.status == 200 and lifetime is not None:
+            if await self._store(self._put, url, body, response.status, response.headers, lifetime):
+                self.stats.stores += 1
+
+        await route.fulfill(response=response, body=body)
+        return 0
+
+    async def _store(self, func, *args) -> bool:
+        """Запись в кэш в пуле потоков; при ошибке ответ всё равно отдаётся странице."""
+        try:
+            await asyncio.to_thread(func, *args)
+            return True
+        except (sqlite3.Error, OSError):
+            self.stats.errors += 1
+            return False
+
+
+_shared: AssetCache | None = None
+
+
+def get_shared_cache() -> AssetCache:
+    """Один экземпляр кэша на процесс — его делят все контексты браузера."""
+    global _shared
+    if _shared is None:
+        _shared = AssetCache()
+    return _shared
@@ -1,11 +1,26 @@
 import asyncio
 import subprocess
+import time
 from pathlib import Path
-import os, sys
+import sys
 
 from playwright.async_api import async_playwright
-from core.humanize import humanize
-from utils.random_tools import random_ua, random_viewport
+from sqlalchemy import update
+
+from core.fingerprint import ensure_fingerprint, generate_fingerprint, fingerprint_options, init_script as fingerprint_init_script
+from core.governor import ResourceGovernor, get_governor
+from core.humanize import Humanizer, account_seed
+from core.leases import LeaseManager, LeaseLost, get_lease_manager
+from core.metrics import metrics, observe_page_loads
+from core.modes import ExecutionMode, launch_options, context_options
+from core.profiles import ProfileStore
+from core.routing import NetworkRouter
+from core.session import BrowserSession
+from core.storage_state import StorageStateStore
+from database.db import Database
+from database.models import Account, AccountFingerprint
+from database.queries import get_account_user_agent
+from utils.random_tools import get_ua_sampler
 
 try:
     from playwright_stealth import stealth_async
@@ -22,32 +37,166 @@ def ensure_browsers():
 ensure_browsers()
 
 
+async def default_scenario(session: BrowserSession):
+    await session.step("Открытие главной", lambda: session.page.goto("https://www.wildberries.ru"))
+    if not session.from_snapshot:
+        # прогрев нужен только при старте из полного профиля
+        await session.step("Прогрев", lambda: session.humanizer.warm_up(session.page))
+
+
 class BrowserController:
-    def __init__(self):
-        self.profile_dir = Path(os.getcwd()) / "profiles" / "default"
-        self.profile_dir.mkdir(parents=True, exist_ok=True)
+    def __init__(self, phone: str, store: ProfileStore | None = None,
+                 states: StorageStateStore | None = None, use_snapshot: bool = True,
+                 router: NetworkRouter | None = None, mode: ExecutionMode = ExecutionMode.HEADED,
+                 governor: ResourceGovernor | None = None, scenario=default_scenario,
+                 step_timeout: float = 30.0, humanize_profile: str = "normal",
+                 humanize_budget_ms: int | None = None, leases: LeaseManager | None = None,
+                 humanize_seed: str | None = None):
+        self.phone = phone
+        self.store = store or ProfileStore()
+        self.states = states or StorageStateStore()
+        self.use_snapshot = use_snapshot
+        self.router = router or NetworkRouter()
+        self.mode = ExecutionMode(mode)
+        self.governor = governor or get_governor()
+        self.leases = leases or get_lease_manager()
+        self.scenario = scenario
+        self.step_timeout = step_timeout
+        self.humanize_profile = humanize_profile
+        self.humanize_budget_ms = humanize_budget_ms
+        # фиксированное зерно — только для тестов и воспроизведения сценария
+        self.humanize_seed = humanize_seed
+        self.session: BrowserSession | None = None
+        self._task: asyncio.Task | None = None
+        self._cancelled = False
+        self._lease_lost = False
+        self.profile_dir: Path | None = None
 
     async def run(self):
+        if self._cancelled:
+            # остановлен ещё в очереди на запуск
+            raise asyncio.CancelledError()
+        self._task = asyncio.current_task()
+        try:
+            # аренда — до слота надзора: занятый другой станцией аккаунт не ждёт памяти зря
+            async with self.leases.lease(self.phone) as lease:
+                # аренду перехватили — другая станция уже может вести этот профиль
+                lease.on_lost(self._on_lease_lost)
+                async with self.governor.session(self.phone) as handle:
+                    await self._run(handle)
+        except asyncio.CancelledError:
+            if self._lease_lost and not self._cancelled:
+                raise LeaseLost(self.phone) from None
+            raise
+        finally:
+            self._task = None
+
+    def _on_lease_lost(self, _lease):
+        self._lease_lost = True
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    def cancel(self):
+        """Прервать сессию (например, по кнопке «Стоп»): контекст закроется в finally."""
+        self._cancelled = True
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    async def _account_fingerprint(self) -> AccountFingerprint:
+        """
+        UA из Account.user_agent (если пуст — выдаём из кольца и закрепляем за аккаунтом)
+        и сохранённый отпечаток под этот UA.
+        """
+        async with Database().get_session() as session:
+            stored = await get_account_user_agent(session, self.phone)
+            if stored is None:
+                # аккаунта нет в базе (удалён с другой станции): отпечаток не сохраняем —
+                # account_fingerprints ссылается на accounts, INSERT упал бы на внешнем ключе
+                return generate_fingerprint(self.phone, await get_ua_sampler().for_account(None))
+
+            ua = await get_ua_sampler().for_account(stored)
+            if ua != stored:
+                await session.execute(update(Account).where(Account.phone == self.phone).values(user_agent=ua))
+
+            fp = await ensure_fingerprint(session, self.phone, ua)
+            await session.commit()
+        return fp
+
+    async def _run(self, handle):
+        name = await self.store.resolve_name(self.phone)
+        fp = await self._account_fingerprint()
+        fp_opts = fingerprint_options(fp)
+        state = await self.states.load(name) if self.use_snapshot else None
+
+        launch_opts = launch_options(self.mode)
+        # метка в командной строке Chrome — по ней надзор находит дерево процессов сессии
+        launch_opts["args"].append(handle.marker_arg)
+        context_opts = context_options(self.mode)
+
         async with async_playwright() as p:
-            context = await p.chromium.launch_persistent_context(
-                user_data_dir=str(self.profile_dir),
-                channel="chrome",
-                headless=False,
-                user_agent=random_ua(),
-                viewport=random_viewport(),
-                locale="ru-RU",
-                args=[
-                    "--disable-blink-features=AutomationControlled",
-                    "--disable-infobars",
-                ],
-            )
-
-            page = await context.new_page()
-            if HAS_STEALTH:
-                await stealth_async(page)
-
-            await page.goto("https://www.wildberries.ru")
-            await humanize(page)
-
-            await asyncio.sleep(30)
-            await context.close()
+            browser = None
+            context = None
+
+            if state:
+                # лёгкий путь: обычный контекст из снимка, без загрузки профиля
+                try:
+                    with metrics.timer("browser_launch_seconds", path="snapshot"):
+                        browser = await p.chromium.launch(channel="chrome", **launch_opts)
+                        context = await browser.new_context(
+                            storage_state=state,
+                            user_agent=fp.user_agent,
+                            **fp_opts,
+                            **context_opts,
+                        )
+                except Exception:
+                    if browser:
+                        await browser.close()
+                    browser = None
+                    context = None
+                    self.states.invalidate(name)
+
+            if context is None:
+                # подготовка профиля (распаковка, сжатие) — отдельный этап, не «запуск»
+                with metrics.timer("profile_acquire_seconds"):
+                    self.profile_dir = await self.store.acquire(name)
+                try:
+                    with metrics.timer("browser_launch_seconds", path="profile"):
+                        context = await p.chromium.launch_persistent_context(
+                            user_data_dir=str(self.profile_dir),
+                            channel="chrome",
+                            user_agent=fp.user_agent,
+                            **fp_opts,
+                            **launch_opts,
+                            **context_opts,
+                        )
+                except BaseException:
+                    self.store.release(name)
+                    raise
+
+            handle.on_recycle = context.close
+            await context.add_init_script(fingerprint_init_script(fp))
+            try:
+                await self.router.attach(context)
+
+                page = await context.new_page()
+                observe_page_loads(page)
+                if HAS_STEALTH:
+                    await stealth_async(page)
+
+                # каждый запуск — свои паузы и траектории: одинаковый от сессии к сессии
+                # рисунок поведения аккаунта легко распознать
+                salt = self.humanize_seed if self.humanize_seed is not None else str(time.time_ns())
+                humanizer = Humanizer(seed=account_seed(self.phone, salt=salt), profile=self.humanize_profile,
+                                      budget_ms=self.humanize_budget_ms)
+                self.session = BrowserSession(context, page, self.step_timeout,
+                                              from_snapshot=browser is not None, humanizer=humanizer)
+                await self.session.run(self.scenario)
+
+                # сессия прошла успешно — обновляем снимок для следующих запусков
+                await self.states.save(name, await context.storage_state())
+            finally:
+                await context.close()
+                if browser:
+                    await browser.close()
+                if browser is None:
+                    self.store.release(name)
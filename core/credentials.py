@@ -0,0 +1,122 @@
+import base64
+import hashlib
+import hmac
+import os
+
+from core.settings import get_settings, PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P
+
+try:
+    import keyring
+    from keyring.errors import KeyringError
+    HAS_KEYRING = True
+except ImportError:
+    keyring = None
+    KeyringError = Exception
+    HAS_KEYRING = False
+
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+HASH_PREFIX = "scrypt"
+KEYRING_SERVICE = "MarketBuyer"
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p, dklen=KEY_BYTES,
+        maxmem=128 * n * r * p + 1024 * 1024,
+    )
+
+
+def scrypt_params() -> tuple[int, int, int]:
+    """(N, r, p) из настроек. Недопустимые значения заменяются значениями по умолчанию."""
+    settings = get_settings()
+    n, r, p = (settings.get(s) for s in (PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P))
+    if n < 2 or n & (n - 1):  # N — степень двойки больше 1
+        n = PASSWORD_SCRYPT_N.default
+    return n, max(r, 1), max(p, 1)
+
+
+def hash_password(password: str, n: int | None = None, r: int | None = None, p: int | None = None) -> str:
+    """Хэш для хранения в users.password: scrypt$n$r$p$соль$ключ. Без параметров — из настроек."""
+    default_n, default_r, default_p = scrypt_params()
+    n, r, p = n or default_n, r or default_r, p or default_p
+    salt = os.urandom(SALT_BYTES)
+    key = _scrypt(password, salt, n, r, p)
+    return f"{HASH_PREFIX}${n}${r}${p}${_b64(salt)}${_b64(key)}"
+
+
+def is_hashed(stored: str) -> bool:
+    return stored.startswith(HASH_PREFIX + "$")
+
+
+def verify_password(password: str, stored: str) -> bool:
+    """
+    Проверка пароля. Старые строки с паролем открытым текстом тоже принимаются —
+    после успешного входа их нужно перехэшировать (см. needs_rehash).
+    Функция блокирующая: из GUI вызывать через asyncio.to_thread.
+    """
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode(), stored.encode())
+
+    try:
+        _, n, r, p, salt, key = stored.split("$")
+        expected = base64.b64decode(key)
+        actual = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+    except (ValueError, TypeError):
+        return False
+    return hmac.compare_digest(actual, expected)
+
+
+def needs_rehash(stored: str) -> bool:
+    """Открытый текст или хэш с параметрами, отличными от текущих настроек."""
+    if not is_hashed(stored):
+        return True
+    try:
+        _, n, r, p, _, _ = stored.split("$")
+    except ValueError:
+        return True
+    return (int(n), int(r), int(p)) != scrypt_params()
+
+
+def check_and_upgrade(password: str, stored: str) -> tuple[bool, str | None]:
+    """(пароль верный, новый хэш для записи в БД или None). Блокирующая."""
+    if not verify_password(password, stored):
+        return False, None
+    return True, hash_password(password) if needs_rehash(stored) else None
+
+
+# -------------------- «Запомнить» --------------------
+# Пароль хранится только в хранилище ОС (Windows Credential Manager, Keychain,
+# Secret Service). Если keyring недоступен, запоминается лишь логин.
+
+def remember_password(login: str, password: str) -> bool:
+    if not HAS_KEYRING:
+        return False
+    try:
+        keyring.set_password(KEYRING_SERVICE, login, password)
+        return True
+    except KeyringError:
+        return False
+
+
+def recall_password(login: str) -> str | None:
+    if not HAS_KEYRING or not login:
+        return None
+    try:
+        return keyring.get_password(KEYRING_SERVICE, login)
+    except KeyringError:
+        return None
+
+
+def forget_password(login: str):
+    if not HAS_KEYRING or not login:
+        return
+    try:
+        keyring.delete_password(KEYRING_SERVICE, login)
+    except KeyringError:
+        pass
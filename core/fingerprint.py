@@ -0,0 +1,135 @@
+import json
+import random
+
+from sqlalchemy import select
+
+from core.humanize import account_seed
+from database.models import AccountFingerprint
+
+# Популярные экраны (CSS-пиксели, масштаб) по платформам
+WINDOWS_SCREENS = [
+    (1920, 1080, 1.0),
+    (1920, 1080, 1.0),
+    (1536, 864, 1.25),
+    (1366, 768, 1.0),
+    (1440, 900, 1.0),
+    (1600, 900, 1.0),
+    (2560, 1440, 1.0),
+    (1280, 720, 1.5),
+]
+MAC_SCREENS = [
+    (1440, 900, 2.0),
+    (1512, 982, 2.0),
+    (1728, 1117, 2.0),
+    (1680, 1050, 2.0),
+    (1280, 800, 2.0),
+]
+# на Linux дробное масштабирование редкость: 1.0 или целые 2.0 на 4K
+LINUX_SCREENS = [
+    (1920, 1080, 1.0),
+    (1920, 1080, 1.0),
+    (2560, 1440, 1.0),
+    (1366, 768, 1.0),
+    (1600, 900, 1.0),
+    (1920, 1200, 1.0),
+    (1920, 1080, 2.0),
+]
+
+WINDOWS_CORES = [4, 6, 8, 8, 12, 16]
+# Chrome на Apple Silicon тоже пишет в UA «Intel Mac OS X» — различить их нельзя,
+# поэтому ядра берутся из общего набора обеих линеек
+MAC_CORES = [4, 8, 8, 10, 12]
+LINUX_CORES = [4, 8, 8, 12, 16]
+
+# navigator.deviceMemory в Chrome ограничен сверху значением 8
+DEVICE_MEMORY = [4, 8, 8, 8]
+
+
+def detect_platform(user_agent: str) -> str:
+    if "Macintosh" in user_agent or "Mac OS X" in user_agent:
+        return "MacIntel"  # и Intel, и Apple Silicon отдают MacIntel
+    if "X11" in user_agent or "Linux" in user_agent:
+        return "Linux x86_64"
+    return "Win32"
+
+
+def generate_fingerprint(phone: str, user_agent: str) -> AccountFingerprint:
+    """Согласованный с UA отпечаток; для одного телефона и UA результат всегда одинаков."""
+    rng = random.Random(account_seed(phone, user_agent))
+    platform = detect_platform(user_agent)
+
+    if platform == "MacIntel":
+        screen_w, screen_h, scale = rng.choice(MAC_SCREENS)
+        cores = rng.choice(MAC_CORES)
+        # строка меню + панель вкладок Chrome
+        chrome_h = rng.randint(100, 125)
+    elif platform == "Linux x86_64":
+        screen_w, screen_h, scale = rng.choice(LINUX_SCREENS)
+        cores = rng.choice(LINUX_CORES)
+        # верхняя панель окружения + панель вкладок Chrome
+        chrome_h = rng.randint(110, 140)
+    else:
+        screen_w, screen_h, scale = rng.choice(WINDOWS_SCREENS)
+        cores = rng.choice(WINDOWS_CORES)
+        # панель задач Windows + панель вкладок Chrome
+        chrome_h = rng.randint(125, 150)
+
+    return AccountFingerprint(
+        phone=phone,
+        user_agent=user_agent,
+        platform=platform,
+        screen_width=screen_w,
+        screen_height=screen_h,
+        viewport_width=screen_w - rng.choice((0, 0, 16)),
+        viewport_height=screen_h - chrome_h,
+        device_scale_factor=scale,
+        hardware_concurrency=cores,
+        device_memory=rng.choice(DEVICE_MEMORY),
+        locale="ru-RU",
+        timezone_id="Europe/Moscow",
+    )
+
+
+async def ensure_fingerprint(session, phone: str, user_agent: str) -> AccountFingerprint:
+    """
+    Вернуть сохранённый отпечаток аккаунта. Новый считается только если его
+    ещё нет или у аккаунта сменился UA. Коммит — на вызывающей стороне.
+    """
+    fp = await session.scalar(select(AccountFingerprint).where(AccountFingerprint.phone == phone))
+    if fp is not None and fp.user_agent == user_agent:
+        return fp
+
+    fresh = generate_fingerprint(phone, user_agent)
+    if fp is None:
+        session.add(fresh)
+        return fresh
+
+    for column in AccountFingerprint.__table__.columns.keys():
+        setattr(fp, column, getattr(fresh, column))
+    return fp
+
+
+def fingerprint_options(fp: AccountFingerprint) -> dict:
+    """Параметры контекста Playwright из отпечатка."""
+    return {
+        "viewport": {"width": fp.viewport_width, "height": fp.viewport_height},
+        "screen": {"width": fp.screen_width, "height": fp.screen_height},
+        "device_scale_factor": fp.device_scale_factor,
+        "locale": fp.locale,
+        "timezone_id": fp.timezone_id,
+    }
+
+
+def init_script(fp: AccountFingerprint) -> str:
+    """Скрипт для свойств navigator, которые Playwright не задаёт сам."""
+    values = json.dumps({
+        "platform": fp.platform,
+        "hardwareConcurrency": fp.hardware_concurrency,
+        "deviceMemory": fp.device_memory,
+    })
+    return (
+        f"(() => {{ const v = {values};"
+        " for (const [k, val] of Object.entries(v)) {"
+        " Object.defineProperty(Navigator.prototype, k, {get: () => val, configurable: true}); }"
+        " })();"
+    )
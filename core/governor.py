@@ -0,0 +1,212 @@
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+import psutil
+
+from core.settings import get_settings, MAX_SESSIONS
+from core.tasks import spawn
+
+MARKER_FLAG = "--marketbuyer-session"
+
+
+class SessionHandle:
+    """Учёт одной сессии браузера: её процессы, потребление и обработчик «переработки»."""
+
+    def __init__(self, name: str, task: asyncio.Task | None):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.task = task
+        self.started = time.monotonic()
+        self.rss = 0
+        self.cpu_percent = 0.0
+        self.state = "running"
+        self.recycle_started = 0.0
+        # вызывается, когда сессия превысила лимит: должен закрыть контекст
+        self.on_recycle = None
+        self._procs: dict[int, psutil.Process] = {}
+
+    @property
+    def marker_arg(self) -> str:
+        """Флаг запуска Chrome, по которому находится главный процесс сессии."""
+        return f"{MARKER_FLAG}={self.id}"
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.started
+
+    def _find_root(self) -> psutil.Process | None:
+        for proc in psutil.process_iter(["cmdline"]):
+            cmdline = proc.info.get("cmdline") or []
+            if self.marker_arg in cmdline:
+                return proc
+        return None
+
+    def processes(self) -> list[psutil.Process]:
+        """Главный процесс Chrome и все его потомки (рендеры, GPU, утилиты)."""
+        root = next(iter(self._procs.values()), None)
+        if root is None or not root.is_running():
+            root = self._find_root()
+            if root is None:
+                return []
+
+        procs = [root]
+        try:
+            procs += root.children(recursive=True)
+        except psutil.Error:
+            pass
+
+        # сохраняем объекты Process: cpu_percent считает от прошлого вызова
+        known = {}
+        for p in procs:
+            known[p.pid] = self._procs.get(p.pid, p)
+        self._procs = known
+        return list(known.values())
+
+    def sample(self):
+        rss = 0
+        cpu = 0.0
+        for p in self.processes():
+            try:
+                rss += p.memory_info().rss
+                cpu += p.cpu_percent(None)
+            except psutil.Error:
+                pass
+        self.rss = rss
+        self.cpu_percent = cpu
+
+    def kill(self):
+        for p in self.processes():
+            try:
+                p.kill()
+            except psutil.Error:
+                pass
+
+
+class ResourceGovernor:
+    """
+    Надзор за сессиями браузера: не пускает новые запуски при нехватке памяти,
+    перезапускает сессии, вышедшие за лимит RSS, и убивает зависшие по дедлайну.
+    """
+
+    def __init__(self,
+                 max_sessions: int = 8,
+                 min_available_bytes: int = 1024 * 1024 * 1024,
+                 max_session_rss: int = 1536 * 1024 * 1024,
+                 session_deadline: float = 15 * 60,
+                 recycle_grace: float = 15.0,
+                 interval: float = 2.0):
+        self.max_sessions = max_sessions
+        self.min_available_bytes = min_available_bytes
+        self.max_session_rss = max_session_rss
+        self.session_deadline = session_deadline
+        self.recycle_grace = recycle_grace
+        self.interval = interval
+
+        self.sessions: dict[str, SessionHandle] = {}
+        self._changed = asyncio.Condition()
+        self._watchdog: asyncio.Task | None = None
+
+    # -------------------- допуск --------------------
+
+    def memory_pressure(self) -> bool:
+        return psutil.virtual_memory().available < self.min_available_bytes
+
+    def _can_start(self) -> bool:
+        return len(self.sessions) < self.max_sessions and not self.memory_pressure()
+
+    @asynccontextmanager
+    async def session(self, name: str):
+        """Дождаться свободного слота и памяти, затем учитывать сессию до выхода."""
+        self._ensure_watchdog()
+
+        async with self._changed:
+            while not self._can_start():
+                # память освобождается не только при закрытии сессий — проверяем периодически
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout=self.interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            handle = SessionHandle(name, asyncio.current_task())
+            self.sessions[handle.id] = handle
+
+        try:
+            yield handle
+        finally:
+            async with self._changed:
+                self.sessions.pop(handle.id, None)
+                self._changed.notify_all()
+
+    # -------------------- сторож --------------------
+
+    def _ensure_watchdog(self):
+        if self._watchdog is None or self._watchdog.done():
+            self._watchdog = spawn(self._watch(), name="governor-watchdog", category="governor")
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            for handle in list(self.sessions.values()):
+                await asyncio.to_thread(handle.sample)
+                await self._enforce(handle)
+
+    async def _enforce(self, handle: SessionHandle):
+        if handle.state == "running" and handle.age > self.session_deadline:
+            handle.state = "killed"
+            handle.kill()
+            if handle.task:
+                handle.task.cancel()
+            return
+
+        if handle.state == "running" and handle.rss > self.max_session_rss:
+            handle.state = "recycling"
+            handle.recycle_started = time.monotonic()
+            if handle.on_recycle:
+                try:
+                    await handle.on_recycle()
+                except Exception:
+                    pass
+            return
+
+        # контекст не закрылся сам за отведённое время — добиваем процессы
+        if handle.state == "recycling" and time.monotonic() - handle.recycle_started > self.recycle_grace:
+            handle.state = "killed"
+            handle.kill()
+            if handle.task:
+                handle.task.cancel()
+
+    # -------------------- метрики --------------------
+
+    def snapshot(self) -> dict:
+        vm = psutil.virtual_memory()
+        return {
+            "sessions": [
+                {
+                    "name": h.name,
+                    "state": h.state,
+                    "age": h.age,
+                    "rss": h.rss,
+                    "cpu_percent": h.cpu_percent,
+                }
+                for h in self.sessions.values()
+            ],
+            "total_rss": sum(h.rss for h in self.sessions.values()),
+            "available": vm.available,
+            "memory_percent": vm.percent,
+            "pressure": vm.available < self.min_available_bytes,
+        }
+
+
+_governor: ResourceGovernor | None = None
+
+
+def get_governor() -> ResourceGovernor:
+    global _governor
+    if _governor is None:
+        settings = get_settings()
+        _governor = ResourceGovernor(max_sessions=settings.get(MAX_SESSIONS))
+        # лимит сессий можно менять на ходу — новые запуски увидят его сразу
+        settings.subscribe(MAX_SESSIONS, lambda _key, value: setattr(_governor, "max_sessions", int(value)))
+    return _governor
@@ -1,8 +1,131 @@
+import hashlib
 import random
+import time
 
-async def humanize(page):
-    await page.wait_for_timeout(random.randint(300, 800))
-    await page.mouse.move(random.randint(200, 600), random.randint(200, 500))
-    await page.wait_for_timeout(random.randint(200, 600))
-    await page.mouse.wheel(0, random.randint(300, 800))
-    await page.wait_for_timeout(random.randint(300, 900))
+from core.metrics import metrics
+
+
+class HumanizeProfile:
+    """Параметры «человечности»: диапазоны пауз (мс), плавность мыши и прокрутки."""
+
+    def __init__(self, pause=(300, 800), short_pause=(200, 600), long_pause=(300, 900),
+                 mouse_points=(18, 35), scroll=(300, 800)):
+        self.pause = pause
+        self.short_pause = short_pause
+        self.long_pause = long_pause
+        self.mouse_points = mouse_points
+        self.scroll = scroll
+
+
+PROFILES = {
+    "normal": HumanizeProfile(),
+    # для доверенных сценариев: сайт уже знает браузер, долгие паузы не нужны
+    "fast": HumanizeProfile(pause=(40, 120), short_pause=(30, 80), long_pause=(50, 150),
+                            mouse_points=(6, 10), scroll=(300, 800)),
+}
+
+
+def account_seed(phone: str, salt: str = "") -> int:
+    """
+    Зерно ГСЧ из телефона и соли: одинаковые телефон и соль — одинаковое поведение.
+    Соль обязательна по смыслу: BrowserController берёт humanize_seed (или время
+    запуска, если он не задан), fingerprint — user agent.
+    """
+    return int.from_bytes(hashlib.sha256(f"{phone}:{salt}".encode()).digest()[:8], "big")
+
+
+class Humanizer:
+    """
+    Имитация действий человека со своим ГСЧ (воспроизводимо по seed),
+    траекториями мыши по кривым Безье и бюджетом на суммарную задержку.
+    """
+
+    def __init__(self, seed: int | None = None, profile: str | HumanizeProfile = "normal",
+                 budget_ms: int | None = None):
+        self.rng = random.Random(seed)
+        self.profile = PROFILES[profile] if isinstance(profile, str) else profile
+        self.budget_ms = budget_ms
+        self.spent_ms = 0.0     # всё время, потраченное на имитацию
+        self.waited_ms = 0.0    # из него — чистые паузы
+        self.waits = 0
+        self._pos = (self.rng.randint(100, 400), self.rng.randint(100, 300))
+
+    @property
+    def remaining_ms(self) -> float | None:
+        if self.budget_ms is None:
+            return None
+        return max(0.0, self.budget_ms - self.spent_ms)
+
+    def stats(self) -> dict:
+        return {"spent_ms": round(self.spent_ms), "waited_ms": round(self.waited_ms), "waits": self.waits}
+
+    # -------------------- примитивы --------------------
+
+    async def wait(self, page, bounds: tuple[int, int]):
+        ms = self.rng.randint(*bounds)
+        remaining = self.remaining_ms
+        if remaining is not None:
+            ms = min(ms, int(remaining))
+        if ms <= 0:
+            return
+
+        await page.wait_for_timeout(ms)
+        metrics.histogram("humanize_wait_seconds").observe(ms / 1000)
+        self.spent_ms += ms
+        self.waited_ms += ms
+        self.waits += 1
+
+    def bezier_path(self, start: tuple[float, float], end: tuple[float, float]) -> list[tuple[float, float]]:
+        """Точки кубической кривой Безье между start и end со случайными опорными точками."""
+        (x0, y0), (x3, y3) = start, end
+        dx, dy = x3 - x0, y3 - y0
+        spread = max(30.0, (dx * dx + dy * dy) ** 0.5 * 0.3)
+
+        x1 = x0 + dx * 0.3 + self.rng.uniform(-spread, spread)
+        y1 = y0 + dy * 0.3 + self.rng.uniform(-spread, spread)
+        x2 = x0 + dx * 0.7 + self.rng.uniform(-spread, spread)
+        y2 = y0 + dy * 0.7 + self.rng.uniform(-spread, spread)
+
+        n = self.rng.randint(*self.profile.mouse_points)
+        points = []
+        for i in range(1, n + 1):
+            t = i / n
+            # ease-in-out: курсор разгоняется и тормозит у цели
+            t = t * t * (3 - 2 * t)
+            u = 1 - t
+            x = u ** 3 * x0 + 3 * u * u * t * x1 + 3 * u * t * t * x2 + t ** 3 * x3
+            y = u ** 3 * y0 + 3 * u * u * t * y1 + 3 * u * t * t * y2 + t ** 3 * y3
+            points.append((x, y))
+        return points
+
+    async def move(self, page, x: float, y: float):
+        if self.remaining_ms == 0:
+            points = [(x, y)]  # бюджет исчерпан — прямой перенос
+        else:
+            points = self.bezier_path(self._pos, (x, y))
+
+        started = time.perf_counter()
+        for px, py in points:
+            await page.mouse.move(px, py)
+        self.spent_ms += (time.perf_counter() - started) * 1000
+        self._pos = (x, y)
+
+    async def scroll(self, page, dy: int | None = None):
+        dy = dy if dy is not None else self.rng.randint(*self.profile.scroll)
+        started = time.perf_counter()
+        await page.mouse.wheel(0, dy)
+        self.spent_ms += (time.perf_counter() - started) * 1000
+
+    # -------------------- сценарии --------------------
+
+    async def warm_up(self, page):
+        """Прогрев страницы: пауза, движение мыши, прокрутка."""
+        await self.wait(page, self.profile.pause)
+        await self.move(page, self.rng.randint(200, 600), self.rng.randint(200, 500))
+        await self.wait(page, self.profile.short_pause)
+        await self.scroll(page)
+        await self.wait(page, self.profile.long_pause)
+
+
+async def humanize(page, humanizer: Humanizer | None = None):
+    await (humanizer or Humanizer()).warm_up(page)
@@ -0,0 +1,214 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update, func, exists
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+
+from core.app import worker_id
+from core.modes import ExecutionMode
+from core.tasks import spawn, report_error
+from database.db import Database
+from database.models import Job
+
+
+class JobQueue:
+    """
+    Очередь задач в PostgreSQL. Выборка через SELECT ... FOR UPDATE SKIP LOCKED,
+    поэтому несколько рабочих станций разбирают одну очередь без блокировок друг друга.
+    Время берётся из БД (now()), чтобы расхождение часов на машинах не мешало.
+    """
+
+    def __init__(self, worker: str | None = None, backoff_base: float = 60.0, backoff_max: float = 3600.0):
+        self.worker = worker or worker_id()
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    async def enqueue(self, phone: str, scenario: str = "default", priority: int = 0,
+                      scheduled_at: datetime | None = None, max_attempts: int = 3) -> int:
+        async with Database().get_session() as session:
+            job = Job(phone=phone, scenario=scenario, priority=priority, max_attempts=max_attempts)
+            if scheduled_at is not None:
+                job.scheduled_at = scheduled_at
+            session.add(job)
+            await session.commit()
+            return job.id
+
+    async def claim(self) -> Job | None:
+        """Взять следующую задачу: самый высокий приоритет, самая ранняя по времени."""
+        running = aliased(Job)
+        stmt = (
+            select(Job)
+            .where(
+                Job.status == "pending",
+                Job.scheduled_at <= func.now(),
+                # аккаунт уже выполняется где-то ещё — его задачи пропускаем
+                ~exists().where(running.phone == Job.phone, running.status == "running"),
+            )
+            .order_by(Job.priority.desc(), Job.scheduled_at, Job.id)
+            .limit(1)
+            .with_for_update(skip_locked=True, of=Job)
+        )
+
+        # две станции могут одновременно взять разные задачи одного аккаунта:
+        # уникальный индекс uq_jobs_running_phone пропустит только одну, вторая попробует ещё раз
+        for _ in range(5):
+            async with Database().get_session() as session:
+                job = await session.scalar(stmt)
+                if job is None:
+                    return None
+
+                job.status = "running"
+                job.worker = self.worker
+                job.attempts += 1
+                job.locked_at = func.now()
+                try:
+                    await session.commit()
+                except IntegrityError:
+                    await session.rollback()
+                    continue
+                return job
+        return None
+
+    async def heartbeat(self, job_id: int):
+        async with Database().get_session() as session:
+            await session.execute(
+                update(Job).where(Job.id == job_id, Job.worker == self.worker).values(locked_at=func.now())
+            )
+            await session.commit()
+
+    async def complete(self, job_id: int):
+        async with Database().get_session() as session:
+            await session.execute(
+                update(Job).where(Job.id == job_id).values(status="done", finished_at=func.now(), last_error=None)
+            )
+            await session.commit()
+
+    async def fail(self, job_id: int, error: str):
+        """Ошибка: повтор с экспоненциальной задержкой, пока не кончились попытки."""
+        async with Database().get_session() as session:
+            job = await session.get(Job, job_id)
+            if job is None:
+                return
+
+            job.last_error = error[:500]
+            job.worker = None
+            if job.attempts < job.max_attempts:
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (job.attempts - 1))
+                job.status = "pending"
+                job.scheduled_at = func.now() + timedelta(seconds=delay)
+            else:
+                job.status = "failed"
+                job.finished_at = func.now()
+            await session.commit()
+
+    async def release(self, job_id: int):
+        """Вернуть задачу в очередь без штрафа (обработчик остановлен, а не упал)."""
+        async with Database().get_session() as session:
+            await session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == "running")
+                .values(status="pending", worker=None, attempts=Job.attempts - 1)
+            )
+            await session.commit()
+
+    async def reclaim_stale(self, timeout: float = 300.0) -> int:
+        """Задачи упавших станций (нет heartbeat дольше timeout) возвращаются в очередь."""
+        async with Database().get_session() as session:
+            res = await session.execute(
+                update(Job)
+                .where(Job.status == "running", Job.locked_at < func.now() - timedelta(seconds=timeout))
+                .values(status="pending", worker=None)
+            )
+            await session.commit()
+            return res.rowcount
+
+
+class WorkerPool:
+    """Обработчики, которые берут задачи из JobQueue и выполняют сценарии в браузере."""
+
+    def __init__(self, size: int = 4, queue: JobQueue | None = None, poll_interval: float = 5.0,
+                 heartbeat_interval: float = 30.0, stale_timeout: float = 300.0,
+                 mode: ExecutionMode = ExecutionMode.HEADED, error_backoff_max: float = 300.0):
+        self.size = size
+        self.queue = queue or JobQueue()
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_timeout = stale_timeout
+        self.mode = mode
+        self.error_backoff_max = error_backoff_max
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return any(not t.done() for t in self._tasks)
+
+    def start(self):
+        if self.running:
+            return
+        self._tasks = [spawn(self._worker(), name=f"queue-worker-{i}", category="queue") for i in range(self.size)]
+        self._tasks.append(spawn(self._reclaimer(), name="queue-reclaimer", category="queue"))
+
+    async def stop(self):
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # Ошибка БД в цикле не должна убивать обработчик: пул молча сократился бы.
+    # Сообщаем о ней, ждём и продолжаем; задача, застрявшая в running, вернётся через reclaim_stale.
+
+    def _error_delay(self, failures: int) -> float:
+        return min(self.error_backoff_max, self.poll_interval * 2 ** (failures - 1))
+
+    async def _reclaimer(self):
+        while True:
+            try:
+                await self.queue.reclaim_stale(self.stale_timeout)
+            except Exception as e:
+                report_error("queue-reclaimer", e, category="queue")
+            await asyncio.sleep(self.stale_timeout / 2)
+
+    async def _worker(self):
+        failures = 0
+        while True:
+            try:
+                job = await self.queue.claim()
+                if job is None:
+                    failures = 0
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                await self._execute(job)
+                failures = 0
+            except Exception as e:
+                failures += 1
+                report_error(asyncio.current_task().get_name(), e, category="queue")
+                await asyncio.sleep(self._error_delay(failures))
+
+    async def _heartbeat(self, job_id: int):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.queue.heartbeat(job_id)
+            except Exception as e:
+                # следующий тик повторит; до stale_timeout задачу никто не заберёт
+                report_error(f"job-heartbeat-{job_id}", e, category="queue")
+
+    async def _execute(self, job: Job):
+        # импорт здесь: core.scenario тянет за собой playwright
+        from core.browser import BrowserController
+        from core.scenario import load_scenario
+
+        hb = spawn(self._heartbeat(job.id), name=f"job-heartbeat-{job.id}", category="queue")
+        try:
+            controller = BrowserController(job.phone, mode=self.mode, scenario=load_scenario(job.scenario))
+            await controller.run()
+        except asyncio.CancelledError:
+            await asyncio.shield(self.queue.release(job.id))
+            raise
+        except Exception as e:
+            await self.queue.fail(job.id, repr(e))
+        else:
+            await self.queue.complete(job.id)
+        finally:
+            hb.cancel()
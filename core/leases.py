@@ -0,0 +1,216 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
+from sqlalchemy import select, delete, update, func
+from sqlalchemy.dialects.postgresql import insert
+
+import core.app as app_core
+from core.tasks import spawn, report_error
+from database.db import Database
+from database.models import AccountLease
+
+
+class LeaseError(Exception):
+    def __init__(self, phone: str, holder: str | None):
+        self.phone = phone
+        self.holder = holder
+        super().__init__(f"Аккаунт {phone} уже запущен: {holder or 'другая станция'}")
+
+
+class LeaseLost(LeaseError):
+    def __init__(self, phone: str):
+        self.phone = phone
+        self.holder = None
+        Exception.__init__(self, f"Аренда аккаунта {phone} потеряна: продлить её не удалось")
+
+
+class Lease:
+    """
+    Удерживаемая аренда. lost выставляется, когда продлить аренду не удалось
+    (её перехватила другая станция или БД недоступна дольше TTL) — работу
+    с аккаунтом нужно прекратить.
+    """
+
+    def __init__(self, phone: str):
+        self.phone = phone
+        self.renewed_at = time.monotonic()
+        self.lost = asyncio.Event()
+        self._callbacks = []
+
+    def on_lost(self, callback):
+        """callback(lease) при потере аренды; если она уже потеряна — сразу."""
+        if self.lost.is_set():
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    def _mark_lost(self):
+        if self.lost.is_set():
+            return
+        self.lost.set()
+        for callback in self._callbacks:
+            callback(self)
+
+
+class LeaseManager:
+    """
+    Аренда аккаунтов между рабочими станциями: TTL + heartbeat.
+    Упавшая станция перестаёт продлевать аренду, и после истечения TTL
+    аккаунт автоматически достаётся следующему, кто его запросит.
+    """
+
+    def __init__(self, holder: str | None = None, ttl: float = 90.0, heartbeat_interval: float = 30.0):
+        self.holder = holder or app_core.worker_id()
+        self.ttl = ttl
+        self.heartbeat_interval = heartbeat_interval
+        self.held: set[str] = set()
+        self._leases: dict[str, Lease] = {}
+        # аренды, которые этот процесс сейчас берёт (запрос в БД ещё идёт)
+        self._pending: set[str] = set()
+        self._heartbeat: asyncio.Task | None = None
+
+    def _user(self) -> str | None:
+        user = app_core.current_user
+        return user.login if user else None
+
+    async def acquire(self, phone: str) -> bool:
+        """Взять аренду, если она свободна или истекла. Атомарно, одним запросом."""
+        if phone in self.held or phone in self._pending:
+            # этот же процесс уже работает с аккаунтом или прямо сейчас берёт его
+            # (двойной «Запуск», задача очереди рядом с ручным запуском) — до await
+            return False
+        self._pending.add(phone)
+        try:
+            got = await self._upsert(phone)
+        finally:
+            self._pending.discard(phone)
+
+        if got:
+            self.held.add(phone)
+            self._ensure_heartbeat()
+        return bool(got)
+
+    async def _upsert(self, phone: str) -> bool:
+        """INSERT ... ON CONFLICT DO UPDATE: новая аренда или перехват истёкшей."""
+        expires = func.now() + timedelta(seconds=self.ttl)
+        stmt = (
+            insert(AccountLease)
+            .values(phone=phone, holder=self.holder, user=self._user(), expires_at=expires)
+            .on_conflict_do_update(
+                index_elements=[AccountLease.phone],
+                set_={
+                    "holder": self.holder,
+                    "user": self._user(),
+                    "acquired_at": func.now(),
+                    "heartbeat_at": func.now(),
+                    "expires_at": expires,
+                },
+                # только истёкшую: свою действующую аренду второй раз не выдаём
+                where=AccountLease.expires_at < func.now(),
+            )
+            .returning(AccountLease.phone)
+        )
+        async with Database().get_session() as session:
+            got = await session.scalar(stmt)
+            await session.commit()
+        return bool(got)
+
+    async def holder_of(self, phone: str) -> str | None:
+        async with Database().get_session() as session:
+            return await session.scalar(
+                select(AccountLease.holder).where(AccountLease.phone == phone, AccountLease.expires_at >= func.now())
+            )
+
+    async def release(self, phone: str):
+        self.held.discard(phone)
+        self._leases.pop(phone, None)
+        async with Database().get_session() as session:
+            await session.execute(
+                delete(AccountLease).where(AccountLease.phone == phone, AccountLease.holder == self.holder)
+            )
+            await session.commit()
+
+    @asynccontextmanager
+    async def lease(self, phone: str):
+        if not await self.acquire(phone):
+            raise LeaseError(phone, await self.holder_of(phone))
+        lease = self._leases[phone] = Lease(phone)
+        try:
+            yield lease
+        finally:
+            await asyncio.shield(self.release(phone))
+
+    # -------------------- продление --------------------
+
+    def _ensure_heartbeat(self):
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = spawn(self._beat(), name="lease-heartbeat", category="leases")
+
+    async def _beat(self):
+        while self.held:
+            await asyncio.sleep(self.heartbeat_interval)
+            if not self.held:
+                break
+            try:
+                await self.renew()
+            except Exception as e:
+                # БД недоступна — повторим на следующем тике, пока TTL даёт запас;
+                # дольше TTL аренда в БД уже истекла и может достаться другой станции
+                report_error("lease-heartbeat", e, category="leases")
+                now = time.monotonic()
+                self._lose({p for p, lease in self._leases.items() if now - lease.renewed_at > self.ttl})
+
+    async def renew(self):
+        held = list(self.held)
+        async with Database().get_session() as session:
+            res = await session.execute(
+                update(AccountLease)
+                .where(AccountLease.phone.in_(held), AccountLease.holder == self.holder)
+                .values(heartbeat_at=func.now(), expires_at=func.now() + timedelta(seconds=self.ttl))
+                .returning(AccountLease.phone)
+            )
+            renewed = set(res.scalars().all())
+            await session.commit()
+
+        now = time.monotonic()
+        for phone in renewed:
+            if phone in self._leases:
+                self._leases[phone].renewed_at = now
+        # аренду, которую у нас забрали (истекла и перехвачена), больше не держим
+        self._lose(set(held) - renewed)
+
+    def _lose(self, phones: set[str]):
+        self.held -= phones
+        for phone in phones:
+            lease = self._leases.pop(phone, None)
+            if lease is not None:
+                lease._mark_lost()
+
+    @staticmethod
+    async def purge_expired() -> int:
+        async with Database().get_session() as session:
+            res = await session.execute(delete(AccountLease).where(AccountLease.expires_at < func.now()))
+            await session.commit()
+            return res.rowcount
+
+    @staticmethod
+    async def active_leases() -> dict[str, tuple[str, str | None]]:
+        """phone -> (holder, user) для неистёкших аренд."""
+        async with Database().get_session() as session:
+            res = await session.execute(
+                select(AccountLease.phone, AccountLease.holder, AccountLease.user)
+                .where(AccountLease.expires_at >= func.now())
+            )
+            return {phone: (holder, user) for phone, holder, user in res.all()}
+
+
+_manager: LeaseManager | None = None
+
+
+def get_lease_manager() -> LeaseManager:
+    global _manager
+    if _manager is None:
+        _manager = LeaseManager()
+    return _manager
@@ -0,0 +1,126 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from database.models import User
+
+CACHE_PATH = Path(os.getcwd()) / "templates" / "session.json"
+SECRET_PATH = Path(os.getcwd()) / "templates" / "session.key"
+
+
+@dataclass
+class CachedSession:
+    user: User
+    password_tag: str
+    expires_at: float
+
+
+class LoginCache:
+    """
+    Локальная сессия для быстрого входа: подписанный HMAC токен со сроком
+    действия + снимок пользователя. Главное окно открывается сразу (таблица —
+    из core/account_snapshot.py), а проверка в БД идёт уже в фоне.
+    Ключ подписи хранится только на этой машине.
+    """
+
+    def __init__(self, path: Path = CACHE_PATH, secret_path: Path = SECRET_PATH, ttl: float = 7 * 24 * 3600):
+        self.path = path
+        self.secret_path = secret_path
+        self.ttl = ttl
+        self._secret: bytes | None = None
+
+    def _key(self) -> bytes:
+        if self._secret is None:
+            if self.secret_path.exists():
+                self._secret = self.secret_path.read_bytes()
+            else:
+                self._secret = secrets.token_bytes(32)
+                self.secret_path.parent.mkdir(parents=True, exist_ok=True)
+                self.secret_path.write_bytes(self._secret)
+                try:
+                    os.chmod(self.secret_path, 0o600)
+                except OSError:
+                    pass
+        return self._secret
+
+    def _sign(self, payload: bytes) -> str:
+        return hmac.new(self._key(), payload, hashlib.sha256).hexdigest()
+
+    def password_tag(self, stored_password: str) -> str:
+        """Отпечаток хэша пароля: сменили пароль в БД — кэш больше не действует."""
+        return self._sign(stored_password.encode())[:16]
+
+    def _write(self, data: dict):
+        payload = json.dumps(data, ensure_ascii=False).encode()
+        token = {"payload": base64.b64encode(payload).decode(), "sig": self._sign(payload)}
+
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(token), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def _read(self) -> dict | None:
+        try:
+            token = json.loads(self.path.read_text(encoding="utf-8"))
+            payload = base64.b64decode(token["payload"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        if not hmac.compare_digest(self._sign(payload), token.get("sig", "")):
+            return None
+
+        data = json.loads(payload)
+        if data.get("expires_at", 0) < time.time():
+            return None
+        return data
+
+    def issue(self, user: User):
+        self._write({
+            "login": user.login,
+            "name": user.name,
+            "is_admin": bool(user.is_admin),
+            "password_tag": self.password_tag(user.password),
+            "expires_at": time.time() + self.ttl,
+        })
+
+    def load(self) -> CachedSession | None:
+        data = self._read()
+        if data is None:
+            return None
+
+        # пользователь без сессии БД: окну нужны только login/name/is_admin
+        user = User(login=data["login"], name=data["name"], is_admin=data["is_admin"], status=True)
+        return CachedSession(
+            user=user,
+            password_tag=data["password_tag"],
+            expires_at=data["expires_at"],
+        )
+
+    def is_valid_for(self, cached: CachedSession, user: User | None) -> bool:
+        """Фоновая проверка: пользователь жив, активен и пароль не менялся."""
+        return (
+            user is not None
+            and user.status
+            and hmac.compare_digest(self.password_tag(user.password), cached.password_tag)
+        )
+
+    def clear(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+_cache: LoginCache | None = None
+
+
+def get_login_cache() -> LoginCache:
+    global _cache
+    if _cache is None:
+        _cache = LoginCache()
+    return _cache
@@ -0,0 +1,255 @@
+import bisect
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+# Границы корзин гистограмм, секунды: от 1 мс до 1 минуты
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def snapshot(self) -> dict:
+        return {"value": self.value}
+
+
+class Histogram:
+    """Корзины для Prometheus + последние значения для перцентилей в панели."""
+    kind = "histogram"
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS, recent: int = 1024):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # последняя — +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.recent: deque[float] = deque(maxlen=recent)
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        self.recent.append(value)
+
+    def percentile(self, q: float) -> float:
+        if not self.recent:
+            return 0.0
+        values = sorted(self.recent)
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "avg": self.sum / self.count if self.count else 0.0,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "max": self.max,
+        }
+
+
+class Timer:
+    """
+    Замер длительности блока в гистограмму; работает и как with, и как async with.
+    Блок, завершившийся исключением, в гистограмму не попадает — он считается
+    в failures (упавший запуск браузера — не обычный запуск); отмена не считается нигде.
+    """
+
+    def __init__(self, histogram: Histogram, failures: Callable[[], Counter] | None = None):
+        self.histogram = histogram
+        self.failures = failures
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.histogram.observe(time.perf_counter() - self.started)
+        elif issubclass(exc_type, Exception) and self.failures is not None:
+            self.failures().inc()
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+class MetricsRegistry:
+    """
+    Лёгкие метрики горячих путей: счётчики и гистограммы с метками.
+    Запись — несколько арифметических операций, без ввода-вывода;
+    наружу — снимок для панели «Производительность», JSON и текст Prometheus.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: dict[tuple[str, tuple], Counter | Histogram] = {}
+        self.started_at = time.time()
+
+    def _get(self, cls, name: str, labels: dict):
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(key, cls())
+        return metric
+
+    def counter(self, name: str, **labels) -> Counter:
+        return self._get(Counter, name, labels)
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        return self._get(Histogram, name, labels)
+
+    def timer(self, name: str, **labels) -> Timer:
+        """Гистограмма name для удачных замеров и счётчик <name без _seconds>_failures_total для упавших."""
+        failures = name[:-len("_seconds")] if name.endswith("_seconds") else name
+        # счётчик создаётся при первой ошибке — в панели нет строк с нулями
+        return Timer(self.histogram(name, **labels), lambda: self.counter(f"{failures}_failures_total", **labels))
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+            self.started_at = time.time()
+
+    # -------------------- выгрузка --------------------
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            items = list(self._metrics.items())
+        return [
+            {"name": name, "labels": dict(labels), "kind": metric.kind, **metric.snapshot()}
+            for (name, labels), metric in sorted(items, key=lambda i: i[0])
+        ]
+
+    def to_json(self) -> str:
+        return json.dumps({"started_at": self.started_at, "metrics": self.snapshot()}, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        def fmt_labels(labels: tuple, extra: tuple = ()) -> str:
+            pairs = [*labels, *extra]
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+        with self._lock:
+            items = sorted(self._metrics.items(), key=lambda i: i[0])
+
+        lines = []
+        typed = set()
+        for (name, labels), metric in items:
+            if name not in typed:
+                lines.append(f"# TYPE {name} {metric.kind}")
+                typed.add(name)
+
+            if isinstance(metric, Counter):
+                lines.append(f"{name}{fmt_labels(labels)} {metric.value}")
+                continue
+
+            cumulative = 0
+            for bound, count in zip((*metric.buckets, "+Inf"), metric.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{fmt_labels(labels, (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_sum{fmt_labels(labels)} {metric.sum}")
+            lines.append(f"{name}_count{fmt_labels(labels)} {metric.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = MetricsRegistry()
+
+
+def timed(name: str, **labels):
+    """Декоратор: длительность вызова функции (обычной или async) в гистограмму name."""
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with metrics.timer(name, **labels):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.timer(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+# -------------------- источники --------------------
+
+def _statement_kind(statement: str) -> str:
+    verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return verb if verb in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER"
+
+
+def instrument_engine(sync_engine, observers: list[Callable] | None = None):
+    """
+    Время и число SQL-запросов по типу (SELECT/INSERT/...) через события движка SQLAlchemy.
+    observers(statement, parameters, duration) получают тот же замер — второй
+    пары обработчиков со своим стеком времени не нужно (журнал медленных запросов).
+    """
+    from sqlalchemy import event
+
+    observers = list(observers or ())
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_started"].pop()
+        kind = _statement_kind(statement)
+        metrics.histogram("db_query_seconds", kind=kind).observe(duration)
+        metrics.counter("db_queries_total", kind=kind).inc()
+        for observer in observers:
+            observer(statement, parameters, duration)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+        metrics.counter("db_errors_total").inc()
+
+
+_NAVIGATION_MS = """() => {
+    const n = performance.getEntriesByType('navigation')[0];
+    return n ? (n.loadEventEnd || performance.now()) - n.startTime : null;
+}"""
+
+
+def observe_page_loads(page):
+    """Время загрузки каждой навигации страницы Playwright (Navigation Timing, до события load)."""
+
+    async def on_load(p):
+        try:
+            ms = await p.evaluate(_NAVIGATION_MS)
+        except Exception:
+            return  # страница уже закрыта или ушла дальше
+        if ms:
+            metrics.histogram("page_load_seconds").observe(ms / 1000)
+
+    page.on("load", on_load)
@@ -0,0 +1,53 @@
+from enum import Enum
+
+
+class ExecutionMode(str, Enum):
+    """Режим работы браузера на время запуска."""
+    HEADED = "headed"
+    HEADLESS = "headless"
+    OFFSCREEN = "offscreen"
+
+
+MODE_LABELS = {
+    ExecutionMode.HEADED: "С окном",
+    ExecutionMode.HEADLESS: "Без окна",
+    ExecutionMode.OFFSCREEN: "Фоновый (без GPU)",
+}
+
+# Общие флаги для всех режимов
+BASE_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--disable-infobars",
+]
+
+# Фоновый режим: окно есть (для сайтов это обычный headed Chrome),
+# но оно вынесено за пределы экрана и рисуется без GPU и лишней анимации
+OFFSCREEN_ARGS = [
+    "--window-position=-32000,-32000",
+    "--disable-gpu",
+    "--disable-gpu-compositing",
+    "--disable-smooth-scrolling",
+    "--disable-threaded-animation",
+    "--disable-threaded-scrolling",
+]
+# Частоту кадров не снижаем: фиксированного FPS у Chrome нет, а троттлинг
+# перекрытых окон останавливает requestAnimationFrame, на котором Playwright
+# проверяет готовность элементов к клику.
+
+
+def launch_options(mode: ExecutionMode) -> dict:
+    """Параметры chromium.launch / launch_persistent_context для режима."""
+    mode = ExecutionMode(mode)
+    if mode is ExecutionMode.HEADLESS:
+        return {"headless": True, "args": BASE_ARGS + ["--disable-gpu"]}
+    if mode is ExecutionMode.OFFSCREEN:
+        return {"headless": False, "args": BASE_ARGS + OFFSCREEN_ARGS}
+    return {"headless": False, "args": list(BASE_ARGS)}
+
+
+def context_options(mode: ExecutionMode) -> dict:
+    """Параметры контекста, зависящие от режима."""
+    if ExecutionMode(mode) is ExecutionMode.HEADED:
+        return {}
+    # сайт отключает CSS-анимации и переходы — меньше кадров на отрисовку
+    return {"reduced_motion": "reduce"}
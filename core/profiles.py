@@ -0,0 +1,275 @@
+import asyncio
+import os
+import shutil
+import tarfile
+import time
+from pathlib import Path
+
+from core.settings import get_settings, PROFILES_MAX_TOTAL_MB, PROFILE_MAX_IDLE_DAYS
+from core.tasks import spawn, report_error
+from database.db import Database
+from database.queries import get_profile_path
+
+PROFILES_DIR = Path(os.getcwd()) / "profiles"
+ARCHIVE_DIR = PROFILES_DIR / "_archive"
+
+# Кэши Chrome, которые безопасно удалять: браузер пересоздаст их при запуске
+CACHE_DIRS = (
+    "Cache",
+    "Code Cache",
+    "GPUCache",
+    "DawnCache",
+    "GrShaderCache",
+    "ShaderCache",
+    "Service Worker/CacheStorage",
+    "Service Worker/ScriptCache",
+)
+
+LAST_USED_MARK = ".last_used"
+COMPACTED_MARK = ".compacted"
+# размер профиля на момент последнего сжатия: обход всего дерева на каждом запуске слишком дорог
+SIZE_MARK = ".size"
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _mark_age(path: Path) -> float | None:
+    """Сколько секунд прошло с момента касания файла-метки (None — метки нет)."""
+    try:
+        return time.time() - path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _read_size(path: Path) -> int | None:
+    try:
+        return int((path / SIZE_MARK).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+class ProfileStore:
+    """
+    Хранилище профилей Chrome: у каждого аккаунта свой user-data-dir.
+    Умеет считать размер профилей, вычищать кэши по расписанию и
+    архивировать «холодные» профили в tar.gz с ленивым восстановлением.
+    """
+
+    # профили запущенных сессий (общие для всех экземпляров): обслуживание их не трогает
+    in_use: set[str] = set()
+
+    def __init__(self, root: Path = PROFILES_DIR, archive_dir: Path = ARCHIVE_DIR,
+                 compact_interval: int = 24 * 3600, max_profile_bytes: int = 300 * 1024 * 1024):
+        self.root = Path(root)
+        self.archive_dir = Path(archive_dir)
+        self.compact_interval = compact_interval
+        self.max_profile_bytes = max_profile_bytes
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+
+    # -------------------- пути --------------------
+
+    def profile_dir(self, name: str) -> Path:
+        return self.root / name
+
+    def archive_path(self, name: str) -> Path:
+        return self.archive_dir / f"{name}.tar.gz"
+
+    def names(self) -> list[str]:
+        """Все известные профили: и распакованные, и в архиве."""
+        # служебные каталоги (_archive, _state, ...) профилями не считаются
+        live = {p.name for p in self.root.iterdir() if p.is_dir() and not p.name.startswith("_")}
+        archived = {p.name[:-len(".tar.gz")] for p in self.archive_dir.glob("*.tar.gz")}
+        return sorted(live | archived)
+
+    @staticmethod
+    async def resolve_name(phone: str) -> str:
+        """Имя профиля аккаунта: UsersAccounts.path, если задан, иначе телефон."""
+        async with Database().get_session() as session:
+            path = await get_profile_path(session, phone)
+        return path or phone
+
+    # -------------------- жизненный цикл --------------------
+
+    async def acquire(self, name: str) -> Path:
+        """Подготовить профиль к запуску: распаковать из архива и сжать, если пора."""
+        return await asyncio.to_thread(self._acquire, name)
+
+    def _acquire(self, name: str) -> Path:
+        path = self.profile_dir(name)
+        if not path.exists() and self.archive_path(name).exists():
+            self._restore(name)
+        path.mkdir(parents=True, exist_ok=True)
+
+        age = _mark_age(path / COMPACTED_MARK)
+        if age is None or age >= self.compact_interval or (_read_size(path) or 0) > self.max_profile_bytes:
+            self._compact(name)
+
+        (path / LAST_USED_MARK).touch()
+        self.in_use.add(name)
+        return path
+
+    def release(self, name: str):
+        """Сессия закрыла профиль — обслуживание снова может его сжать или архивировать."""
+        self.in_use.discard(name)
+
+    # -------------------- размер --------------------
+
+    def disk_usage(self, name: str) -> int:
+        """Размер профиля в байтах (для архивного — размер tar.gz); по возможности — из кэша."""
+        path = self.profile_dir(name)
+        if path.exists():
+            size = _read_size(path)
+            return size if size is not None else _dir_size(path)
+        archive = self.archive_path(name)
+        return archive.stat().st_size if archive.exists() else 0
+
+    async def usage(self) -> dict[str, int]:
+        return await asyncio.to_thread(lambda: {n: self.disk_usage(n) for n in self.names()})
+
+    # -------------------- сжатие --------------------
+
+    async def compact(self, name: str) -> int:
+        return await asyncio.to_thread(self._compact, name)
+
+    def _compact(self, name: str) -> int:
+        """Удалить кэши Chrome из профиля. Возвращает освобождённые байты."""
+        path = self.profile_dir(name)
+        if not path.exists():
+            return 0
+
+        freed = 0
+        # кэши лежат и в корне user-data-dir, и в подпрофилях (Default, Profile 1, ...)
+        bases = [path] + [p for p in path.iterdir() if p.is_dir()]
+        for base in bases:
+            for rel in CACHE_DIRS:
+                target = base / rel
+                if target.is_dir():
+                    freed += _dir_size(target)
+                    shutil.rmtree(target, ignore_errors=True)
+
+        (path / COMPACTED_MARK).touch()
+        (path / SIZE_MARK).write_text(str(_dir_size(path)))
+        return freed
+
+    async def compact_all(self) -> int:
+        """Плановое сжатие всех распакованных профилей, у которых подошёл срок."""
+        def _run():
+            freed = 0
+            for name in self.names():
+                path = self.profile_dir(name)
+                if not path.exists() or name in self.in_use:
+                    continue
+                age = _mark_age(path / COMPACTED_MARK)
+                if age is None or age >= self.compact_interval:
+                    freed += self._compact(name)
+            return freed
+
+        return await asyncio.to_thread(_run)
+
+    # -------------------- архив --------------------
+
+    async def archive(self, name: str) -> Path | None:
+        return await asyncio.to_thread(self._archive, name)
+
+    def _archive(self, name: str) -> Path | None:
+        path = self.profile_dir(name)
+        if not path.exists():
+            return None
+
+        self._compact(name)
+
+        archive = self.archive_path(name)
+        tmp = archive.with_suffix(".tmp")
+        with tarfile.open(tmp, "w:gz") as tar:
+            tar.add(path, arcname=name)
+        os.replace(tmp, archive)
+
+        shutil.rmtree(path, ignore_errors=True)
+        return archive
+
+    def _restore(self, name: str):
+        archive = self.archive_path(name)
+        with tarfile.open(archive, "r:gz") as tar:
+            tar.extractall(self.root, filter="data")
+        archive.unlink()
+
+    async def archive_cold(self, max_idle: int = 7 * 24 * 3600) -> list[str]:
+        """Заархивировать профили, которые не запускались дольше max_idle секунд."""
+        def _run():
+            archived = []
+            for name in self.names():
+                path = self.profile_dir(name)
+                if not path.exists() or name in self.in_use:
+                    continue
+                age = _mark_age(path / LAST_USED_MARK)
+                if age is None or age >= max_idle:
+                    self._archive(name)
+                    archived.append(name)
+            return archived
+
+        return await asyncio.to_thread(_run)
+
+    async def enforce_limit(self, max_total_bytes: int) -> list[str]:
+        """Архивировать самые давно использованные профили, пока общий объём выше лимита."""
+        def _run():
+            live = [n for n in self.names() if self.profile_dir(n).exists()]
+            sizes = {n: self.disk_usage(n) for n in live}
+            total = sum(sizes.values())
+            live = [n for n in live if n not in self.in_use]
+
+            # самые «холодные» — первыми
+            live.sort(key=lambda n: -(_mark_age(self.profile_dir(n) / LAST_USED_MARK) or float("inf")))
+
+            archived = []
+            for name in live:
+                if total <= max_total_bytes:
+                    break
+                self._archive(name)
+                total -= sizes[name]
+                archived.append(name)
+            return archived
+
+        return await asyncio.to_thread(_run)
+
+    # -------------------- обслуживание --------------------
+
+    async def maintain(self) -> dict:
+        """Один проход: сжать профили, у которых подошёл срок, архивировать холодные, удержать общий объём."""
+        settings = get_settings()
+        freed = await self.compact_all()
+        cold = await self.archive_cold(settings.get(PROFILE_MAX_IDLE_DAYS) * 24 * 3600)
+        over = await self.enforce_limit(settings.get(PROFILES_MAX_TOTAL_MB) * 1024 * 1024)
+        return {"freed": freed, "archived": cold + over}
+
+    async def run_maintenance(self, interval: float = 6 * 3600, initial_delay: float = 60.0):
+        """Обслуживание по расписанию; первый проход — после запуска, чтобы не мешать старту."""
+        await asyncio.sleep(initial_delay)
+        while True:
+            try:
+                await self.maintain()
+            except Exception as e:
+                report_error("profile-maintenance", e, category="profiles")
+            await asyncio.sleep(interval)
+
+
+_maintenance: asyncio.Task | None = None
+
+
+def start_maintenance(store: ProfileStore | None = None) -> asyncio.Task:
+    """Запустить плановое обслуживание профилей (один раз на процесс)."""
+    global _maintenance
+    if _maintenance is None or _maintenance.done():
+        _maintenance = spawn((store or ProfileStore()).run_maintenance(), name="profile-maintenance",
+                             category="profiles")
+    return _maintenance
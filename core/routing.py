@@ -0,0 +1,149 @@
+import re
+
+from core.asset_cache import AssetCache, get_shared_cache
+
+# Типы ресурсов, которые по умолчанию не нужны для работы сценариев
+DEFAULT_BLOCKED_TYPES = ("image", "media", "font")
+
+# Аналитика и реклама: грузятся на каждой странице и тянут трафик через прокси
+DEFAULT_BLOCKED_PATTERNS = (
+    r"google-analytics\.com",
+    r"googletagmanager\.com",
+    r"mc\.yandex\.ru",
+    r"top-fwz1\.mail\.ru",
+    r"vk\.com/rtrg",
+    r"doubleclick\.net",
+)
+
+DEFAULT_CACHED_TYPES = ("script", "stylesheet")
+
+
+class RouteRules:
+    """Набор правил маршрутизации для одного контекста браузера."""
+
+    def __init__(self,
+                 blocked_types=DEFAULT_BLOCKED_TYPES,
+                 blocked_patterns=DEFAULT_BLOCKED_PATTERNS,
+                 cached_types=DEFAULT_CACHED_TYPES,
+                 page_budget_bytes: int | None = 15 * 1024 * 1024,
+                 cache: AssetCache | None = None,
+                 use_cache: bool = True):
+        self.blocked_types = frozenset(blocked_types)
+        self.blocked_re = re.compile("|".join(blocked_patterns)) if blocked_patterns else None
+        self.cached_types = frozenset(cached_types)
+        self.page_budget_bytes = page_budget_bytes
+        self.cache = (cache or get_shared_cache()) if use_cache else None
+
+    def is_blocked(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.blocked_types:
+            return True
+        return bool(self.blocked_re and self.blocked_re.search(url))
+
+
+class RouteStats:
+    def __init__(self):
+        self.requests = 0
+        self.blocked = 0
+        self.over_budget = 0
+        self.cache_hits = 0
+        self.cache_errors = 0
+        self.bytes_loaded = 0
+        self.bytes_saved = 0
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+class NetworkRouter:
+    """
+    Перехват запросов контекста: блокировка по типу/URL, отдача статики
+    из общего кэша AssetCache и бюджет трафика на страницу.
+    """
+
+    def __init__(self, rules: RouteRules | None = None):
+        self.rules = rules or RouteRules()
+        self.stats = RouteStats()
+        self._page_bytes: dict[int, int] = {}
+
+    async def attach(self, context):
+        await context.route("**/*", self._handle)
+        context.on("requestfinished", self._on_finished)
+
+    # -------------------- бюджет --------------------
+
+    @staticmethod
+    def _page_key(request) -> int | None:
+        try:
+            return id(request.frame.page)
+        except Exception:
+            # запросы service worker не привязаны к странице
+            return None
+
+    def _over_budget(self, request) -> bool:
+        budget = self.rules.page_budget_bytes
+        if budget is None or request.is_navigation_request():
+            return False
+        key = self._page_key(request)
+        return key is not None and self._page_bytes.get(key, 0) >= budget
+
+    async def _on_finished(self, request):
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        size = sizes.get("responseBodySize", 0) + sizes.get("responseHeadersSize", 0)
+        self.stats.bytes_loaded += size
+
+        key = self._page_key(request)
+        if key is not None:
+            if request.is_navigation_request() and request.frame.parent_frame is None:
+                # новая навигация главного фрейма — бюджет начинается заново
+                self._page_bytes[key] = 0
+            self._page_bytes[key] = self._page_bytes.get(key, 0) + size
+
+    # -------------------- обработчик --------------------
+
+    async def _handle(self, route):
+        request = route.request
+        self.stats.requests += 1
+
+        if self.rules.is_blocked(request.resource_type, request.url):
+            self.stats.blocked += 1
+            await route.abort("blockedbyclient")
+            return
+
+        if self._over_budget(request):
+            self.stats.over_budget += 1
+            await route.abort("blockedbyclient")
+            return
+
+        cacheable = (
+            self.rules.cache is not None
+            and request.method == "GET"
+            and request.resource_type in self.rules.cached_types
+        )
+        if not cacheable:
+            await route.continue_()
+            return
+
+        try:
+            served = await self.rules.cache.handle(route)
+        except Exception:
+            # сбой сети при route.fetch или закрытая страница при fulfill:
+            # отдаём запрос браузеру, как если бы кэша не было
+            self.stats.cache_errors += 1
+            await self._fallback(route)
+            return
+        if served:
+            self.stats.cache_hits += 1
+            self.stats.bytes_saved += served
+
+    @staticmethod
+    async def _fallback(route):
+        try:
+            await route.continue_()
+        except Exception:
+            try:
+                await route.abort()
+            except Exception:
+                pass  # страница уже закрыта — запрос никому не нужен
@@ -0,0 +1,247 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+from urllib.parse import urljoin
+
+from core.browser import BrowserController
+from core.humanize import PROFILES
+from core.modes import ExecutionMode
+from core.session import BrowserSession
+
+try:
+    import yaml
+    HAS_YAML = True
+except ImportError:
+    HAS_YAML = False
+
+WB_URL = "https://www.wildberries.ru"
+SCENARIOS_DIR = Path(os.getcwd()) / "templates" / "scenarios"
+
+# Селекторы сайта. Фикстуры в templates/fixtures/wildberries — написанные вручную
+# страницы с той же разметкой; селекторы меняются — правятся и они.
+SELECTORS = {
+    "search_input": "#searchInput",
+    "product_card": "article.product-card",
+    "card_link": "a.product-card__link",
+    "add_to_cart": "button.order__button",
+    "cart_counter": ".navbar-pc__notify",
+    "order_status": ".delivery-block__status",
+}
+
+PATHS = {
+    "orders": "/lk/myorders/delivery",
+    "card": "/catalog/{article}/detail.aspx",
+}
+
+
+class ScenarioError(Exception):
+    pass
+
+
+# -------------------- действия --------------------
+# Каждое действие получает страницу, URL сайта, готовые селекторы и параметры шага.
+
+async def _open(session: BrowserSession, base_url, sel, params):
+    await session.page.goto(urljoin(base_url, params.get("path", "/")))
+
+
+async def _search(session: BrowserSession, base_url, sel, params):
+    page = session.page
+    await page.fill(sel["search_input"], params["query"])
+    await page.press(sel["search_input"], "Enter")
+    await page.wait_for_selector(sel["product_card"])
+
+
+async def _open_card(session: BrowserSession, base_url, sel, params):
+    page = session.page
+    if "article" in params:
+        await page.goto(urljoin(base_url, PATHS["card"].format(article=params["article"])))
+    else:
+        await page.locator(sel["card_link"]).nth(params.get("index", 0)).click()
+    await page.wait_for_selector(sel["add_to_cart"])
+
+
+async def _add_to_cart(session: BrowserSession, base_url, sel, params):
+    page = session.page
+    await page.click(sel["add_to_cart"])
+    await page.wait_for_selector(sel["cart_counter"], state="visible")
+    session.results["cart_count"] = (await page.inner_text(sel["cart_counter"])).strip()
+
+
+async def _check_order_status(session: BrowserSession, base_url, sel, params):
+    page = session.page
+    await page.goto(urljoin(base_url, PATHS["orders"]))
+    await page.wait_for_selector(sel["order_status"])
+    statuses = await page.locator(sel["order_status"]).all_inner_texts()
+    session.results["order_status"] = [s.strip() for s in statuses]
+
+
+async def _humanize(session: BrowserSession, base_url, sel, params):
+    # после старта из снимка сайт уже «знает» браузер — прогрев не нужен
+    if session.from_snapshot and not params.get("always", False):
+        return
+
+    humanizer = session.humanizer
+    profile = params.get("profile")
+    if not profile:
+        await humanizer.warm_up(session.page)
+        return
+
+    # профиль шага (например, "fast") — только на время этого шага
+    previous = humanizer.profile
+    humanizer.profile = PROFILES[profile]
+    try:
+        await humanizer.warm_up(session.page)
+    finally:
+        humanizer.profile = previous
+
+
+ACTIONS = {
+    "open": (_open, ()),
+    "search": (_search, ("search_input", "product_card")),
+    "open_card": (_open_card, ("card_link", "add_to_cart")),
+    "add_to_cart": (_add_to_cart, ("add_to_cart", "cart_counter")),
+    "check_order_status": (_check_order_status, ("order_status",)),
+    "humanize": (_humanize, ()),
+}
+
+
+class Scenario:
+    """
+    Декларативный сценарий: список шагов {"action": ..., параметры, "timeout", "retries"}.
+    Шаги проверяются и связываются с действиями и селекторами один раз при создании,
+    затем один объект сценария выполняется параллельно для разных аккаунтов.
+    """
+
+    def __init__(self, steps: list[dict], name: str = "scenario", base_url: str = WB_URL,
+                 selectors: dict | None = None, step_timeout: float = 30.0, retries: int = 0,
+                 retry_delay: float = 1.0):
+        self.name = name
+        self.base_url = base_url
+        self.step_timeout = step_timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.selectors = {**SELECTORS, **(selectors or {})}
+        self._compiled = [self._compile(i, step) for i, step in enumerate(steps)]
+
+    def _compile(self, index: int, step: dict):
+        action = step.get("action")
+        if action not in ACTIONS:
+            raise ScenarioError(f"Шаг {index + 1}: неизвестное действие {action!r}")
+
+        fn, needed = ACTIONS[action]
+        missing = [k for k in needed if not self.selectors.get(k)]
+        if missing:
+            raise ScenarioError(f"Шаг {index + 1} ({action}): нет селекторов {', '.join(missing)}")
+        if action == "humanize" and step.get("profile") and step["profile"] not in PROFILES:
+            raise ScenarioError(f"Шаг {index + 1} (humanize): неизвестный профиль {step['profile']!r}")
+        if action == "search" and not step.get("query"):
+            raise ScenarioError(f"Шаг {index + 1} (search): не задан query")
+
+        params = {k: v for k, v in step.items() if k not in ("action", "timeout", "retries")}
+        # шагу передаём только нужные ему селекторы — словарь собирается один раз
+        sel = {k: self.selectors[k] for k in needed}
+        return (
+            f"{index + 1}. {action}",
+            fn,
+            sel,
+            params,
+            step.get("timeout", self.step_timeout),
+            step.get("retries", self.retries),
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict, **overrides) -> "Scenario":
+        kwargs = {
+            "name": data.get("name", "scenario"),
+            "step_timeout": data.get("step_timeout", 30.0),
+            "retries": data.get("retries", 0),
+        }
+        if "base_url" in data:
+            kwargs["base_url"] = data["base_url"]
+        if "selectors" in data:
+            kwargs["selectors"] = data["selectors"]
+        kwargs.update(overrides)
+        return cls(data.get("steps", []), **kwargs)
+
+    @classmethod
+    def from_file(cls, path: Path, **overrides) -> "Scenario":
+        """JSON или YAML (.yaml/.yml, нужен PyYAML) с той же структурой."""
+        path = Path(path)
+        with open(path, "r", encoding="utf-8") as f:
+            if path.suffix in (".yaml", ".yml"):
+                if not HAS_YAML:
+                    raise ScenarioError(f"{path.name}: для сценариев YAML нужен пакет PyYAML")
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+        return cls.from_dict(data or {}, **overrides)
+
+    async def __call__(self, session: BrowserSession):
+        for name, fn, sel, params, timeout, retries in self._compiled:
+            for attempt in range(retries + 1):
+                try:
+                    await session.step(name, lambda: fn(session, self.base_url, sel, params), timeout)
+                    break
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    if attempt >= retries:
+                        raise
+                    await asyncio.sleep(self.retry_delay * (attempt + 1))
+        session.finish()
+
+
+def load_scenario(name: str = "default", **overrides) -> Scenario:
+    for suffix in (".json", ".yaml", ".yml"):
+        path = SCENARIOS_DIR / f"{name}{suffix}"
+        if path.exists():
+            return Scenario.from_file(path, **overrides)
+    raise ScenarioError(f"Сценарий {name!r} не найден в {SCENARIOS_DIR}")
+
+
+class ScenarioRunner:
+    """Выполнение одного сценария по нескольким аккаунтам параллельно."""
+
+    def __init__(self, scenario: Scenario, concurrency: int = 4,
+                 mode: ExecutionMode = ExecutionMode.HEADED,
+                 on_started=None, on_finished=None, **controller_kwargs):
+        self.scenario = scenario
+        self.concurrency = concurrency
+        self.mode = mode
+        # on_started(phone, controller), on_finished(phone, результат или исключение)
+        self.on_started = on_started
+        self.on_finished = on_finished
+        self.controller_kwargs = controller_kwargs
+        self.controllers: dict[str, BrowserController] = {}
+
+    async def _run_one(self, phone: str, sem: asyncio.Semaphore) -> dict:
+        controller = BrowserController(phone, mode=self.mode, scenario=self.scenario, **self.controller_kwargs)
+        self.controllers[phone] = controller
+        if self.on_started:
+            self.on_started(phone, controller)
+
+        result = None
+        try:
+            async with sem:
+                await controller.run()
+            result = controller.session.results if controller.session else {}
+            return result
+        except BaseException as e:
+            result = e
+            raise
+        finally:
+            self.controllers.pop(phone, None)
+            if self.on_finished:
+                self.on_finished(phone, result)
+
+    async def run(self, phones: list[str]) -> dict[str, dict | Exception]:
+        """Результаты по телефонам: словарь results сессии или исключение."""
+        sem = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*(self._run_one(p, sem) for p in phones), return_exceptions=True)
+        return dict(zip(phones, results))
+
+    def cancel(self):
+        for controller in list(self.controllers.values()):
+            controller.cancel()
@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+from core.humanize import Humanizer
+from core.metrics import metrics
+
+
+class StepTimeoutError(Exception):
+    pass
+
+
+class BrowserSession:
+    """
+    Жизненный цикл одной сессии браузера. Сценарий выполняет шаги через step(),
+    у каждого шага свой таймаут. Сессия завершается, как только сценарий
+    закончился или вызвал finish(), — без фиксированного ожидания.
+    """
+
+    def __init__(self, context, page, step_timeout: float = 30.0, from_snapshot: bool = False,
+                 humanizer: Humanizer | None = None):
+        self.context = context
+        self.page = page
+        self.humanizer = humanizer or Humanizer()
+        self.step_timeout = step_timeout
+        self.from_snapshot = from_snapshot
+        self.steps: list[tuple[str, float]] = []  # (шаг, длительность в секундах)
+        self.results: dict = {}  # данные, собранные сценарием (статусы заказов и т.п.)
+        self._finished = asyncio.Event()
+
+    async def step(self, name: str, action, timeout: float | None = None):
+        """Выполнить шаг: action — функция без аргументов, возвращающая awaitable."""
+        timeout = timeout if timeout is not None else self.step_timeout
+        started = time.monotonic()
+        try:
+            return await asyncio.wait_for(action(), timeout)
+        except asyncio.TimeoutError:
+            raise StepTimeoutError(f"Шаг «{name}» не уложился в {timeout:g} с") from None
+        finally:
+            elapsed = time.monotonic() - started
+            self.steps.append((name, elapsed))
+            metrics.histogram("scenario_step_seconds", step=name).observe(elapsed)
+
+    def finish(self):
+        """Сценарий сообщает, что работа сделана и контекст можно закрывать."""
+        self._finished.set()
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    async def run(self, scenario):
+        """Выполнить сценарий и вернуться сразу по его окончании или по finish()."""
+        scenario_task = asyncio.ensure_future(scenario(self))
+        finished_task = asyncio.ensure_future(self._finished.wait())
+        try:
+            await asyncio.wait({scenario_task, finished_task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # отмена снаружи (кнопка «Стоп», надзор) снимает и сценарий
+            for t in (scenario_task, finished_task):
+                if not t.done():
+                    t.cancel()
+            # сколько времени стоила имитация человека в этом запуске
+            self.results["humanize"] = self.humanizer.stats()
+
+        if scenario_task.done() and not scenario_task.cancelled():
+            # пробрасываем ошибку сценария, если была
+            scenario_task.result()
+        self._finished.set()
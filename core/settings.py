@@ -1,20 +1,160 @@
+import asyncio
+import atexit
 import json
 import os
+import threading
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Callable
 
-CONFIG_PATH = Path(os.path.join(os.getcwd(), "templates\config.json"))
+CONFIG_PATH = Path(os.getcwd()) / "templates" / "config.json"
+# старые версии на Linux/macOS создавали файл с обратным слэшем прямо в имени
+LEGACY_CONFIG_PATH = Path(os.getcwd()) / "templates\\config.json"
 
 
-def load_settings():
-    if CONFIG_PATH.exists():
+@dataclass(frozen=True)
+class Setting:
+    """Типизированный ключ настроек со значением по умолчанию."""
+    key: str
+    type: type
+    default: Any
+
+
+LOGIN = Setting("login", str, "")
+REMEMBER = Setting("remember", bool, False)
+
+RUN_MODE = Setting("run_mode", str, "headed")
+RUN_CONCURRENCY = Setting("run_concurrency", int, 4)
+WORKER_POOL_SIZE = Setting("worker_pool_size", int, 4)
+MAX_SESSIONS = Setting("max_sessions", int, 8)
+
+SLOW_QUERY_MS = Setting("slow_query_ms", int, 200)
+
+# scrypt для паролей (core/credentials.py): N — рабочий фактор, память = 128 * N * r байт;
+# подбирается bench/bench_password.py так, чтобы вход укладывался в ~100 мс
+PASSWORD_SCRYPT_N = Setting("password_scrypt_n", int, 2 ** 14)
+PASSWORD_SCRYPT_R = Setting("password_scrypt_r", int, 8)
+PASSWORD_SCRYPT_P = Setting("password_scrypt_p", int, 1)
+
+PROFILES_MAX_TOTAL_MB = Setting("profiles_max_total_mb", int, 20 * 1024)
+PROFILE_MAX_IDLE_DAYS = Setting("profile_max_idle_days", int, 7)
+
+
+class SettingsStore:
+    """
+    Настройки приложения в памяти. Файл читается один раз, запись —
+    во временный файл с атомарной заменой и с задержкой (debounce), чтобы
+    серия изменений давала одну запись. Подписчики узнают об изменениях сразу.
+    """
+
+    def __init__(self, path: Path = CONFIG_PATH, debounce: float = 0.5):
+        self.path = path
+        self.debounce = debounce
+        self._lock = threading.Lock()
+        self._data = self._read()
+        self._dirty = False
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._subscribers: dict[str | None, list[Callable]] = {}
+        atexit.register(self.flush)
+
+    def _read(self) -> dict:
+        if not self.path.exists() and LEGACY_CONFIG_PATH != self.path and LEGACY_CONFIG_PATH.exists():
+            os.replace(LEGACY_CONFIG_PATH, self.path)
+
         try:
-            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
             return {}
-    return {}
+
+    # -------------------- чтение --------------------
+
+    def get(self, setting: Setting):
+        value = self._data.get(setting.key, setting.default)
+        if isinstance(value, setting.type):
+            return value
+        try:
+            return setting.type(value)
+        except (TypeError, ValueError):
+            return setting.default
+
+    def raw(self, key: str, default=None):
+        return self._data.get(key, default)
+
+    # -------------------- запись --------------------
+
+    def set(self, setting: Setting | str, value):
+        self.update({setting.key if isinstance(setting, Setting) else setting: value})
+
+    def update(self, values: dict):
+        with self._lock:
+            changed = {k: v for k, v in values.items() if self._data.get(k) != v}
+            self._data.update(changed)
+            if changed:
+                self._dirty = True
+
+        if changed:
+            self._schedule_flush()
+            for key, value in changed.items():
+                self._notify(key, value)
+
+    def remove(self, key: str):
+        with self._lock:
+            if self._data.pop(key, None) is None:
+                return
+            self._dirty = True
+        self._schedule_flush()
+        self._notify(key, None)
+
+    def _schedule_flush(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # вне цикла событий (скрипты, бенчмарки) — пишем сразу
+            self.flush()
+            return
+
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.debounce, self.flush)
+
+    def flush(self):
+        with self._lock:
+            self._flush_handle = None
+            if not self._dirty:
+                return
+            payload = json.dumps(self._data, indent=4, ensure_ascii=False)
+            self._dirty = False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    # -------------------- уведомления --------------------
+
+    def subscribe(self, setting: Setting | str | None, callback: Callable) -> Callable[[], None]:
+        """
+        callback(key, value) на изменение ключа (None — на любое изменение).
+        Возвращает функцию отписки.
+        """
+        key = setting.key if isinstance(setting, Setting) else setting
+        self._subscribers.setdefault(key, []).append(callback)
+        return lambda: self._subscribers.get(key, []).remove(callback)
+
+    def _notify(self, key: str, value):
+        for callback in self._subscribers.get(key, []) + self._subscribers.get(None, []):
+            callback(key, value)
+
+
+_store: SettingsStore | None = None
 
 
-def save_settings(data: dict):
-    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+def get_settings() -> SettingsStore:
+    global _store
+    if _store is None:
+        _store = SettingsStore()
+    return _store
@@ -0,0 +1,68 @@
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+
+from core.profiles import PROFILES_DIR
+
+STATE_DIR = PROFILES_DIR / "_state"
+
+
+class StorageStateStore:
+    """
+    Снимки Playwright storage_state (cookies + localStorage) по аккаунтам.
+    Снимок позволяет стартовать лёгкий непостоянный контекст вместо
+    полного профиля Chrome и пропустить прогрев.
+    """
+
+    def __init__(self, root: Path = STATE_DIR, max_age: int = 12 * 3600):
+        self.root = Path(root)
+        self.max_age = max_age
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, name: str) -> Path:
+        return self.root / f"{name}.json"
+
+    def is_fresh(self, data: dict) -> bool:
+        """Снимок пригоден, если он не старше max_age и в нём есть живые cookies."""
+        saved_at = data.get("saved_at", 0)
+        if time.time() - saved_at > self.max_age:
+            return False
+
+        now = time.time()
+        cookies = data.get("state", {}).get("cookies", [])
+        # expires == -1 — сессионная cookie, она живёт в снимке без срока
+        alive = [c for c in cookies if c.get("expires", -1) < 0 or c["expires"] > now]
+        return bool(alive)
+
+    async def load(self, name: str) -> dict | None:
+        """Вернуть storage_state, если снимок есть и он свежий, иначе None."""
+        return await asyncio.to_thread(self._load, name)
+
+    def _load(self, name: str) -> dict | None:
+        path = self.path(name)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return None
+
+        if not self.is_fresh(data):
+            return None
+        return data["state"]
+
+    async def save(self, name: str, state: dict):
+        await asyncio.to_thread(self._save, name, state)
+
+    def _save(self, name: str, state: dict):
+        path = self.path(name)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"saved_at": time.time(), "state": state}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def invalidate(self, name: str):
+        self.path(name).unlink(missing_ok=True)
@@ -0,0 +1,159 @@
+import asyncio
+import time
+import traceback
+from typing import Callable, Coroutine
+
+# Сколько задач категории может выполняться одновременно; категории без лимита не ограничены.
+# "db" — не больше, чем соединений в пуле SQLAlchemy (5 + 10 overflow), с запасом для слотов окна.
+DEFAULT_LIMITS = {
+    "db": 8,
+}
+
+
+class TaskInfo:
+    """Учёт одной фоновой задачи для списка задач и отчёта об ошибках."""
+
+    def __init__(self, name: str, category: str, owner: str | None):
+        self.name = name
+        self.category = category
+        self.owner = owner
+        self.created_at = time.monotonic()
+        self.started_at: float | None = None
+        self.task: asyncio.Task | None = None
+
+    @property
+    def state(self) -> str:
+        return "ожидает" if self.started_at is None else "выполняется"
+
+    @property
+    def duration(self) -> float:
+        return time.monotonic() - (self.started_at or self.created_at)
+
+
+def print_reporter(info: TaskInfo, exc: BaseException):
+    print(f"Ошибка фоновой задачи {info.name} [{info.category}]:")
+    traceback.print_exception(type(exc), exc, exc.__traceback__)
+
+
+class TaskSupervisor:
+    """
+    Владелец всей фоновой работы приложения вместо голых asyncio.create_task:
+    лимиты параллельности по категориям, отмена задач при закрытии
+    виджета-владельца, единый обработчик ошибок и живой список задач.
+    """
+
+    def __init__(self, limits: dict[str, int] | None = None,
+                 reporter: Callable[[TaskInfo, BaseException], None] = print_reporter):
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.reporter = reporter
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._tasks: dict[asyncio.Task, TaskInfo] = {}
+        self._owned: dict[int, set[asyncio.Task]] = {}
+
+    def spawn(self, coro: Coroutine, name: str | None = None, category: str = "ui", owner=None) -> asyncio.Task:
+        """
+        Запустить корутину под надзором. owner — QWidget/QDialog: его задачи
+        отменяются, когда он закрывается (finished) или уничтожается (destroyed).
+        """
+        info = TaskInfo(name or coro.__qualname__, category, type(owner).__name__ if owner is not None else None)
+        task = asyncio.get_running_loop().create_task(self._run(coro, info), name=info.name)
+        info.task = task
+        self._tasks[task] = info
+        task.add_done_callback(self._on_done)
+
+        if owner is not None:
+            self._bind(owner, task)
+        return task
+
+    async def _run(self, coro: Coroutine, info: TaskInfo):
+        limit = self.limits.get(info.category)
+        try:
+            if not limit:
+                info.started_at = time.monotonic()
+                return await coro
+
+            sem = self._semaphores.setdefault(info.category, asyncio.Semaphore(limit))
+            async with sem:
+                info.started_at = time.monotonic()
+                return await coro
+        finally:
+            # отменили ещё в очереди к семафору — корутина так и не стартовала
+            coro.close()
+
+    def _bind(self, owner, task: asyncio.Task):
+        key = id(owner)
+        if key not in self._owned:
+            self._owned[key] = set()
+            owner.destroyed.connect(lambda *_: self.cancel_owned(key))
+            finished = getattr(owner, "finished", None)
+            if finished is not None:
+                finished.connect(lambda *_: self.cancel_owned(key))
+        self._owned[key].add(task)
+
+    def cancel_owned(self, key: int):
+        try:
+            current = asyncio.current_task()
+        except RuntimeError:
+            current = None
+        for task in self._owned.pop(key, set()):
+            # диалог закрывает себя сам из собственной задачи (accept() после сохранения)
+            if task is not current:
+                task.cancel()
+
+    def _on_done(self, task: asyncio.Task):
+        info = self._tasks.pop(task, None)
+        for tasks in self._owned.values():
+            tasks.discard(task)
+
+        if info is None or task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            self.reporter(info, exc)
+
+    def report(self, name: str, exc: BaseException, category: str = "ui"):
+        """Ошибка, которую фоновый цикл поймал и пережил, — в тот же обработчик, что и упавшие задачи."""
+        self.reporter(TaskInfo(name, category, None), exc)
+
+    def cancel_category(self, category: str):
+        for task, info in list(self._tasks.items()):
+            if info.category == category:
+                task.cancel()
+
+    async def shutdown(self):
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def snapshot(self) -> list[dict]:
+        """Текущие задачи, самые долгие сверху."""
+        items = [
+            {
+                "name": info.name,
+                "category": info.category,
+                "owner": info.owner,
+                "state": info.state,
+                "duration": info.duration,
+            }
+            for info in self._tasks.values()
+        ]
+        return sorted(items, key=lambda i: i["duration"], reverse=True)
+
+
+_supervisor: TaskSupervisor | None = None
+
+
+def get_supervisor() -> TaskSupervisor:
+    global _supervisor
+    if _supervisor is None:
+        _supervisor = TaskSupervisor()
+    return _supervisor
+
+
+def report_error(name: str, exc: BaseException, category: str = "ui"):
+    get_supervisor().report(name, exc, category)
+
+
+def spawn(coro: Coroutine, name: str | None = None, category: str = "ui", owner=None) -> asyncio.Task:
+    return get_supervisor().spawn(coro, name=name, category=category, owner=owner)
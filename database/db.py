@@ -1,11 +1,22 @@
-from contextlib import asynccontextmanager
+import asyncio
+import json
+from contextlib import asynccontextmanager, contextmanager
 
-from sqlalchemy import text
+import asyncpg
+from sqlalchemy import text, event
 from sqlalchemy.orm import DeclarativeBase
-from typing import Optional
+from typing import Optional, Callable
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
 from config import DB_URL
+from core.metrics import instrument_engine
+from core.settings import get_settings, SLOW_QUERY_MS
+from core.tasks import spawn, report_error
+from database.slow_queries import SlowQueryLog, SlowQuery
+
+
+# канал pg_notify, в который триггеры (SCHEMA_PATCHES) публикуют изменения строк
+CHANGES_CHANNEL = "marketbuyer_changes"
 
 
 class Base(DeclarativeBase):
@@ -13,6 +24,20 @@ class Base(DeclarativeBase):
     pass
 
 
+class QueryCounter:
+    """Обработчик before_cursor_execute: запоминает выполненные запросы."""
+
+    def __init__(self):
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
 class Database:
     """
     Класс для работы с асинхронным подключением к PostgreSQL через SQLAlchemy.
@@ -26,24 +51,64 @@ class Database:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self, echo: bool = False):
+    def __init__(self, echo: bool = False, url: str | None = None):
         if hasattr(self, "_initialized") and self._initialized:
             return
         self._initialized = True
 
-        self.engine = create_async_engine(DB_URL, echo=echo, pool_pre_ping=True)
+        # url — для тестов на отдельной базе; приложение берёт DB_URL из config.py
+        self.engine = create_async_engine(url or DB_URL, echo=echo, pool_pre_ping=True)
         self.session_factory = async_sessionmaker(self.engine, expire_on_commit=False, class_=AsyncSession )
+        # echo=True пишет всё подряд; журнал медленных запросов — только то, что дольше порога
+        settings = get_settings()
+        self.slow_queries = SlowQueryLog(threshold_ms=settings.get(SLOW_QUERY_MS))
+        instrument_engine(self.engine.sync_engine, observers=[self.slow_queries.observe])
+        settings.subscribe(SLOW_QUERY_MS, lambda _key, value: setattr(self.slow_queries, "threshold_ms", float(value)))
+
+        self._listeners: dict[str, list[Callable]] = {}
+        self._listen_task: asyncio.Task | None = None
 
     async def init_models(self, base: type[Base]):
         """Создать таблицы, если их ещё нет"""
         async with self.engine.begin() as conn:
             await conn.run_sync(base.metadata.create_all)
 
+    async def apply_patches(self, statements: list[str]):
+        """Применить идемпотентные изменения схемы (ALTER ... IF NOT EXISTS и т.п.)"""
+        async with self.engine.begin() as conn:
+            for stmt in statements:
+                await conn.execute(text(stmt))
+
     @asynccontextmanager
     async def get_session(self):
         async with self.session_factory() as session:
             yield session
 
+    @contextmanager
+    def count_queries(self, max_queries: int | None = None):
+        """
+        Считает SQL-запросы внутри блока; при max_queries падает с AssertionError,
+        если их больше. Ловит N+1: число запросов не должно расти с числом строк.
+
+            with db.count_queries(max_queries=3) as counter:
+                await list_accounts_with_users(session)
+        """
+        counter = QueryCounter()
+        event.listen(self.engine.sync_engine, "before_cursor_execute", counter)
+        try:
+            yield counter
+        finally:
+            event.remove(self.engine.sync_engine, "before_cursor_execute", counter)
+
+        if max_queries is not None and counter.count > max_queries:
+            raise AssertionError(
+                f"Выполнено {counter.count} SQL-запросов, допустимо {max_queries}:\n" + "\n".join(counter.statements)
+            )
+
+    async def explain(self, rec: SlowQuery, analyze: bool = True) -> str:
+        """EXPLAIN (ANALYZE, BUFFERS) записанного медленного запроса."""
+        return await SlowQueryLog.explain(self.engine, rec, analyze)
+
     async def test_connection(self) -> bool:
         """Проверка соединения к БД."""
         try:
@@ -52,3 +117,77 @@ class Database:
             return True
         except Exception:
             return False
+
+    # -------------------- LISTEN/NOTIFY --------------------
+
+    def subscribe(self, table: str, callback: Callable) -> Callable[[], None]:
+        """
+        callback(table, op, key) на изменение строки таблицы другой станцией (или этой).
+        op — INSERT/UPDATE/DELETE; после переподключения приходит op="RESYNC" с key=None:
+        уведомления за время обрыва потеряны, подписчик должен перечитать данные.
+        Возвращает функцию отписки.
+        """
+        self._listeners.setdefault(table, []).append(callback)
+        self.start_listener()
+
+        def unsubscribe():
+            if callback in self._listeners.get(table, []):
+                self._listeners[table].remove(callback)
+
+        return unsubscribe
+
+    def start_listener(self):
+        if self._listen_task is None or self._listen_task.done():
+            self._listen_task = spawn(self._listen(), name="db-listen", category="listen")
+
+    async def stop_listener(self):
+        if self._listen_task is not None:
+            self._listen_task.cancel()
+            await asyncio.gather(self._listen_task, return_exceptions=True)
+            self._listen_task = None
+
+    def _dispatch(self, table: str, op: str, key):
+        for callback in list(self._listeners.get(table, [])):
+            try:
+                callback(table, op, key)
+            except Exception as e:
+                report_error(f"notify:{table}", e, category="listen")
+
+    def _on_notify(self, _conn, _pid, _channel, payload: str):
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            return
+        self._dispatch(data.get("table"), data.get("op"), data.get("key"))
+
+    async def _listen(self, retry_delay: float = 5.0):
+        """
+        Отдельное соединение asyncpg вне пула SQLAlchemy: LISTEN держит его
+        занятым всё время работы. При обрыве — переподключение и RESYNC.
+        """
+        dsn = self.engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        first = True
+
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(dsn)
+                closed = asyncio.get_running_loop().create_future()
+                conn.add_termination_listener(lambda _c: closed.done() or closed.set_result(None))
+                await conn.add_listener(CHANGES_CHANNEL, self._on_notify)
+
+                if not first:
+                    for table in list(self._listeners):
+                        self._dispatch(table, "RESYNC", None)
+                first = False
+
+                await closed
+            except asyncio.CancelledError:
+                if conn is not None:
+                    await conn.close()
+                raise
+            except Exception as e:
+                report_error(f"LISTEN {CHANGES_CHANNEL}", e, category="listen")
+                first = False
+
+            await asyncio.sleep(retry_delay)
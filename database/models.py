@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Integer, String, ForeignKey, DateTime, Boolean, UniqueConstraint
+from sqlalchemy import Integer, String, ForeignKey, DateTime, Boolean, UniqueConstraint, Float, Index, text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database.db import Base
@@ -10,13 +10,19 @@ class User(Base):
     __tablename__ = "users"
 
     login: Mapped[str] = mapped_column(String(20), primary_key=True)
-    password: Mapped[str] = mapped_column(String(20), nullable=False)
+    # хэш scrypt (core/credentials.py); старые строки с открытым текстом перехэшируются при входе
+    password: Mapped[str] = mapped_column(String(255), nullable=False)
     name: Mapped[str] = mapped_column(String(50), nullable=False)
     status: Mapped[bool] = mapped_column(Boolean(), default=True, nullable=False)
+    is_admin: Mapped[bool] = mapped_column(Boolean(), default=False, server_default=text("false"), nullable=False)
 
-    accounts_link: Mapped[list["UsersAccounts"]] = relationship(back_populates="user_ref", cascade="all, delete-orphan")
+    # lazy="raise": под AsyncSession неявная подгрузка невозможна, связи грузятся
+    # только явно (selectinload в database/queries.py), без N+1 запросов
+    accounts_link: Mapped[list["UsersAccounts"]] = relationship(back_populates="user_ref", cascade="all, delete-orphan",
+                                                                passive_deletes=True, lazy="raise")
 
-    accounts: Mapped[list["Account"]] = relationship(secondary="users_accounts", back_populates="users", viewonly=True)
+    accounts: Mapped[list["Account"]] = relationship(secondary="users_accounts", back_populates="users", viewonly=True,
+                                                     lazy="raise")
 
 
 class Account(Base):
@@ -28,22 +34,62 @@ class Account(Base):
     user_agent: Mapped[str] = mapped_column(String(200), nullable=False)
     comment: Mapped[str] = mapped_column(String(300), nullable=True)
     status: Mapped[str] = mapped_column(String(20), default='disable', nullable=False)
+    # метка для дельта-синхронизации локального снимка (core/account_snapshot.py);
+    # на сервере её дополнительно ставит триггер — на случай правок мимо ORM
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now(),
+                                                 nullable=False, index=True)
+
+    users_link: Mapped[list["UsersAccounts"]] = relationship(back_populates="account_ref", cascade="all, delete-orphan",
+                                                             passive_deletes=True, lazy="raise")
+
+    users: Mapped[list["User"]] = relationship(secondary="users_accounts", back_populates="accounts", viewonly=True,
+                                               lazy="raise")
 
-    users_link: Mapped[list["UsersAccounts"]] = relationship(back_populates="account_ref", cascade="all, delete-orphan")
 
-    users: Mapped[list["User"]] = relationship(secondary="users_accounts", back_populates="accounts", viewonly=True)
+class AccountFingerprint(Base):
+    __tablename__ = "account_fingerprints"
+
+    phone: Mapped[str] = mapped_column(String(10), ForeignKey("accounts.phone", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True)
+    user_agent: Mapped[str] = mapped_column(String(200), nullable=False)
+    platform: Mapped[str] = mapped_column(String(20), nullable=False)
+    screen_width: Mapped[int] = mapped_column(Integer, nullable=False)
+    screen_height: Mapped[int] = mapped_column(Integer, nullable=False)
+    viewport_width: Mapped[int] = mapped_column(Integer, nullable=False)
+    viewport_height: Mapped[int] = mapped_column(Integer, nullable=False)
+    device_scale_factor: Mapped[float] = mapped_column(Float, nullable=False)
+    hardware_concurrency: Mapped[int] = mapped_column(Integer, nullable=False)
+    device_memory: Mapped[int] = mapped_column(Integer, nullable=False)
+    locale: Mapped[str] = mapped_column(String(10), default="ru-RU", nullable=False)
+    timezone_id: Mapped[str] = mapped_column(String(50), default="Europe/Moscow", nullable=False)
+
+
+class AccountLease(Base):
+    """Аренда аккаунта рабочей станцией: пока аренда не истекла, запускать аккаунт может только holder."""
+    __tablename__ = "account_leases"
+
+    phone: Mapped[str] = mapped_column(String(10), ForeignKey("accounts.phone", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(100), nullable=False)
+    user: Mapped[str | None] = mapped_column(String(20), ForeignKey("users.login", ondelete="SET NULL"), nullable=True)
+    acquired_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+    heartbeat_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
 
 
 class UsersAccounts(Base):
     __tablename__ = "users_accounts"
+    __table_args__ = (
+        # список аккаунтов оператора: один индексный проход по user
+        Index("ix_users_accounts_user_phone", "user", "phone"),
+        Index("ix_users_accounts_phone", "phone"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user: Mapped[str] = mapped_column(String(20), ForeignKey("users.login", ondelete="CASCADE"), nullable=False)
-    phone: Mapped[str] = mapped_column(String(10), ForeignKey("accounts.phone", ondelete="CASCADE"), nullable=False)
+    phone: Mapped[str] = mapped_column(String(10), ForeignKey("accounts.phone", ondelete="CASCADE", onupdate="CASCADE"), nullable=False)
     path: Mapped[str] = mapped_column(String(20), nullable=False)
 
-    user_ref: Mapped["User"] = relationship("User", back_populates="accounts_link")
-    account_ref: Mapped["Account"] = relationship("Account", back_populates="users_link")
+    user_ref: Mapped["User"] = relationship("User", back_populates="accounts_link", lazy="raise")
+    account_ref: Mapped["Account"] = relationship("Account", back_populates="users_link", lazy="raise")
 
 
 class PhoneMessage(Base):
@@ -67,3 +113,173 @@ class Proxy(Base):
     proxy_scheme: Mapped[str] = mapped_column(String(20), nullable=False)
     change_ip_url: Mapped[str] = mapped_column(String(255), nullable=False)
 
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # выборка очереди: ожидающие задачи по приоритету и времени
+        Index("ix_jobs_pick", "status", "priority", "scheduled_at"),
+        # один аккаунт не может выполняться двумя обработчиками одновременно
+        Index("uq_jobs_running_phone", "phone", unique=True, postgresql_where=text("status = 'running'")),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    phone: Mapped[str] = mapped_column(String(10), ForeignKey("accounts.phone", ondelete="CASCADE", onupdate="CASCADE"), nullable=False)
+    scenario: Mapped[str] = mapped_column(String(50), default="default", nullable=False)
+    priority: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), default="pending", nullable=False)
+    scheduled_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3, nullable=False)
+    worker: Mapped[str | None] = mapped_column(String(100), default=None, nullable=True)
+    locked_at: Mapped[datetime | None] = mapped_column(DateTime, default=None, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, default=None, nullable=True)
+    last_error: Mapped[str | None] = mapped_column(String(500), default=None, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+
+
+def _ensure_trigger(table: str, name: str, definition: str, stale: str = "false") -> str:
+    """
+    Создать триггер, только если его нет (или условие stale по строке pg_trigger истинно).
+    DROP/CREATE TRIGGER берут блокировку таблицы — на каждом запуске их не выполняем.
+    """
+    return f"""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_trigger
+            WHERE tgrelid = to_regclass('{table}') AND tgname = '{name}' AND NOT ({stale})
+        ) THEN
+            DROP TRIGGER IF EXISTS {name} ON {table};
+            CREATE TRIGGER {name} {definition};
+        END IF;
+    END $$
+    """
+
+
+# Изменения схемы для уже существующих баз: create_all новые столбцы и индексы
+# в старые таблицы не добавляет. Все команды идемпотентны.
+SCHEMA_PATCHES = [
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS is_admin BOOLEAN NOT NULL DEFAULT false",
+    "CREATE INDEX IF NOT EXISTS ix_users_accounts_user_phone ON users_accounts (\"user\", phone)",
+    "CREATE INDEX IF NOT EXISTS ix_users_accounts_phone ON users_accounts (phone)",
+    # смена телефона аккаунта должна переносить и привязки к операторам
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM pg_constraint
+            WHERE conname = 'users_accounts_phone_fkey' AND confupdtype <> 'c'
+        ) THEN
+            ALTER TABLE users_accounts DROP CONSTRAINT users_accounts_phone_fkey;
+            ALTER TABLE users_accounts ADD CONSTRAINT users_accounts_phone_fkey
+                FOREIGN KEY (phone) REFERENCES accounts (phone) ON DELETE CASCADE ON UPDATE CASCADE;
+        END IF;
+    END $$
+    """,
+    # Однократный перенос при обновлении: до разграничения по users_accounts каждый
+    # оператор видел все аккаунты. Аккаунты без привязки закрепляются за всеми
+    # существующими операторами, а если админов нет — админами становятся все
+    # существующие пользователи (в приложении назначить админа негде).
+    # Отметка в schema_migrations не даёт повторить перенос на следующих запусках.
+    """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        name VARCHAR(100) PRIMARY KEY,
+        applied_at TIMESTAMP NOT NULL DEFAULT now()
+    )
+    """,
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM schema_migrations WHERE name = 'users_accounts_backfill') THEN
+            INSERT INTO users_accounts ("user", phone, path)
+            SELECT u.login, a.phone, a.phone
+            FROM accounts a CROSS JOIN users u
+            WHERE NOT EXISTS (SELECT 1 FROM users_accounts ua WHERE ua.phone = a.phone);
+
+            IF NOT EXISTS (SELECT 1 FROM users WHERE is_admin) THEN
+                UPDATE users SET is_admin = true;
+            END IF;
+
+            INSERT INTO schema_migrations (name) VALUES ('users_accounts_backfill');
+        END IF;
+    END $$
+    """,
+
+    # хэш scrypt длиннее прежнего столбца; ALTER TYPE переписывает таблицу — только если нужно
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'users' AND column_name = 'password' AND character_maximum_length < 255
+        ) THEN
+            ALTER TABLE users ALTER COLUMN password TYPE VARCHAR(255);
+        END IF;
+    END $$
+    """,
+    "ALTER TABLE accounts ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL DEFAULT now()",
+    "CREATE INDEX IF NOT EXISTS ix_accounts_updated_at ON accounts (updated_at)",
+    """
+    CREATE OR REPLACE FUNCTION accounts_touch_updated_at() RETURNS trigger AS $$
+    BEGIN
+        NEW.updated_at := now();
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    _ensure_trigger(
+        "accounts", "trg_accounts_updated_at",
+        "BEFORE UPDATE ON accounts FOR EACH ROW EXECUTE FUNCTION accounts_touch_updated_at()",
+    ),
+    # уведомления об изменениях для других станций (Database.subscribe):
+    # в payload только таблица, операция и ключ — лимит pg_notify 8000 байт
+    """
+    CREATE OR REPLACE FUNCTION marketbuyer_notify_change() RETURNS trigger AS $$
+    DECLARE
+        row_data jsonb;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            row_data := to_jsonb(OLD);
+        ELSE
+            row_data := to_jsonb(NEW);
+        END IF;
+        PERFORM pg_notify('marketbuyer_changes', json_build_object(
+            'table', TG_TABLE_NAME,
+            'op', TG_OP,
+            'key', row_data ->> TG_ARGV[0]
+        )::text);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    *[
+        _ensure_trigger(
+            table, f"trg_{table}_notify",
+            f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION marketbuyer_notify_change('{key}')",
+        )
+        for table, key in (
+            ("accounts", "phone"),
+            ("users_accounts", "phone"),
+            ("proxies", "id"),
+            ("phone_messages", "phone"),
+        )
+    ],
+    # heartbeat каждые 30 с двигает expires_at у каждой аренды — такие UPDATE
+    # не публикуем, иначе станции снова опрашивают аренды; важна только смена holder.
+    # Прежняя версия trg_account_leases_notify срабатывала и на UPDATE (бит 16 tgtype) —
+    # такой триггер пересоздаётся.
+    _ensure_trigger(
+        "account_leases", "trg_account_leases_notify",
+        "AFTER INSERT OR DELETE ON account_leases "
+        "FOR EACH ROW EXECUTE FUNCTION marketbuyer_notify_change('phone')",
+        stale="tgtype & 16 <> 0",
+    ),
+    _ensure_trigger(
+        "account_leases", "trg_account_leases_holder_notify",
+        "AFTER UPDATE ON account_leases "
+        "FOR EACH ROW WHEN (OLD.holder IS DISTINCT FROM NEW.holder) "
+        "EXECUTE FUNCTION marketbuyer_notify_change('phone')",
+    ),
+]
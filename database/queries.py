@@ -0,0 +1,121 @@
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from database.models import Account, User, UsersAccounts
+
+# Связи в моделях объявлены с lazy="raise", поэтому всё, что нужно экрану,
+# подгружается здесь явно: одна выборка на связь, а не запрос на каждую строку.
+# Выборки пользователей и аккаунтов для окон тоже живут здесь — в одном месте
+# видно, какие запросы делает приложение (tests/test_queries.py считает их).
+
+
+# -------------------- пользователи --------------------
+
+async def get_user(session: AsyncSession, login: str, active_only: bool = False) -> User | None:
+    stmt = select(User).where(User.login == login)
+    if active_only:
+        stmt = stmt.where(User.status == True)
+    return await session.scalar(stmt)
+
+
+
+async def get_account_with_users(session: AsyncSession, phone: str) -> Account | None:
+    """Аккаунт вместе с операторами, за которыми он закреплён (2 запроса)."""
+    return await session.scalar(
+        select(Account)
+        .where(Account.phone == phone)
+        .options(selectinload(Account.users))
+    )
+
+
+async def get_user_with_accounts(session: AsyncSession, login: str) -> User | None:
+    """Оператор вместе со своими аккаунтами (2 запроса)."""
+    return await session.scalar(
+        select(User)
+        .where(User.login == login)
+        .options(selectinload(User.accounts))
+    )
+
+
+async def list_accounts_with_users(session: AsyncSession, login: str | None = None) -> list[Account]:
+    """
+    Аккаунты (все или только оператора login) с операторами и ссылками users_accounts.
+    Сколько бы ни было строк — 3 запроса.
+    """
+    stmt = select(Account).options(
+        selectinload(Account.users),
+        selectinload(Account.users_link),
+    ).order_by(Account.phone.desc())
+
+    if login is not None:
+        stmt = stmt.join(UsersAccounts, UsersAccounts.phone == Account.phone).where(UsersAccounts.user == login)
+
+    res = await session.scalars(stmt)
+    return list(res.unique().all())
+
+
+async def list_users_with_accounts(session: AsyncSession) -> list[User]:
+    """Все операторы со своими аккаунтами — 2 запроса."""
+    res = await session.scalars(select(User).options(selectinload(User.accounts)).order_by(User.login))
+    return list(res.all())
+
+
+# -------------------- аккаунты --------------------
+
+async def account_exists(session: AsyncSession, phone: str) -> bool:
+    return await session.scalar(select(Account.phone).where(Account.phone == phone)) is not None
+
+
+async def get_account_user_agent(session: AsyncSession, phone: str) -> str | None:
+    """UA аккаунта ("" — ещё не выдан); None — аккаунта нет."""
+    return await session.scalar(select(Account.user_agent).where(Account.phone == phone))
+
+
+async def used_user_agents(session: AsyncSession) -> set[str]:
+    res = await session.scalars(select(Account.user_agent).where(Account.user_agent != ""))
+    return {ua for ua in res.all() if ua}
+
+
+async def used_names(session: AsyncSession) -> set[str]:
+    res = await session.scalars(select(Account.name).where(Account.name != ""))
+    return {n for n in res.all() if n}
+
+
+async def get_profile_path(session: AsyncSession, phone: str) -> str | None:
+    """UsersAccounts.path аккаунта (имя каталога профиля), если задан."""
+    return await session.scalar(
+        select(UsersAccounts.path)
+        .where(UsersAccounts.phone == phone, UsersAccounts.path != "")
+        .limit(1)
+    )
+
+
+def _visible_to(stmt, login: str | None):
+    """login=None — все аккаунты (режим админа), иначе только закреплённые за оператором."""
+    if login is None:
+        return stmt
+    return stmt.join(
+        UsersAccounts, (UsersAccounts.phone == Account.phone) & (UsersAccounts.user == login)
+    )
+
+
+async def account_rows(session: AsyncSession, login: str | None = None, since: datetime | None = None,
+                       phones: set[str] | None = None) -> list[tuple]:
+    """
+    (phone, comment, status, updated_at) для таблицы: изменённые после since
+    и/или с телефонами из phones. Один запрос, без загрузки ORM-объектов.
+    """
+    stmt = _visible_to(select(Account.phone, Account.comment, Account.status, Account.updated_at), login)
+    if since is not None:
+        stmt = stmt.where(Account.updated_at > since)
+    if phones is not None:
+        stmt = stmt.where(Account.phone.in_(phones))
+    return [tuple(r) for r in (await session.execute(stmt)).all()]
+
+
+async def visible_phones(session: AsyncSession, login: str | None = None) -> set[str]:
+    """Телефоны всех аккаунтов, видимых оператору, — дёшево, только ключи."""
+    return set((await session.scalars(_visible_to(select(Account.phone), login))).all())
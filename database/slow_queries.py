@@ -0,0 +1,145 @@
+import atexit
+import json
+import os
+import queue
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+SLOW_LOG_PATH = Path(os.getcwd()) / "logs" / "slow_queries.jsonl"
+
+
+@dataclass
+class SlowQuery:
+    statement: str
+    params: object  # обезличенные — их можно показывать и писать в файл
+    duration: float
+    at: datetime
+    # настоящие параметры — только в памяти, для EXPLAIN ANALYZE; наружу не отдаются
+    raw_params: object = field(default=None, repr=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "at": self.at.isoformat(timespec="seconds"),
+            "duration_ms": round(self.duration * 1000, 1),
+            "statement": self.statement,
+            "params": self.params,
+        }
+
+
+def redact(params):
+    """Значения параметров заменяются типом и длиной: телефоны, пароли и UA в лог не попадают."""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {k: redact(v) for k, v in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [redact(v) for v in params]
+    if isinstance(params, (str, bytes)):
+        return f"<{type(params).__name__}:{len(params)}>"
+    if isinstance(params, bool):
+        return params
+    return f"<{type(params).__name__}>"
+
+
+class SlowQueryLog:
+    """
+    Журнал медленных запросов: порог в мс, кольцо последних записей в памяти
+    и ротируемый JSONL-файл на диске. Время запросов меряет instrument_engine
+    (core/metrics.py) и передаёт сюда в observe(). Файл пишет отдельный поток:
+    события движка идут в цикле событий, диску там не место.
+    По записи можно снять EXPLAIN (ANALYZE, BUFFERS) — см. explain().
+    """
+
+    def __init__(self, threshold_ms: float = 200.0, capacity: int = 500,
+                 path: Path | None = SLOW_LOG_PATH, max_file_bytes: int = 5 * 1024 * 1024):
+        self.threshold_ms = threshold_ms
+        self.records: deque[SlowQuery] = deque(maxlen=capacity)
+        self.path = path
+        self.max_file_bytes = max_file_bytes
+        self._pending: queue.SimpleQueue[SlowQuery | None] = queue.SimpleQueue()
+        self._writer: threading.Thread | None = None
+
+    def observe(self, statement: str, parameters, duration: float):
+        """Наблюдатель instrument_engine: вызывается на каждый выполненный запрос."""
+        # собственные EXPLAIN не записываем
+        if duration * 1000 < self.threshold_ms or statement.lstrip().upper().startswith("EXPLAIN"):
+            return
+        self.record(statement, parameters, duration)
+
+    def record(self, statement: str, parameters, duration: float):
+        rec = SlowQuery(
+            statement=statement,
+            params=redact(parameters),
+            duration=duration,
+            at=datetime.now(),
+            # executemany: для плана достаточно первого набора параметров
+            raw_params=parameters[0] if isinstance(parameters, list) and parameters else parameters,
+        )
+        self.records.append(rec)
+        if self.path is not None:
+            self._ensure_writer()
+            self._pending.put(rec)
+
+    # -------------------- запись в файл (поток) --------------------
+
+    def _ensure_writer(self):
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="slow-query-log", daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+
+    def close(self, timeout: float = 2.0):
+        """Дописать очередь в файл и остановить поток записи."""
+        if self._writer is not None and self._writer.is_alive():
+            self._pending.put(None)
+            self._writer.join(timeout)
+
+    def _write_loop(self):
+        while True:
+            batch = [self._pending.get()]
+            # всё, что накопилось, — одной записью
+            while not self._pending.empty():
+                batch.append(self._pending.get())
+
+            records = [rec for rec in batch if rec is not None]
+            if records:
+                self._write(records)
+            if len(records) < len(batch):
+                return
+
+    def _write(self, records: list[SlowQuery]):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.path.exists() and self.path.stat().st_size > self.max_file_bytes:
+                # один предыдущий файл — достаточно, чтобы пережить перезапуск
+                os.replace(self.path, self.path.with_suffix(".jsonl.1"))
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(rec.to_dict(), ensure_ascii=False) + "\n" for rec in records)
+        except OSError:
+            pass  # журнал не должен ронять запросы
+
+    def top(self, limit: int = 50) -> list[SlowQuery]:
+        """Самые долгие из последних записей."""
+        return sorted(self.records, key=lambda r: r.duration, reverse=True)[:limit]
+
+    def clear(self):
+        self.records.clear()
+
+    @staticmethod
+    async def explain(engine, rec: SlowQuery, analyze: bool = True) -> str:
+        """
+        План запроса. ANALYZE выполняет запрос по-настоящему, поэтому всё идёт
+        в транзакции, которая откатывается, — INSERT/UPDATE/DELETE ничего не меняют.
+        """
+        options = "ANALYZE, BUFFERS" if analyze else "COSTS"
+
+        async with engine.connect() as conn:
+            trans = await conn.begin()
+            try:
+                res = await conn.exec_driver_sql(f"EXPLAIN ({options}) {rec.statement}", rec.raw_params or ())
+                return "\n".join(row[0] for row in res.all())
+            finally:
+                await trans.rollback()
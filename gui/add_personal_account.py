@@ -1,19 +1,23 @@
 import re
 import random
-import asyncio
 
 from pathlib import Path
 from PySide6.QtCore import Signal, Qt
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QPushButton, QLineEdit, QComboBox,
-                               QMessageBox, QSizePolicy, QFormLayout)
-from sqlalchemy import select, update
+                               QSizePolicy, QFormLayout)
+from sqlalchemy import update
 from sqlalchemy.exc import IntegrityError
 
+import core.app as app_core
+from core.fingerprint import ensure_fingerprint
+from core.tasks import spawn
+from utils.dialogs import show_warning, show_critical
 from database.db import Database
-from database.models import Account
+from database.models import Account, UsersAccounts
+from database.queries import account_exists, used_names, used_user_agents
+from utils.random_tools import get_ua_sampler
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-UA_FILE_PATH = BASE_DIR / "templates" / "files" / "user_agents.txt"
 NAMES_FILE_PATH = BASE_DIR / "templates" / "files" / "russian_names.txt"
 
 
@@ -99,13 +103,13 @@ class AddAccountDialog(QDialog):
         gender = self.gender_combo.currentData()  # будет "Male"/"Female" или None
 
         if not phone_raw:
-            QMessageBox.warning(self, "Ошибка", "Телефон обязателен.")
+            show_warning(self, "Ошибка", "Телефон обязателен.")
             self.phone_edit.setFocus()
             return
 
         phone10 = self._phone_to_10_digits(phone_raw)
         if not phone10:
-            QMessageBox.warning(
+            show_warning(
                 self,
                 "Ошибка",
                 "Телефон должен содержать только цифры РФ.\n"
@@ -119,21 +123,21 @@ class AddAccountDialog(QDialog):
 
         # ✅ Если это режим редактирования — телефон менять нельзя
         if self.account:
-            asyncio.create_task(self._update_async(
+            spawn(self._update_async(
                 name=name,
                 gender=gender,
                 phone10=phone10,
                 user_agent=user_agent,
                 comment=comment
-            ))
+            ), category="db", owner=self)
         else:
-            asyncio.create_task(self._save_async(
+            spawn(self._save_async(
                 name=name,
                 gender=gender,
                 phone10=phone10,
                 user_agent=user_agent,
                 comment=comment
-            ))
+            ), category="db", owner=self)
 
     def load_names(self) -> list[tuple[str, str]]:
         """
@@ -171,27 +175,6 @@ class AddAccountDialog(QDialog):
 
         return uniq
 
-    def _load_user_agents(self) -> list[str]:
-        p = UA_FILE_PATH
-        if not p.exists():
-            return []
-
-        agents: list[str] = []
-        for line in p.read_text(encoding="utf-8", errors="ignore").splitlines():
-            ua = line.strip()
-            if ua:
-                agents.append(ua)
-
-        # убираем дубликаты, сохраняя порядок
-        seen = set()
-        unique = []
-        for ua in agents:
-            if ua not in seen:
-                seen.add(ua)
-                unique.append(ua)
-
-        return unique
-
     def _phone_to_10_digits(self, text: str) -> str | None:
         #  Удаляем ВСЁ, кроме цифр
         digits = re.sub(r"\D", "", text)
@@ -225,36 +208,24 @@ class AddAccountDialog(QDialog):
     async def _pick_user_agent(self, session, preferred: str | None) -> str:
         """
         preferred:
-          - если None/"" -> просто выбираем свободный UA из файла
+          - если None/"" -> берём следующий свободный UA из кольца UASampler
           - если задан -> если он уже используется в БД, выбираем другой
-        Если все из файла заняты -> разрешаем повтор (выбираем из всего списка).
+        Если свободных нет -> разрешаем повтор (следующий из кольца).
         """
-        agents = self._load_user_agents()
-        if not agents:
+        sampler = get_ua_sampler()
+        if not sampler.agents:
             # файла нет или пустой — вернём preferred или пусто
             return preferred or ""
 
         # какие UA уже используются (и не пустые)
-        used_rows = await session.execute(
-            select(Account.user_agent).where(Account.user_agent != "")
-        )
-        used = {ua for (ua,) in used_rows.all() if ua}
+        used = await used_user_agents(session)
 
         # если preferred задан и он НЕ используется — берём его
         if preferred and preferred not in used:
             return preferred
 
-        # иначе пробуем найти свободные из файла
-        free = [ua for ua in agents if ua not in used]
-
-        # если свободных нет — начинаем повторно выбирать из всего списка
-        pool = free if free else agents
-
-        # если preferred задан и он в пуле — уберём его (чтобы "выбрать другой")
-        if preferred:
-            pool = [ua for ua in pool if ua != preferred] or pool
-
-        return random.choice(pool)
+        # одна транзакция кольца вне цикла событий вместо draw() на каждый занятый UA
+        return await sampler.draw_excluding_async(used | {preferred} if preferred else used)
 
     async def pick_name_gender(self, session, selected_gender: str | None = None) -> tuple[str, str]:
         """
@@ -280,10 +251,9 @@ class AddAccountDialog(QDialog):
             if not pool:
                 return ("Без имени", selected_gender or "male")
 
-        used_rows = await session.execute(select(Account.name).where(Account.name != ""))
-        used_names = {n for (n,) in used_rows.all() if n}
+        used = await used_names(session)
 
-        free = [(n, g) for (n, g) in pool if n not in used_names]
+        free = [(n, g) for (n, g) in pool if n not in used]
         candidates = free if free else pool
         return random.choice(candidates)
 
@@ -292,9 +262,8 @@ class AddAccountDialog(QDialog):
 
         try:
             async with Database().get_session() as session:
-                exists = await session.scalar(select(Account.phone).where(Account.phone == phone10))
-                if exists:
-                    QMessageBox.warning(self, "Ошибка", "Аккаунт с таким телефоном уже существует.")
+                if await account_exists(session, phone10):
+                    show_warning(self, "Ошибка", "Аккаунт с таким телефоном уже существует.")
                     self.btn_save.setEnabled(True)
                     return
 
@@ -304,7 +273,7 @@ class AddAccountDialog(QDialog):
 
                 # если имя ввели, а пол не выбрали — требуем выбрать
                 if name and not gender:
-                    QMessageBox.warning(self, "Ошибка", "Выберите пол.")
+                    show_warning(self, "Ошибка", "Выберите пол.")
                     self.btn_save.setEnabled(True)
                     return
 
@@ -325,11 +294,18 @@ class AddAccountDialog(QDialog):
 
                 session.add(acc)
 
+                # аккаунт сразу закрепляем за создавшим оператором, иначе он его не увидит
+                user = app_core.current_user
+                if user:
+                    session.add(UsersAccounts(user=user.login, phone=phone10, path=phone10))
+                # отпечаток считаем один раз при создании, а не на каждом запуске
+                await ensure_fingerprint(session, phone10, ua)
+
                 try:
                     await session.commit()
                 except IntegrityError:
                     await session.rollback()
-                    QMessageBox.warning(self, "Ошибка", "Аккаунт с таким телефоном уже существует.")
+                    show_warning(self, "Ошибка", "Аккаунт с таким телефоном уже существует.")
                     self.btn_save.setEnabled(True)
                     return
 
@@ -337,7 +313,7 @@ class AddAccountDialog(QDialog):
             self.accept()
 
         except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Не удалось сохранить аккаунт:\n{e}")
+            show_critical(self, "Ошибка", f"Не удалось сохранить аккаунт:\n{e}")
             self.btn_save.setEnabled(True)
 
     async def _update_async(self, name, gender, phone10, user_agent, comment):
@@ -350,11 +326,8 @@ class AddAccountDialog(QDialog):
             async with Database().get_session() as session:
                 # ✅ если телефон изменили — проверяем, что такого ещё нет
                 if phone10 != old_phone10:
-                    exists = await session.scalar(
-                        select(Account.phone).where(Account.phone == phone10)
-                    )
-                    if exists:
-                        QMessageBox.warning(self, "Ошибка", "Аккаунт с таким телефоном уже существует.")
+                    if await account_exists(session, phone10):
+                        show_warning(self, "Ошибка", "Аккаунт с таким телефоном уже существует.")
 
                         # ✅ ОТКАТ: возвращаем телефон в поле как было
                         self.phone_edit.setText(self.account.get("phone_view", ""))
@@ -373,13 +346,23 @@ class AddAccountDialog(QDialog):
                         comment=comment,
                     )
                 )
+                if phone10 != old_phone10:
+                    # привязки переехали каскадом, path по умолчанию совпадает с телефоном
+                    await session.execute(
+                        update(UsersAccounts)
+                        .where(UsersAccounts.phone == phone10, UsersAccounts.path == old_phone10)
+                        .values(path=phone10)
+                    )
+                if user_agent:
+                    # UA мог смениться — отпечаток пересчитается под новый
+                    await ensure_fingerprint(session, phone10, user_agent)
                 await session.commit()
 
             self.account_saved.emit()
             self.accept()
 
         except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Не удалось обновить аккаунт:\n{e}")
+            show_critical(self, "Ошибка", f"Не удалось обновить аккаунт:\n{e}")
             self.btn_save.setEnabled(True)
 
 
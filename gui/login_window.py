@@ -1,3 +1,4 @@
+import asyncio
 import base64
 import os
 
@@ -7,9 +8,11 @@ from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButt
 from qasync import asyncSlot
 
 import core.app as app_core
-from core.settings import save_settings, load_settings
-from database.models import User
-from sqlalchemy import select
+from core.credentials import check_and_upgrade, remember_password, recall_password, forget_password
+from core.login_cache import get_login_cache
+from core.settings import get_settings, LOGIN, REMEMBER
+from database.queries import get_user
+from utils.dialogs import show_warning
 from utils.messagebox import CustomMessageBox
 
 
@@ -79,22 +82,28 @@ class LoginWindow(QWidget):
 
     def _load_saved_credentials(self):
         """Загрузить сохранённый логин/пароль, если включено 'Запомнить'."""
-        self.settings = load_settings()
+        self.settings = get_settings()
 
-        saved_login = self.settings.get("login")
-        saved_password = self.settings.get("password")
-        remember = self.settings.get("remember", False)
+        saved_login = self.settings.get(LOGIN)
+        remember = self.settings.get(REMEMBER)
+
+        if self.settings.raw("password"):
+            # раньше пароль лежал в config.json в base64 — переносим в хранилище ОС и удаляем
+            try:
+                legacy = base64.b64decode(self.settings.raw("password")).decode()
+                if remember and saved_login:
+                    remember_password(saved_login, legacy)
+            except Exception:
+                pass
+            self.settings.remove("password")
 
         if remember:
             if saved_login:
                 self.login.setText(saved_login)
 
-            if saved_password:
-                try:
-                    decoded_pass = base64.b64decode(saved_password).decode()
-                    self.password.setText(decoded_pass)
-                except Exception:
-                    pass
+                saved_password = recall_password(saved_login)
+                if saved_password:
+                    self.password.setText(saved_password)
 
             self.remember_cb.setChecked(True)
 
@@ -133,50 +142,61 @@ class LoginWindow(QWidget):
     @asyncSlot()
     async def try_login(self):
         if app_core.db is None:
-            CustomMessageBox.warning(self, "База данных", "База данных ещё не готова.")
+            show_warning(self, "База данных", "База данных ещё не готова.", box_class=CustomMessageBox)
             return
 
         login = self.login.text().lower().strip()
         if not login:
-            CustomMessageBox.warning(self, "Ошибка авторизации", "Введите логин.")
+            show_warning(self, "Ошибка авторизации", "Введите логин.", box_class=CustomMessageBox)
             return
 
         password = self.password.text().strip()
         if not password:
-            CustomMessageBox.warning(self, "Ошибка авторизации", "Введите пароль.")
+            show_warning(self, "Ошибка авторизации", "Введите пароль.", box_class=CustomMessageBox)
             return
 
         self.set_loading(True, "Проверка пользователя...")
 
         user = None
+        valid = False
 
         async with app_core.db.get_session() as session:
-            stmt = select(User).where(User.login == login, User.password == password, User.status == True)
-            res = await session.execute(stmt)
-            user = res.scalar_one_or_none()
+            user = await get_user(session, login, active_only=True)
+
+            if user is not None:
+                # KDF занимает десятки миллисекунд — считаем в пуле потоков, чтобы не замораживать окно
+                valid, new_hash = await asyncio.to_thread(check_and_upgrade, password, user.password)
+                if valid and new_hash:
+                    # открытый текст или устаревшие параметры — сохраняем свежий хэш
+                    user.password = new_hash
+                    await session.commit()
 
         self.set_loading(False)
 
-        if user is None:
-            CustomMessageBox.warning(self, "Ошибка", "Неверный логин или пароль")
+        if user is None or not valid:
+            show_warning(self, "Ошибка", "Неверный логин или пароль", box_class=CustomMessageBox)
             return
 
         if self.remember_cb.isChecked():
-            encoded_pass = base64.b64encode(password.encode()).decode()
-
-            save_settings({
-                "login": login,
-                "password": encoded_pass,
-                "remember": True,
+            # пароль — только в хранилище ОС; без keyring запоминается лишь логин
+            remember_password(login, password)
+            # локальная сессия: следующий запуск откроет главное окно без входа
+            get_login_cache().issue(user)
+            self.settings.update({
+                LOGIN.key: login,
+                REMEMBER.key: True,
             })
         else:
             # если галочка снята — очищаем
-            save_settings({
-                "login": "",
-                "password": "",
-                "remember": False,
+            forget_password(self.settings.get(LOGIN) or login)
+            get_login_cache().clear()
+            self.settings.update({
+                LOGIN.key: "",
+                REMEMBER.key: False,
             })
 
+        app_core.current_user = user
+
         from gui.main_window import MainWindow
         self.hide()
         self.main = MainWindow(user)
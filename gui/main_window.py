@@ -4,11 +4,25 @@ from PySide6.QtGui import QAction, QColor, QIcon, QPainter
 from PySide6.QtCore import Qt, QSize, Signal, QRect, QTimer, QPropertyAnimation, QEasingCurve
 from PySide6.QtWidgets import (QDialog, QHBoxLayout, QPushButton, QMainWindow, QWidget, QVBoxLayout,
                                QTableWidgetItem, QTableWidget, QHeaderView, QAbstractItemView, QLineEdit,
-                               QStyleOptionButton, QStyle, QCheckBox, QMessageBox, QToolButton, QFrame, QLabel)
+                               QStyleOptionButton, QStyle, QCheckBox, QMessageBox, QToolButton, QFrame, QLabel,
+                               QComboBox)
 from qasync import asyncSlot
 
+import core.app as app_core
+from core.governor import get_governor
+from core.leases import LeaseManager, get_lease_manager
+from core.account_snapshot import get_account_snapshot
+from core.metrics import timed
+from core.modes import MODE_LABELS
+from core.settings import get_settings, RUN_MODE, RUN_CONCURRENCY, WORKER_POOL_SIZE
+from core.tasks import spawn, get_supervisor, print_reporter
+
 from gui.add_personal_account import AddAccountDialog
 from gui.setting_menu_bar import  ProxyManagerDialog
+from gui.metrics_panel import MetricsPanel
+from gui.slow_queries_dialog import SlowQueriesDialog
+from gui.tasks_dialog import TasksDialog
+from utils.dialogs import ask, exec_async, show_warning, show_information
 
 from sqlalchemy import select, delete, update
 
@@ -62,9 +76,11 @@ class CheckBoxHeader(QHeaderView):
 
 class MainWindow(QMainWindow):
 
-    def __init__(self, user):
+    def __init__(self, user, defer_sync: bool = False):
         super().__init__()
         self.user = user
+        self.snapshot = get_account_snapshot()
+        self._shown_scope = None
 
         # Заголовок
         self.setWindowTitle(f"MarketBuyer – {user.login}")
@@ -92,7 +108,20 @@ class MainWindow(QMainWindow):
         icon_action = QAction(QIcon("templates/icons/find.png"), "", self)
         self.search_input.addAction(icon_action, QLineEdit.LeadingPosition)
 
+        # режим браузера для запусков из таблицы
+        self.mode_combo = QComboBox()
+        for mode, label in MODE_LABELS.items():
+            self.mode_combo.addItem(label, mode)
+        self.mode_combo.setCurrentIndex(self.mode_combo.findData(app_core.run_mode))
+        self.mode_combo.setMinimumHeight(35)
+        self.mode_combo.setToolTip("Режим браузера")
+        self.mode_combo.currentIndexChanged.connect(
+            lambda _i: get_settings().set(RUN_MODE, self.mode_combo.currentData().value)
+        )
+
         self.btn_add = QPushButton("Добавить ЛК")
+        self.btn_run_checked = QPushButton("Запуск отмеченных")
+        self.btn_run_checked.clicked.connect(self.on_run_checked_clicked)
         self.btn_activate = QPushButton("Активировать")
         self.btn_filter = QToolButton()
         self.btn_filter.setCheckable(True)
@@ -104,12 +133,14 @@ class MainWindow(QMainWindow):
         self.btn_filter.setFixedSize(35, 35)
         self.btn_add.clicked.connect(self.add_personal_account)
 
-        for b in (self.btn_add, self.btn_activate):
+        for b in (self.btn_add, self.btn_run_checked, self.btn_activate):
             b.setMinimumHeight(35)
 
         top_row.addWidget(self.btn_filter)
         top_row.addWidget(self.search_input)
         top_row.addStretch()
+        top_row.addWidget(self.mode_combo)
+        top_row.addWidget(self.btn_run_checked)
         top_row.addWidget(self.btn_add)
         top_row.addWidget(self.btn_activate)
         main_layout.addLayout(top_row)
@@ -140,6 +171,13 @@ class MainWindow(QMainWindow):
 
         row_layout.addWidget(self.cb_enable)
         row_layout.addWidget(self.cb_disable)
+
+        # только для админа: показать аккаунты всех операторов
+        self.cb_all_accounts = QCheckBox("Все аккаунты", row)
+        self.cb_all_accounts.setVisible(bool(user.is_admin))
+        self.cb_all_accounts.toggled.connect(lambda _checked: self.load_accounts())
+        row_layout.addWidget(self.cb_all_accounts)
+
         row_layout.addStretch()  # всё прижать влево
 
         self.filter_layout.addWidget(row)
@@ -156,6 +194,8 @@ class MainWindow(QMainWindow):
         # ================== 2) Таблица ==================
         self.table = QTableWidget()
         self._filling_table = False
+        self.running = {}  # phone10 -> BrowserController запущенных сессий
+        self.worker_pool = None  # обработчики общей очереди задач (core.job_queue)
         self.table.itemChanged.connect(self.on_table_item_changed)
         # Запрет на редактирование в таблице
         self.table.setEditTriggers(
@@ -164,8 +204,8 @@ class MainWindow(QMainWindow):
         )
 
 
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["", "Номер телефона", "Статус", "Комментарий", "Действие"])
+        self.table.setColumnCount(6)
+        self.table.setHorizontalHeaderLabels(["", "Номер телефона", "Статус", "Комментарий", "Сессия", "Действие"])
         self.table.setSelectionMode(QAbstractItemView.NoSelection)
 
         self.header = CheckBoxHeader(Qt.Horizontal, self.table)
@@ -182,11 +222,13 @@ class MainWindow(QMainWindow):
         header.setSectionResizeMode(1, QHeaderView.Interactive)
         header.setSectionResizeMode(2, QHeaderView.Interactive)
         header.setSectionResizeMode(3, QHeaderView.Stretch)
-        header.setSectionResizeMode(4, QHeaderView.Fixed)
+        header.setSectionResizeMode(4, QHeaderView.Interactive)
+        header.setSectionResizeMode(5, QHeaderView.Fixed)
 
         self.table.setColumnWidth(1, 120)
         self.table.setColumnWidth(2, 110)
-        self.table.setColumnWidth(4, 200)
+        self.table.setColumnWidth(4, 160)
+        self.table.setColumnWidth(5, 200)
 
         main_layout.addWidget(self.table, stretch=1)
 
@@ -205,34 +247,151 @@ class MainWindow(QMainWindow):
         QPushButton:hover { background-color: rgba(0, 120, 215, 40); }
         """
 
-        # ✅ Запускаем загрузку из БД сразу после создания UI
-        QTimer.singleShot(0, self.load_accounts)
-
-    # -------------------- DB: достаём phone/comment/status --------------------
-
-    async def get_accounts_for_table(self):
-        async with Database().get_session() as session:
-            stmt = select(
-                Account.phone,
-                Account.comment,
-                Account.status
-            ).order_by(Account.phone.desc())
-            res = await session.execute(stmt)
-            return res.all()  # [(phone, comment, status), ...]
+        # ================== 3) Метрики сессий браузера ==================
+        self.metrics_label = QLabel()
+        self.statusBar().addPermanentWidget(self.metrics_label)
+
+        # панель «Производительность» — справа, скрыта до вызова из меню
+        self.metrics_panel = MetricsPanel(self)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.metrics_panel)
+        self.metrics_panel.hide()
+        self.help_menu.insertAction(self.tasks_action, self.metrics_panel.toggleViewAction())
+
+        # ошибки всех фоновых задач — в одно место
+        self.tasks_dialog = None
+        get_supervisor().reporter = self.report_task_error
+
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.setInterval(2000)
+        self.metrics_timer.timeout.connect(self.update_session_metrics)
+        self.metrics_timer.start()
+        self.update_session_metrics()
+
+        # захват и снятие аренды приходят через LISTEN/NOTIFY; истечение TTL —
+        # не запись в БД, уведомления о нём нет, поэтому редкий опрос остаётся
+        self.lease_timer = QTimer(self)
+        self.lease_timer.setInterval(60000)
+        self.lease_timer.timeout.connect(self.refresh_leases)
+        self.lease_timer.start()
+
+        # изменения от других станций (Database.subscribe) копятся и применяются пачкой
+        self._pending_changes: set[str] = set()
+        self._live_updates = []
+        self.change_timer = QTimer(self)
+        self.change_timer.setSingleShot(True)
+        self.change_timer.setInterval(300)
+        self.change_timer.timeout.connect(self.apply_remote_changes)
+
+        # таблица сразу из локального снимка, с сервером — только дельта
+        self.show_snapshot()
+        if not defer_sync:
+            # ✅ Запускаем синхронизацию с БД сразу после создания UI
+            QTimer.singleShot(0, self.load_accounts)
+        # при defer_sync окно открыто из локальной сессии, синхронизацию запустит main.py
+
+    # -------------------- снимок аккаунтов: phone/comment/status --------------------
+
+    def _snapshot_scope(self) -> tuple[str, str | None]:
+        """(ключ снимка, login для фильтра users_accounts или None — все аккаунты)."""
+        # админ в режиме «все аккаунты» видит всё, остальные — только свои через users_accounts
+        if self.user.is_admin and self.cb_all_accounts.isChecked():
+            return f"{self.user.login}:all", None
+        return self.user.login, self.user.login
 
     # -------------------- UI: загрузка + заполнение --------------------
 
+    def show_snapshot(self):
+        """Заполнить таблицу из локального снимка; аренды подтянет refresh_leases."""
+        scope, _login = self._snapshot_scope()
+        self._shown_scope = scope
+        self.fill_table([(phone, comment, status, None, None) for phone, comment, status in self.snapshot.rows(scope)])
+
     @asyncSlot()
     async def load_accounts(self):
-        rows = await self.get_accounts_for_table()
-        self.fill_table(rows)
+        scope, login = self._snapshot_scope()
+        if scope != self._shown_scope:
+            # переключили «Все аккаунты» — сначала то, что уже есть локально
+            self.show_snapshot()
+
+        updated, added, removed = await self.snapshot.sync(scope, login)
+        if updated or added or removed:
+            self.show_snapshot()
+        self.refresh_leases()
+
+        if not self._live_updates:
+            # БД точно доступна — подписываемся на изменения других станций
+            db = Database()
+            self._live_updates = [
+                db.subscribe(table, self.on_db_change)
+                for table in ("accounts", "users_accounts", "account_leases", "phone_messages")
+            ]
+
+    def on_db_change(self, table: str, op: str, key):
+        if table == "phone_messages":
+            if op == "INSERT" and key:
+                self.statusBar().showMessage(f"Новое сообщение: {self.format_phone_ru(key)}", 10000)
+            return
+
+        self._pending_changes.add("leases" if table == "account_leases" else "accounts")
+        if op == "RESYNC":
+            self._pending_changes.update(("accounts", "leases"))
+        self.change_timer.start()
+
+    @asyncSlot()
+    async def apply_remote_changes(self):
+        pending, self._pending_changes = self._pending_changes, set()
+
+        if "accounts" in pending:
+            scope, login = self._snapshot_scope()
+            updated, added, removed = await self.snapshot.sync(scope, login)
+            if added or removed:
+                # строки сдвигаются — кнопки в ячейках привязаны к номеру строки, перестраиваем
+                self.show_snapshot()
+                pending.add("leases")
+            elif updated:
+                self._update_rows(updated)
+
+        if "leases" in pending:
+            self.refresh_leases()
+
+    def _update_rows(self, phones: set[str]):
+        """Обновить статус и комментарий изменённых аккаунтов на месте, без перестройки таблицы."""
+        scope, _login = self._snapshot_scope()
+        fresh = {phone: (comment, status) for phone, comment, status in self.snapshot.rows(scope) if phone in phones}
+
+        self._filling_table = True
+        self.table.blockSignals(True)
+        for row in range(self.table.rowCount()):
+            phone_item = self.table.item(row, 1)
+            phone = phone_item.data(Qt.UserRole) if phone_item else None
+            if phone not in fresh:
+                continue
+
+            comment, status = fresh[phone]
+            item_status = self.table.item(row, 2)
+            item_status.setText(status or "")
+            self._paint_status(item_status, status)
+            self.table.item(row, 3).setText(comment or "")
+        self.table.blockSignals(False)
+        self._filling_table = False
+
+    @staticmethod
+    def _paint_status(item: QTableWidgetItem, status: str | None):
+        st = (status or "").strip().lower()
+        if st == "enable":
+            item.setBackground(QColor(0, 200, 0, 35))
+        elif st == "disable":
+            item.setBackground(QColor(255, 0, 0, 35))
+        else:
+            item.setBackground(QColor(0, 0, 0, 0))
 
+    @timed("table_fill_seconds")
     def fill_table(self, rows):
         self._filling_table = True
         self.table.blockSignals(True)
         self.table.setRowCount(len(rows))
 
-        for row, (phone, comment, status) in enumerate(rows):
+        for row, (phone, comment, status, holder, lease_user) in enumerate(rows):
             # ---------- ЧЕКБОКС ----------
             checkbox = QCheckBox()
             box0 = QWidget()
@@ -260,9 +419,13 @@ class MainWindow(QMainWindow):
             item_status.setFlags(item_status.flags() & ~Qt.ItemIsEditable)
             self.table.setItem(row, 3, item_comment)
 
+            item_lease = QTableWidgetItem()
+            item_lease.setFlags(item_lease.flags() & ~Qt.ItemIsEditable)
+            self.table.setItem(row, 4, item_lease)
+            self._set_lease_item(item_lease, holder, lease_user)
 
             # ---------- КНОПКИ В ЯЧЕЙКЕ ----------
-            btn_run = QPushButton("Запуск")
+            btn_run = QPushButton("Стоп" if phone in self.running else "Запуск")
             btn_run.setFixedSize(105, 25)
             btn_run.setStyleSheet(self.style_run_btn)
 
@@ -286,16 +449,12 @@ class MainWindow(QMainWindow):
             h_layout.addWidget(btn_settings)
             h_layout.addWidget(btn_delete)
 
-            self.table.setCellWidget(row, 4, container)
+            self.table.setCellWidget(row, 5, container)
 
             # ---------- ЦВЕТ СТАТУСА ----------
             item_status = self.table.item(row, 2)
             if item_status:
-                st = (status or "").strip().lower()
-                if st == "enable":
-                    item_status.setBackground(QColor(0, 200, 0, 35))
-                elif st == "disable":
-                    item_status.setBackground(QColor(255, 0, 0, 35))
+                self._paint_status(item_status, status)
 
             # ---------- обработчики ----------
             btn_run.clicked.connect(lambda _, r=row: self.on_run_clicked(r))
@@ -310,12 +469,61 @@ class MainWindow(QMainWindow):
 
 
 
+    def _set_lease_item(self, item: QTableWidgetItem, holder: str | None, lease_user: str | None):
+        if not holder:
+            item.setText("свободен")
+            item.setToolTip("")
+            item.setForeground(QColor(150, 150, 150))
+            return
+
+        if holder == get_lease_manager().holder:
+            item.setText("эта станция")
+        else:
+            # holder = "машина:pid" — оператору достаточно машины
+            item.setText(f"{lease_user or '—'} @ {holder.rsplit(':', 1)[0]}")
+        item.setToolTip(f"Аренда: {holder}")
+        item.setForeground(QColor(255, 170, 0))
+
+    @asyncSlot()
+    async def refresh_leases(self):
+        """Обновить колонку «Сессия» без перезагрузки всей таблицы."""
+        leases = await LeaseManager.active_leases()
+
+        self._filling_table = True
+        self.table.blockSignals(True)
+        for row in range(self.table.rowCount()):
+            phone_item = self.table.item(row, 1)
+            lease_item = self.table.item(row, 4)
+            if phone_item and lease_item:
+                holder, lease_user = leases.get(phone_item.data(Qt.UserRole), (None, None))
+                self._set_lease_item(lease_item, holder, lease_user)
+        self.table.blockSignals(False)
+        self._filling_table = False
+
+    def update_session_metrics(self):
+        snap = get_governor().snapshot()
+        mb = 1024 * 1024
+
+        text = (f"Сессий: {len(snap['sessions'])}   "
+                f"RAM браузеров: {snap['total_rss'] // mb} МБ   "
+                f"Свободно: {snap['available'] // mb} МБ")
+        if snap["pressure"]:
+            text += "   ⚠ мало памяти, запуски на паузе"
+        self.metrics_label.setText(text)
+
+        lines = [
+            f"{s['name']}: {s['state']}, {s['rss'] // mb} МБ, CPU {s['cpu_percent']:.0f}%, {s['age']:.0f} с"
+            for s in snap["sessions"]
+        ]
+        self.metrics_label.setToolTip("\n".join(lines) or "Нет активных сессий")
+
     def create_menu_bar(self):
         menu_bar = self.menuBar()
 
         # --- Основные меню ---
         self.file_menu = menu_bar.addMenu("Файл")
         self.settings_menu = menu_bar.addMenu("Настройки")
+        self.queue_menu = menu_bar.addMenu("Очередь")
         self.help_menu = menu_bar.addMenu("Справка")
 
         # --- Линия под меню баром----
@@ -328,10 +536,20 @@ class MainWindow(QMainWindow):
 
         self.settings_action = QAction("ProxyManager", self)
         self.about_action = QAction("О программе", self)
+        self.tasks_action = QAction("Фоновые задачи", self)
+        self.slow_queries_action = QAction("Медленные запросы", self)
+
+        self.enqueue_action = QAction("Поставить отмеченные в очередь", self)
+        self.workers_action = QAction("Обработчики очереди", self)
+        self.workers_action.setCheckable(True)
 
         # --- Обработчики ---
         self.exit_action.triggered.connect(self.close)
         self.settings_action.triggered.connect(self.open_settings)
+        self.tasks_action.triggered.connect(self.open_tasks)
+        self.slow_queries_action.triggered.connect(self.open_slow_queries)
+        self.enqueue_action.triggered.connect(self.on_enqueue_checked)
+        self.workers_action.toggled.connect(self.on_workers_toggled)
 
         # --- Заполняем меню ---
         self.file_menu.addAction(self.open_action)
@@ -339,8 +557,27 @@ class MainWindow(QMainWindow):
         self.file_menu.addSeparator()
         self.file_menu.addAction(self.exit_action)
         self.settings_menu.addAction(self.settings_action)
+        self.queue_menu.addAction(self.enqueue_action)
+        self.queue_menu.addAction(self.workers_action)
+        self.help_menu.addAction(self.tasks_action)
+        self.help_menu.addAction(self.slow_queries_action)
         self.help_menu.addAction(self.about_action)
 
+    def open_tasks(self):
+        if self.tasks_dialog is None:
+            self.tasks_dialog = TasksDialog(self)
+        self.tasks_dialog.show()
+        self.tasks_dialog.raise_()
+
+    def open_slow_queries(self):
+        dlg = SlowQueriesDialog(self)
+        dlg.setAttribute(Qt.WA_DeleteOnClose)
+        dlg.show()
+
+    def report_task_error(self, info, exc: BaseException):
+        print_reporter(info, exc)
+        self.statusBar().showMessage(f"Ошибка в фоне ({info.name}): {exc}", 10000)
+
     def _toggle_filter_panel(self, opened: bool):
         self.filter_anim.stop()
 
@@ -376,20 +613,120 @@ class MainWindow(QMainWindow):
 
         dlg = AddAccountDialog(self)
         dlg.account_saved.connect(self.load_accounts)  # load_accounts у тебя @asyncSlot()
-        dlg.exec()
+        dlg.open()  # не exec(): вложенный цикл событий останавливает фоновые задачи
 
-    def open_settings(self):
+    @asyncSlot()
+    async def open_settings(self):
 
         dlg = ProxyManagerDialog(self)  # parent = MainWindow
-        result = dlg.exec()  # ← ВАЖНО: exec(), не show()
+        result = await exec_async(dlg)  # запуски браузера продолжают работать, пока диалог открыт
 
         if result == QDialog.Accepted:
             print("Настройки сохранены")  # здесь можно открыть QDialog
 
-    def on_run_clicked(self, row):
+    @asyncSlot()
+    async def on_run_clicked(self, row):
+        phone_item = self.table.item(row, 1)
+        if not phone_item:
+            return
+
+        phone10 = phone_item.data(Qt.UserRole)
+        if not phone10:
+            return
+
+        # повторное нажатие на запущенном аккаунте — остановка сессии
+        running = self.running.get(phone10)
+        if running:
+            running.cancel()
+            return
+
+        await self._run_accounts([phone10])
+
+    @asyncSlot()
+    async def on_run_checked_clicked(self):
+        phones = [p for p in self._checked_phones() if p not in self.running]
+        if not phones:
+            show_information(self, "Запуск", "Отметьте аккаунты для запуска.")
+            return
+        await self._run_accounts(phones)
+
+    async def _run_accounts(self, phones: list[str]):
+        # импорт здесь: core.browser при импорте проверяет установку браузеров
+        from core.scenario import ScenarioRunner, load_scenario
+
+        try:
+            scenario = load_scenario()
+        except Exception as e:
+            show_warning(self, "Сценарий", f"Не удалось загрузить сценарий:\n{e}")
+            return
+
+        def started(phone, controller):
+            self.running[phone] = controller
+            self._set_run_button(phone, running=True)
+
+        def finished(phone, _result):
+            self.running.pop(phone, None)
+            self._set_run_button(phone, running=False)
+            self.refresh_leases()
+
+        runner = ScenarioRunner(scenario, concurrency=get_settings().get(RUN_CONCURRENCY),
+                                mode=self.mode_combo.currentData(),
+                                on_started=started, on_finished=finished)
+        results = await runner.run(phones)
+
+        errors = [
+            f"{self.format_phone_ru(p)}: {r}"
+            for p, r in results.items()
+            if isinstance(r, Exception) and not isinstance(r, asyncio.CancelledError)
+        ]
+        if errors:
+            show_warning(self, "Ошибка запуска", "\n".join(errors))
+
+    @asyncSlot()
+    async def on_enqueue_checked(self):
+        phones = self._checked_phones()
+        if not phones:
+            show_information(self, "Очередь", "Отметьте аккаунты для постановки в очередь.")
+            return
+
+        from core.job_queue import JobQueue
+
+        queue = JobQueue()
+        for phone in phones:
+            await queue.enqueue(phone)
+        self.statusBar().showMessage(f"В очередь поставлено задач: {len(phones)}", 5000)
+
+    @asyncSlot(bool)
+    async def on_workers_toggled(self, enabled: bool):
+        # импорт здесь: обработчики запускают браузер
+        from core.job_queue import WorkerPool
+
+        if enabled:
+            if self.worker_pool is None:
+                self.worker_pool = WorkerPool(size=get_settings().get(WORKER_POOL_SIZE),
+                                              mode=self.mode_combo.currentData())
+            self.worker_pool.start()
+        elif self.worker_pool is not None:
+            await self.worker_pool.stop()
 
-        id_ = self.table.item(row, 1).text()
-        print(f"[RUN] Запуск для ID {id_}, row = {row}")
+    def _checked_phones(self) -> list[str]:
+        phones = []
+        for row in range(self.table.rowCount()):
+            cb = self._row_checkbox(row)
+            item = self.table.item(row, 1)
+            if cb and cb.isChecked() and item and item.data(Qt.UserRole):
+                phones.append(item.data(Qt.UserRole))
+        return phones
+
+    def _set_run_button(self, phone10: str, running: bool):
+        for row in range(self.table.rowCount()):
+            item = self.table.item(row, 1)
+            if item and item.data(Qt.UserRole) == phone10:
+                widget = self.table.cellWidget(row, 5)
+                btn = widget.findChild(QPushButton) if widget else None
+                if btn:
+                    btn.setText("Стоп" if running else "Запуск")
+                return
 
     @asyncSlot()
     async def on_settings_clicked(self, row: int):
@@ -403,11 +740,7 @@ class MainWindow(QMainWindow):
 
         account_data = await self._get_account_by_phone(phone10)
         if not account_data:
-            msg = QMessageBox(self)
-            msg.setIcon(QMessageBox.Warning)
-            msg.setWindowTitle("Ошибка")
-            msg.setText("Аккаунт не найден в БД.")
-            msg.open()
+            show_warning(self, "Ошибка", "Аккаунт не найден в БД.")
             return
 
         dlg = AddAccountDialog(self, account=account_data)
@@ -425,7 +758,8 @@ class MainWindow(QMainWindow):
         # ✅ после удаления обновляем таблицу
         await self.load_accounts()
 
-    def on_delete_clicked(self, row: int):
+    @asyncSlot()
+    async def on_delete_clicked(self, row: int):
         phone_item = self.table.item(row, 1)
         if not phone_item:
             return
@@ -435,16 +769,14 @@ class MainWindow(QMainWindow):
             return
 
         # подтверждение
-        reply = QMessageBox.question(
+        reply = await ask(
             self,
             "Удаление",
             "Удалить выбранный аккаунт? Аккаунт будет удален из базы данных без возможности восстановления",
-            QMessageBox.Yes | QMessageBox.No,
-            QMessageBox.No
         )
 
         if reply == QMessageBox.Yes:
-            asyncio.create_task(self._delete_account_async(phone10))
+            spawn(self._delete_account_async(phone10), category="db", owner=self)
 
     def _row_checkbox(self, row: int) -> QCheckBox | None:
         w = self.table.cellWidget(row, 0)
@@ -471,7 +803,7 @@ class MainWindow(QMainWindow):
                 if it:
                     it.setBackground(bg)
 
-            widget = self.table.cellWidget(row, 4)
+            widget = self.table.cellWidget(row, 5)
             if widget:
                 widget.setStyleSheet("background-color: rgba(0, 120, 215, 40);" if checked else "")
 
@@ -495,7 +827,7 @@ class MainWindow(QMainWindow):
             if it:
                 it.setBackground(bg)
 
-        widget = self.table.cellWidget(row, 4)
+        widget = self.table.cellWidget(row, 5)
         if widget:
             widget.setStyleSheet("background-color: rgba(0, 120, 215, 40);" if is_checked else "")
 
@@ -536,8 +868,9 @@ class MainWindow(QMainWindow):
         new_comment = item.text().strip()
 
         # ✅ сохраняем асинхронно
-        asyncio.create_task(self._save_comment_async(phone10, new_comment))
+        spawn(self._save_comment_async(phone10, new_comment), category="db", owner=self)
 
+    @timed("table_filter_seconds")
     def filter_table(self, text: str):
         text = text.strip().lower()
         clean_text = ''.join(filter(str.isdigit, text))  # только цифры
@@ -0,0 +1,88 @@
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget, \
+    QTableWidgetItem, QHeaderView, QAbstractItemView, QFileDialog, QDialog
+from qasync import asyncSlot
+
+from core.metrics import metrics
+from utils.dialogs import exec_async, show_critical
+
+
+class MetricsPanel(QDockWidget):
+    """Панель «Производительность»: где уходит время — БД, таблица, браузер, имитация человека."""
+
+    def __init__(self, parent=None):
+        super().__init__("Производительность", parent)
+        self.setObjectName("metrics_panel")
+
+        body = QWidget(self)
+        layout = QVBoxLayout(body)
+        layout.setContentsMargins(6, 6, 6, 6)
+
+        self.table = QTableWidget(0, 6, body)
+        self.table.setHorizontalHeaderLabels(["Метрика", "Метки", "Кол-во", "Среднее, мс", "p95, мс", "Макс., мс"])
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionMode(QAbstractItemView.NoSelection)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        btn_json = QPushButton("Экспорт JSON")
+        btn_prom = QPushButton("Экспорт Prometheus")
+        btn_reset = QPushButton("Сбросить")
+        btn_json.clicked.connect(lambda: self.export("json"))
+        btn_prom.clicked.connect(lambda: self.export("prometheus"))
+        btn_reset.clicked.connect(self.reset)
+        buttons.addWidget(btn_json)
+        buttons.addWidget(btn_prom)
+        buttons.addStretch()
+        buttons.addWidget(btn_reset)
+        layout.addLayout(buttons)
+
+        self.setWidget(body)
+
+        # обновляем только пока панель видна
+        self.timer = QTimer(self)
+        self.timer.setInterval(2000)
+        self.timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self._on_visibility_changed)
+
+    def _on_visibility_changed(self, visible: bool):
+        if visible:
+            self.refresh()
+            self.timer.start()
+        else:
+            self.timer.stop()
+
+    def refresh(self):
+        items = metrics.snapshot()
+        self.table.setRowCount(len(items))
+
+        for row, m in enumerate(items):
+            labels = ", ".join(f"{k}={v}" for k, v in m["labels"].items())
+            if m["kind"] == "counter":
+                values = (m["name"], labels, f"{m['value']:g}", "", "", "")
+            else:
+                values = (m["name"], labels, str(m["count"]),
+                          f"{m['avg'] * 1000:.1f}", f"{m['p95'] * 1000:.1f}", f"{m['max'] * 1000:.1f}")
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(value))
+
+    def reset(self):
+        metrics.reset()
+        self.refresh()
+
+    @asyncSlot()
+    async def export(self, fmt: str):
+        json_fmt = fmt == "json"
+        dlg = QFileDialog(self, "Экспорт метрик", "metrics.json" if json_fmt else "metrics.prom",
+                          "JSON (*.json)" if json_fmt else "Prometheus (*.prom *.txt)")
+        dlg.setAcceptMode(QFileDialog.AcceptSave)
+        if await exec_async(dlg) != QDialog.Accepted or not dlg.selectedFiles():
+            return
+
+        try:
+            with open(dlg.selectedFiles()[0], "w", encoding="utf-8") as f:
+                f.write(metrics.to_json() if json_fmt else metrics.to_prometheus())
+        except OSError as e:
+            show_critical(self, "Экспорт", f"Не удалось сохранить файл:\n{e}")
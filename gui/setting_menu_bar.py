@@ -1,8 +1,7 @@
-import asyncio
 import re
 import ipaddress
 from PySide6.QtGui import QRegularExpressionValidator
-from PySide6.QtCore import QRegularExpression
+from PySide6.QtCore import QRegularExpression, Qt
 
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
@@ -11,8 +10,10 @@ from PySide6.QtWidgets import (
 from sqlalchemy import select
 
 
+from core.tasks import spawn
 from database.db import Database
 from database.models import Proxy
+from utils.dialogs import ask, exec_async, show_warning, show_critical
 
 
 class ProxyEditDialog(QDialog):
@@ -75,7 +76,7 @@ class ProxyEditDialog(QDialog):
 
         # Host обязателен
         if not host:
-            QMessageBox.warning(self, "Ошибка", "Host обязателен.")
+            show_warning(self, "Ошибка", "Host обязателен.")
             self.host_edit.setFocus()
             return
 
@@ -86,7 +87,7 @@ class ProxyEditDialog(QDialog):
         )
 
         if not re.fullmatch(ip_regex, host):
-            QMessageBox.warning(
+            show_warning(
                 self,
                 "Ошибка",
                 "Host должен быть корректным IPv4-адресом (например 192.168.1.1)."
@@ -96,7 +97,7 @@ class ProxyEditDialog(QDialog):
 
         # Port обязателен
         if not port:
-            QMessageBox.warning(self, "Ошибка", "Port обязателен.")
+            show_warning(self, "Ошибка", "Port обязателен.")
             self.port_edit.setFocus()
             return
 
@@ -104,7 +105,7 @@ class ProxyEditDialog(QDialog):
 
         # Диапазон 0–65535
         if not (0 <= port_value <= 65535):
-            QMessageBox.warning(
+            show_warning(
                 self,
                 "Ошибка",
                 "Port должен быть в диапазоне от 0 до 65535."
@@ -114,7 +115,7 @@ class ProxyEditDialog(QDialog):
 
         # Пароль без русских букв
         if re.search(r"[А-Яа-яЁё]", password):
-            QMessageBox.warning(self, "Ошибка", "Пароль не должен содержать русские буквы.")
+            show_warning(self, "Ошибка", "Пароль не должен содержать русские буквы.")
             self.password_edit.setFocus()
             return
 
@@ -150,7 +151,49 @@ class ProxyManagerDialog(QDialog):
         bottom.addStretch()
         main_layout.addLayout(bottom)
 
-        asyncio.create_task(self.load_proxies())
+        spawn(self.load_proxies(), category="db", owner=self)
+
+        # правки прокси на других станциях приходят через LISTEN/NOTIFY
+        self._unsubscribe = Database().subscribe("proxies", self.on_proxy_changed)
+        self.finished.connect(lambda _result: self._unsubscribe())
+
+    def _proxy_row(self, proxy_id: int) -> int:
+        for row in range(self.table.rowCount()):
+            item = self.table.item(row, 0)
+            if item and item.data(Qt.UserRole) == proxy_id:
+                return row
+        return -1
+
+    def on_proxy_changed(self, _table: str, op: str, key):
+        if op == "RESYNC":
+            spawn(self.load_proxies(), category="db", owner=self)
+            return
+
+        try:
+            proxy_id = int(key)
+        except (TypeError, ValueError):
+            # без ключа строку не найти — перечитываем список целиком
+            spawn(self.load_proxies(), category="db", owner=self)
+            return
+        if op == "DELETE":
+            row = self._proxy_row(proxy_id)
+            if row >= 0:
+                self.table.removeRow(row)
+            return
+        spawn(self._refresh_proxy(proxy_id), category="db", owner=self)
+
+    async def _refresh_proxy(self, proxy_id: int):
+        async with Database().get_session() as session:
+            proxy = await session.get(Proxy, proxy_id)
+        if proxy is None:
+            return
+
+        row = self._proxy_row(proxy_id)
+        if row < 0:
+            # новый прокси — список отсортирован по id, проще перечитать
+            await self.load_proxies()
+            return
+        self.table.item(row, 0).setText(self._proxy_title(proxy))
 
     def _proxy_title(self, p: Proxy) -> str:
         return f"{p.proxy_scheme}://{p.host}:{p.port}"
@@ -165,7 +208,9 @@ class ProxyManagerDialog(QDialog):
         for row, proxy in enumerate(proxies):
             self.table.insertRow(row)
 
-            self.table.setItem(row, 0, QTableWidgetItem(self._proxy_title(proxy)))
+            item = QTableWidgetItem(self._proxy_title(proxy))
+            item.setData(Qt.UserRole, proxy.id)
+            self.table.setItem(row, 0, item)
 
             btn_edit = QPushButton("⚙")
             btn_delete = QPushButton("🗑")
@@ -186,29 +231,29 @@ class ProxyManagerDialog(QDialog):
             self.table.setCellWidget(row, 1, box)
 
     def open_edit_dialog(self, proxy_id: int):
-        asyncio.create_task(self._open_edit_async(proxy_id))
+        spawn(self._open_edit_async(proxy_id), owner=self)
 
     async def _open_edit_async(self, proxy_id: int):
         async with Database().get_session() as session:
             proxy = await session.get(Proxy, proxy_id)
 
         if not proxy:
-            QMessageBox.warning(self, "Не найдено", "Прокси не найден в базе.")
+            show_warning(self, "Не найдено", "Прокси не найден в базе.")
             return
 
         dlg = ProxyEditDialog(proxy, self)
-        if dlg.exec() != QDialog.Accepted:
+        if await exec_async(dlg) != QDialog.Accepted:
             return
 
         # Простая валидация
         if not dlg.host_edit.text().strip() or not dlg.port_edit.text().strip():
-            QMessageBox.warning(self, "Ошибка", "Host и Port обязательны.")
+            show_warning(self, "Ошибка", "Host и Port обязательны.")
             return
 
         async with Database().get_session() as session:
             db_proxy = await session.get(Proxy, proxy_id)
             if not db_proxy:
-                QMessageBox.warning(self, "Не найдено", "Прокси не найден в базе.")
+                show_warning(self, "Не найдено", "Прокси не найден в базе.")
                 return
 
             db_proxy.host = dlg.host_edit.text().strip()
@@ -222,21 +267,18 @@ class ProxyManagerDialog(QDialog):
                 await session.commit()
             except Exception as e:
                 await session.rollback()
-                QMessageBox.critical(self, "Ошибка сохранения", f"Не удалось сохранить:\n{e}")
+                show_critical(self, "Ошибка сохранения", f"Не удалось сохранить:\n{e}")
                 return
 
         await self.load_proxies()
 
     def ask_delete(self, proxy_id: int):
-        btn = QMessageBox.question(
-            self,
-            "Удалить прокси?",
-            "Точно удалить этот прокси?",
-            QMessageBox.Yes | QMessageBox.No,
-            QMessageBox.No
-        )
+        spawn(self._ask_delete_async(proxy_id), owner=self)
+
+    async def _ask_delete_async(self, proxy_id: int):
+        btn = await ask(self, "Удалить прокси?", "Точно удалить этот прокси?")
         if btn == QMessageBox.Yes:
-            asyncio.create_task(self._delete_async(proxy_id))
+            spawn(self._delete_async(proxy_id), category="db", owner=self)
 
     async def _delete_async(self, proxy_id: int):
         async with Database().get_session() as session:
@@ -248,15 +290,18 @@ class ProxyManagerDialog(QDialog):
                 await session.commit()
             except Exception as e:
                 await session.rollback()
-                QMessageBox.critical(self, "Ошибка удаления", f"Не удалось удалить:\n{e}")
+                show_critical(self, "Ошибка удаления", f"Не удалось удалить:\n{e}")
                 return
 
         await self.load_proxies()
 
     def on_add_proxy(self):
+        spawn(self._add_proxy_dialog(), owner=self)
+
+    async def _add_proxy_dialog(self):
         dlg = ProxyEditDialog(None, self)  # None = новый прокси
-        if dlg.exec() == QDialog.Accepted:
-            asyncio.create_task(self._add_proxy_async(dlg))
+        if await exec_async(dlg) == QDialog.Accepted:
+            spawn(self._add_proxy_async(dlg), category="db", owner=self)
 
     async def _add_proxy_async(self, dlg: ProxyEditDialog):
         new_proxy = Proxy(
@@ -274,7 +319,7 @@ class ProxyManagerDialog(QDialog):
                 await session.commit()
             except Exception as e:
                 await session.rollback()
-                QMessageBox.critical(self, "Ошибка", f"Не удалось сохранить прокси:\n{e}")
+                show_critical(self, "Ошибка", f"Не удалось сохранить прокси:\n{e}")
                 return
 
 
@@ -0,0 +1,107 @@
+import json
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QFont
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView, \
+    QAbstractItemView, QPushButton, QPlainTextEdit, QSpinBox, QLabel, QSplitter
+from qasync import asyncSlot
+
+from core.settings import get_settings, SLOW_QUERY_MS
+from database.db import Database
+from utils.dialogs import show_information, show_critical
+
+
+class SlowQueriesDialog(QDialog):
+    """Медленные запросы: самые долгие из последних, план выполнения по кнопке."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Медленные запросы")
+        self.resize(900, 560)
+        self.records = []
+
+        layout = QVBoxLayout(self)
+
+        top = QHBoxLayout()
+        top.addWidget(QLabel("Порог, мс:"))
+        self.threshold = QSpinBox()
+        self.threshold.setRange(1, 60000)
+        self.threshold.setValue(get_settings().get(SLOW_QUERY_MS))
+        self.threshold.valueChanged.connect(lambda v: get_settings().set(SLOW_QUERY_MS, v))
+        top.addWidget(self.threshold)
+        top.addStretch()
+
+        btn_refresh = QPushButton("Обновить")
+        btn_clear = QPushButton("Очистить")
+        self.btn_explain = QPushButton("EXPLAIN ANALYZE")
+        btn_refresh.clicked.connect(self.refresh)
+        btn_clear.clicked.connect(self.clear)
+        self.btn_explain.clicked.connect(self.explain_selected)
+        for b in (btn_refresh, btn_clear, self.btn_explain):
+            top.addWidget(b)
+        layout.addLayout(top)
+
+        splitter = QSplitter(Qt.Vertical, self)
+
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Время", "мс", "Запрос", "Параметры"])
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.table.itemSelectionChanged.connect(self._show_statement)
+        splitter.addWidget(self.table)
+
+        self.details = QPlainTextEdit()
+        self.details.setReadOnly(True)
+        self.details.setFont(QFont("Consolas", 9))
+        splitter.addWidget(self.details)
+
+        layout.addWidget(splitter)
+        self.refresh()
+
+    def refresh(self):
+        self.records = Database().slow_queries.top()
+        self.table.setRowCount(len(self.records))
+        for row, rec in enumerate(self.records):
+            values = (
+                rec.at.strftime("%H:%M:%S"),
+                f"{rec.duration * 1000:.0f}",
+                " ".join(rec.statement.split())[:300],
+                json.dumps(rec.params, ensure_ascii=False),
+            )
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(value))
+
+    def clear(self):
+        Database().slow_queries.clear()
+        self.details.clear()
+        self.refresh()
+
+    def _selected(self):
+        rows = self.table.selectionModel().selectedRows()
+        return self.records[rows[0].row()] if rows else None
+
+    def _show_statement(self):
+        rec = self._selected()
+        if rec:
+            self.details.setPlainText(f"{rec.statement}\n\n-- параметры: {json.dumps(rec.params, ensure_ascii=False)}")
+
+    @asyncSlot()
+    async def explain_selected(self):
+        rec = self._selected()
+        if rec is None:
+            show_information(self, "EXPLAIN", "Выберите запрос в списке.")
+            return
+
+        self.btn_explain.setEnabled(False)
+        try:
+            plan = await Database().explain(rec)
+        except Exception as e:
+            show_critical(self, "EXPLAIN", f"Не удалось получить план:\n{e}")
+            return
+        finally:
+            self.btn_explain.setEnabled(True)
+
+        self.details.setPlainText(f"{rec.statement}\n\n{plan}")
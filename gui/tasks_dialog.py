@@ -0,0 +1,55 @@
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, \
+    QLabel
+
+from core.tasks import get_supervisor
+
+
+class TasksDialog(QDialog):
+    """Живой список фоновых задач: что сейчас выполняется и сколько уже идёт."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Фоновые задачи")
+        self.resize(640, 360)
+
+        layout = QVBoxLayout(self)
+
+        self.summary = QLabel()
+        layout.addWidget(self.summary)
+
+        self.table = QTableWidget(0, 5, self)
+        self.table.setHorizontalHeaderLabels(["Задача", "Категория", "Владелец", "Состояние", "Длительность, с"])
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionMode(QAbstractItemView.NoSelection)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.refresh)
+
+    # окно переиспользуется (open_tasks) — обновляем только пока оно видно
+    def showEvent(self, event):
+        self.refresh()
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        supervisor = get_supervisor()
+        tasks = supervisor.snapshot()
+
+        self.table.setRowCount(len(tasks))
+        for row, t in enumerate(tasks):
+            values = (t["name"], t["category"], t["owner"] or "—", t["state"], f"{t['duration']:.1f}")
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(value))
+
+        waiting = sum(1 for t in tasks if t["state"] == "ожидает")
+        limits = ", ".join(f"{k}: {v}" for k, v in supervisor.limits.items())
+        self.summary.setText(f"Задач: {len(tasks)}, ждут лимита: {waiting}   Лимиты: {limits}")
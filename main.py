@@ -1,16 +1,31 @@
 import sys
 import asyncio
+import argparse
 from qasync import QEventLoop
-from PySide6.QtWidgets import QApplication
+from sqlalchemy.exc import DBAPIError
+from PySide6.QtWidgets import QApplication, QMessageBox
 from PySide6.QtGui import QPalette, QColor
 from PySide6.QtCore import Qt
 
 from gui.login_window import LoginWindow
+import core.app as app_core
 from core.app import init_application, DBConnectionError
+from core.login_cache import get_login_cache, CachedSession
+from core.profiles import start_maintenance as start_profile_maintenance
+from database.queries import get_user
+from core.modes import ExecutionMode
+from core.settings import get_settings, RUN_MODE
+from utils.dialogs import message, show_warning
 from utils.messagebox import CustomMessageBox
 
 
 login_window: LoginWindow | None = None
+main_window = None  # gui.main_window.MainWindow, если открыт из локальной сессии
+
+# паузы между попытками подключиться к БД, когда окно открыто из локальной сессии, с
+OFFLINE_RETRY_DELAYS = (5, 10, 30, 60)
+# ошибки, при которых окно из локальной сессии остаётся открытым без БД
+OFFLINE_ERRORS = (DBConnectionError, OSError, DBAPIError)
 
 def apply_fixed_theme(app: QApplication):
     app.setStyle("Fusion")
@@ -55,31 +70,116 @@ def apply_fixed_theme(app: QApplication):
     }
     """)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="MarketBuyer")
+    parser.add_argument(
+        "--mode",
+        choices=[m.value for m in ExecutionMode],
+        default=None,
+        help="режим браузера для запусков: headed, headless или offscreen (по умолчанию — из настроек)",
+    )
+    # остальные аргументы (например, -platform) оставляем Qt
+    args, qt_args = parser.parse_known_args()
+    return args, qt_args
+
+
 if __name__ == "__main__":
-    app = QApplication([])
+    args, qt_args = parse_args()
+    try:
+        app_core.run_mode = ExecutionMode(args.mode or get_settings().get(RUN_MODE))
+    except ValueError:
+        app_core.run_mode = ExecutionMode.HEADED
+
+    app = QApplication([sys.argv[0]] + qt_args)
     apply_fixed_theme(app)
     loop = QEventLoop(app)
     asyncio.set_event_loop(loop)
 
+    async def revalidate(cached: CachedSession) -> bool:
+        """Фоновая проверка локальной сессии по БД."""
+        async with app_core.db.get_session() as session:
+            user = await get_user(session, cached.user.login)
+
+        if not get_login_cache().is_valid_for(cached, user):
+            get_login_cache().clear()
+            return False
+
+        app_core.current_user = user
+        main_window.user = user
+        main_window.cb_all_accounts.setVisible(bool(user.is_admin))
+        return True
+
+    async def connect_cached(cached: CachedSession) -> bool:
+        """
+        Подключение к БД и проверка локальной сессии. Пока БД недоступна, окно
+        работает по локальному снимку, попытки повторяются с нарастающей паузой.
+        """
+        attempt = 0
+        while True:
+            try:
+                await init_application()
+                return await revalidate(cached)
+            except OFFLINE_ERRORS:
+                delay = OFFLINE_RETRY_DELAYS[min(attempt, len(OFFLINE_RETRY_DELAYS) - 1)]
+                attempt += 1
+                main_window.statusBar().showMessage(
+                    f"Нет связи с базой данных — данные из локального снимка. Повтор через {delay} с..."
+                )
+                await asyncio.sleep(delay)
+                main_window.statusBar().showMessage("Подключение к базе данных...")
+
     async def start():
-        global login_window
+        global login_window, main_window
 
-        login_window = LoginWindow()
-        login_window.set_loading(True, "Подключение к базе данных...")
-        login_window.show()
+        cached = get_login_cache().load()
+        if cached is not None:
+            # есть действующая локальная сессия — таблица из локального снимка, без ожидания БД
+            from gui.main_window import MainWindow
+
+            app_core.current_user = cached.user
+            main_window = MainWindow(cached.user, defer_sync=True)
+            main_window.statusBar().showMessage("Подключение к базе данных...")
+            main_window.show()
+        else:
+            login_window = LoginWindow()
+            login_window.set_loading(True, "Подключение к базе данных...")
+            login_window.show()
 
+        parent = main_window or login_window
         try:
-            await init_application()
+            if cached is None:
+                await init_application()
+                valid = None
+            else:
+                valid = await connect_cached(cached)
         except DBConnectionError as e:
-            CustomMessageBox.critical(login_window, "Ошибка БД", str(e))
+            await message(parent, "Ошибка БД", str(e), QMessageBox.Critical, box_class=CustomMessageBox)
             app.quit()
             return
         except Exception as e:
-            CustomMessageBox.critical(login_window, "Ошибка", repr(e))
+            await message(parent, "Ошибка", repr(e), QMessageBox.Critical, box_class=CustomMessageBox)
             app.quit()
             return
 
-        login_window.set_loading(False)
+        # сжатие кэшей, архив холодных профилей и лимит диска — в фоне по расписанию
+        start_profile_maintenance()
+
+        if cached is None:
+            login_window.set_loading(False)
+            return
+
+        if valid:
+            main_window.statusBar().clearMessage()
+            main_window.load_accounts()
+            return
+
+        # пользователь отключён или сменил пароль — обратно на форму входа
+        main_window.close()
+        main_window = None
+        app_core.current_user = None
+        login_window = LoginWindow()
+        login_window.show()
+        show_warning(login_window, "Сессия", "Сессия устарела, войдите заново.", box_class=CustomMessageBox)
 
     loop.create_task(start())
 
@@ -0,0 +1,137 @@
+import asyncio
+import time
+
+import pytest
+
+from core.asset_cache import AssetCache, freshness_lifetime
+
+
+class FakeResponse:
+    def __init__(self, status=200, headers=None, body=b""):
+        self.status = status
+        self.headers = headers or {}
+        self._body = body
+
+    async def body(self):
+        return self._body
+
+
+class FakeRoute:
+    """Запрос Playwright: fetch отдаёт заранее заданный ответ, fulfill запоминается."""
+
+    def __init__(self, url, response=None, fetch_error=None):
+        self.request = type("Request", (), {"url": url, "headers": {}})()
+        self.response = response
+        self.fetch_error = fetch_error
+        self.fetch_headers = None
+        self.fulfilled = None
+
+    async def fetch(self, headers=None):
+        self.fetch_headers = headers
+        if self.fetch_error:
+            raise self.fetch_error
+        return self.response
+
+    async def fulfill(self, **kwargs):
+        self.fulfilled = kwargs
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = AssetCache(tmp_path / "assets", max_bytes=1000)
+    yield cache
+    cache._db.close()
+
+
+def test_freshness_lifetime():
+    assert freshness_lifetime({"cache-control": "public, max-age=600"}) == 600
+    assert freshness_lifetime({"cache-control": "s-maxage=60"}) == 60
+    assert freshness_lifetime({"cache-control": "no-cache"}) == 0
+    assert freshness_lifetime({"cache-control": "private, max-age=600"}) is None
+    assert freshness_lifetime({"cache-control": "no-store"}) is None
+    assert freshness_lifetime({}) == 0
+
+
+def test_fresh_entry_served_without_network(cache):
+    cache._put("https://example.com/app.js", b"console.log(1)", 200, {"etag": '"v1"'}, 600)
+
+    route = FakeRoute("https://example.com/app.js")
+    served = asyncio.run(cache.handle(route))
+
+    assert served == len(b"console.log(1)")
+    assert route.fetch_headers is None
+    assert route.fulfilled["body"] == b"console.log(1)"
+    assert cache.stats.hits == 1
+
+
+def test_stale_entry_is_revalidated(cache):
+    cache._put("https://example.com/app.js", b"console.log(1)", 200, {"etag": '"v1"'}, 0)
+
+    route = FakeRoute("https://example.com/app.js", FakeResponse(304, {"cache-control": "max-age=600"}))
+    served = asyncio.run(cache.handle(route))
+
+    assert route.fetch_headers["if-none-match"] == '"v1"'
+    assert served == len(b"console.log(1)")
+    assert cache.stats.revalidated == 1
+    assert cache._get("https://example.com/app.js")["fresh"]
+
+
+def test_miss_is_stored_unless_no_store(cache):
+    asyncio.run(cache.handle(FakeRoute("https://example.com/a.js", FakeResponse(200, {"cache-control": "max-age=60"}, b"a"))))
+    asyncio.run(cache.handle(FakeRoute("https://example.com/b.js", FakeResponse(200, {"cache-control": "no-store"}, b"b"))))
+
+    assert cache._get("https://example.com/a.js")["body"] == b"a"
+    assert cache._get("https://example.com/b.js") is None
+    assert cache.stats.misses == 2 and cache.stats.stores == 1
+
+
+def test_lru_eviction(cache):
+    cache._put("https://example.com/old.js", b"o" * 400, 200, {}, 600)
+    time.sleep(0.01)
+    cache._put("https://example.com/used.js", b"u" * 400, 200, {}, 600)
+    time.sleep(0.01)
+    cache._get("https://example.com/old.js")  # old.js теперь использовался последним
+    time.sleep(0.01)
+    cache._put("https://example.com/new.js", b"n" * 400, 200, {}, 600)
+
+    assert cache._get("https://example.com/used.js") is None
+    assert cache._get("https://example.com/old.js") is not None
+    assert cache._get("https://example.com/new.js") is not None
+    assert cache.stats.evictions == 1
+    assert len(list(cache.blobs.iterdir())) == 2
+
+
+def test_same_body_stored_once(cache):
+    cache._put("https://a.example.com/lib.js", b"x" * 300, 200, {}, 600)
+    cache._put("https://b.example.com/lib.js", b"x" * 300, 200, {}, 600)
+
+    assert len(list(cache.blobs.iterdir())) == 1
+    assert cache.stats.evictions == 0
+
+
+def test_missing_blob_is_a_miss(cache):
+    cache._put("https://example.com/app.js", b"body", 200, {}, 600)
+    for blob in cache.blobs.iterdir():
+        blob.unlink()
+
+    assert cache._get("https://example.com/app.js") is None
+
+
+def test_broken_store_still_serves_response(cache, monkeypatch):
+    def broken_put(*args):
+        raise OSError("диск заполнен")
+
+    monkeypatch.setattr(cache, "_put", broken_put)
+    route = FakeRoute("https://example.com/app.js", FakeResponse(200, {"cache-control": "max-age=60"}, b"a"))
+
+    assert asyncio.run(cache.handle(route)) == 0
+    assert route.fulfilled["body"] == b"a"
+    assert cache.stats.errors == 1 and cache.stats.stores == 0
+
+
+def test_network_error_propagates(cache):
+    route = FakeRoute("https://example.com/app.js", fetch_error=ConnectionError("сеть"))
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(cache.handle(route))
+    assert route.fulfilled is None
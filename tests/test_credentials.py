@@ -0,0 +1,56 @@
+from core.credentials import hash_password, verify_password, needs_rehash, check_and_upgrade, is_hashed
+from core.settings import PASSWORD_SCRYPT_N
+
+# маленький N, чтобы тесты не тратили по 50 мс на хэш
+FAST_N = 2 ** 4
+
+
+def test_hash_and_verify(settings):
+    settings.set(PASSWORD_SCRYPT_N, FAST_N)
+    stored = hash_password("secret")
+
+    assert is_hashed(stored)
+    assert stored.split("$")[1] == str(FAST_N)
+    assert verify_password("secret", stored)
+    assert not verify_password("Secret", stored)
+    assert not needs_rehash(stored)
+
+
+def test_same_password_different_salt(settings):
+    settings.set(PASSWORD_SCRYPT_N, FAST_N)
+    first, second = hash_password("secret"), hash_password("secret")
+
+    assert first != second
+    assert verify_password("secret", first) and verify_password("secret", second)
+
+
+def test_corrupted_hash_is_rejected(settings):
+    assert not verify_password("secret", "scrypt$16$8$1$не-base64")
+
+
+def test_upgrade_from_plaintext(settings):
+    settings.set(PASSWORD_SCRYPT_N, FAST_N)
+
+    assert check_and_upgrade("wrong", "secret") == (False, None)
+
+    ok, new_hash = check_and_upgrade("secret", "secret")
+    assert ok and is_hashed(new_hash)
+    assert verify_password("secret", new_hash)
+    assert check_and_upgrade("secret", new_hash) == (True, None)
+
+
+def test_rehash_when_work_factor_changes(settings):
+    settings.set(PASSWORD_SCRYPT_N, FAST_N)
+    stored = hash_password("secret")
+
+    settings.set(PASSWORD_SCRYPT_N, FAST_N * 2)
+    assert needs_rehash(stored)
+
+    ok, new_hash = check_and_upgrade("secret", stored)
+    assert ok and new_hash.split("$")[1] == str(FAST_N * 2)
+
+
+def test_invalid_work_factor_falls_back_to_default(settings):
+    settings.set(PASSWORD_SCRYPT_N, 1000)
+    assert hash_password("secret", n=FAST_N).split("$")[1] == str(FAST_N)
+    assert needs_rehash(hash_password("secret", n=FAST_N))
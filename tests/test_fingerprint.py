@@ -0,0 +1,29 @@
+import pytest
+
+fingerprint = pytest.importorskip("core.fingerprint")
+
+WINDOWS_UA = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+MAC_UA = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+LINUX_UA = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+
+
+def test_same_account_same_fingerprint():
+    first = fingerprint.generate_fingerprint("9000000001", WINDOWS_UA)
+    second = fingerprint.generate_fingerprint("9000000001", WINDOWS_UA)
+
+    assert fingerprint.fingerprint_options(first) == fingerprint.fingerprint_options(second)
+    assert fingerprint.init_script(first) == fingerprint.init_script(second)
+
+
+@pytest.mark.parametrize("ua, platform, screens, cores", [
+    (WINDOWS_UA, "Win32", fingerprint.WINDOWS_SCREENS, fingerprint.WINDOWS_CORES),
+    (MAC_UA, "MacIntel", fingerprint.MAC_SCREENS, fingerprint.MAC_CORES),
+    (LINUX_UA, "Linux x86_64", fingerprint.LINUX_SCREENS, fingerprint.LINUX_CORES),
+])
+def test_fingerprint_matches_platform(ua, platform, screens, cores):
+    for i in range(20):
+        fp = fingerprint.generate_fingerprint(f"90000000{i:02d}", ua)
+        assert fp.platform == platform
+        assert (fp.screen_width, fp.screen_height, fp.device_scale_factor) in screens
+        assert fp.hardware_concurrency in cores
+        assert fp.viewport_height < fp.screen_height
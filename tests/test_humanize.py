@@ -0,0 +1,57 @@
+import asyncio
+
+from core.humanize import Humanizer, account_seed
+
+
+class FakeMouse:
+    def __init__(self, calls: list):
+        self.calls = calls
+
+    async def move(self, x, y):
+        self.calls.append(("move", round(x, 6), round(y, 6)))
+
+    async def wheel(self, dx, dy):
+        self.calls.append(("wheel", dx, dy))
+
+
+class FakePage:
+    """Записывает вызовы вместо страницы Playwright."""
+
+    def __init__(self):
+        self.calls = []
+        self.mouse = FakeMouse(self.calls)
+
+    async def wait_for_timeout(self, ms):
+        self.calls.append(("wait", ms))
+
+
+def record(seed: int) -> list:
+    page = FakePage()
+    humanizer = Humanizer(seed=seed)
+
+    async def scenario():
+        await humanizer.warm_up(page)
+        await humanizer.move(page, 640, 360)
+        await humanizer.wait(page, humanizer.profile.pause)
+
+    asyncio.run(scenario())
+    return page.calls
+
+
+def test_same_seed_same_behaviour():
+    seed = account_seed("9000000001", salt="run-1")
+
+    first, second = record(seed), record(seed)
+
+    assert first == second
+    assert [c for c in first if c[0] == "wait"]
+    assert [c for c in first if c[0] == "move"]
+
+
+def test_same_seed_same_path():
+    first, second = Humanizer(seed=42), Humanizer(seed=42)
+    assert first.bezier_path((0, 0), (800, 600)) == second.bezier_path((0, 0), (800, 600))
+
+
+def test_different_salt_different_behaviour():
+    assert record(account_seed("9000000001", salt="run-1")) != record(account_seed("9000000001", salt="run-2"))
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from tests.conftest import requires_pg, add_accounts
+
+job_queue = pytest.importorskip("core.job_queue")
+JobQueue, WorkerPool = job_queue.JobQueue, job_queue.WorkerPool
+
+
+@requires_pg
+def test_concurrent_claims_take_distinct_jobs(db, loop):
+    phones = [f"900000000{i}" for i in range(10)]
+
+    async def scenario():
+        await add_accounts(db, *phones)
+        for phone in phones:
+            await JobQueue().enqueue(phone)
+        return await asyncio.gather(*(JobQueue(worker=f"worker-{i}").claim() for i in range(len(phones))))
+
+    claimed = loop.run_until_complete(scenario())
+
+    ids = [job.id for job in claimed if job is not None]
+    assert len(ids) == len(phones)
+    assert len(set(ids)) == len(ids)
+    assert {job.phone for job in claimed} == set(phones)
+
+
+@requires_pg
+def test_one_running_job_per_account(db, loop):
+    async def scenario():
+        await add_accounts(db, "9000000001")
+        for _ in range(3):
+            await JobQueue().enqueue("9000000001")
+        return await asyncio.gather(*(JobQueue(worker=f"worker-{i}").claim() for i in range(3)))
+
+    claimed = loop.run_until_complete(scenario())
+
+    assert sum(job is not None for job in claimed) == 1
+
+
+@requires_pg
+def test_reclaim_stale_returns_job_to_queue(db, loop):
+    from datetime import timedelta
+    from sqlalchemy import update, func
+    from database.models import Job
+
+    async def scenario():
+        await add_accounts(db, "9000000001")
+        job_id = await JobQueue().enqueue("9000000001")
+        assert (await JobQueue(worker="crashed").claim()).id == job_id
+
+        # свежая задача не считается зависшей
+        assert await JobQueue().reclaim_stale(timeout=300) == 0
+
+        async with db.get_session() as session:
+            await session.execute(
+                update(Job).where(Job.id == job_id).values(locked_at=func.now() - timedelta(minutes=10))
+            )
+            await session.commit()
+
+        assert await JobQueue().reclaim_stale(timeout=300) == 1
+        return await JobQueue(worker="survivor").claim()
+
+    job = loop.run_until_complete(scenario())
+
+    assert job is not None
+    assert job.worker == "survivor"
+    assert job.attempts == 2
+
+
+def test_worker_survives_queue_errors(loop):
+    from core.tasks import get_supervisor
+
+    class FlakyQueue:
+        calls = 0
+
+        async def claim(self):
+            self.calls += 1
+            if self.calls <= 2:
+                raise ConnectionError("БД недоступна")
+            raise asyncio.CancelledError()  # третий вызов — обработчик дожил, выходим
+
+    reported = []
+    supervisor = get_supervisor()
+    reporter, supervisor.reporter = supervisor.reporter, lambda info, exc: reported.append(exc)
+    try:
+        queue = FlakyQueue()
+        pool = WorkerPool(size=1, queue=queue, poll_interval=0.01)
+        with pytest.raises(asyncio.CancelledError):
+            loop.run_until_complete(pool._worker())
+    finally:
+        supervisor.reporter = reporter
+
+    assert queue.calls == 3
+    assert len(reported) == 2
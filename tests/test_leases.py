@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from tests.conftest import requires_pg, add_accounts
+
+leases = pytest.importorskip("core.leases")
+LeaseManager, LeaseError = leases.LeaseManager, leases.LeaseError
+
+
+async def _stop_heartbeat(manager: LeaseManager):
+    if manager._heartbeat is not None:
+        manager._heartbeat.cancel()
+        await asyncio.gather(manager._heartbeat, return_exceptions=True)
+
+
+def test_concurrent_acquire_in_one_process_is_exclusive(loop):
+    """Второй acquire того же телефона, пока первый ждёт БД, не проходит."""
+    manager = LeaseManager(holder="test")
+    calls = []
+
+    async def slow_upsert(phone):
+        calls.append(phone)
+        await asyncio.sleep(0.01)
+        return True
+
+    manager._upsert = slow_upsert
+
+    async def scenario():
+        try:
+            return await asyncio.gather(manager.acquire("9000000001"), manager.acquire("9000000001"))
+        finally:
+            await _stop_heartbeat(manager)
+
+    assert sorted(loop.run_until_complete(scenario())) == [False, True]
+    assert calls == ["9000000001"]
+    assert manager.held == {"9000000001"}
+
+
+def test_failed_upsert_frees_reservation(loop):
+    manager = LeaseManager(holder="test")
+
+    async def broken_upsert(phone):
+        raise ConnectionError("БД недоступна")
+
+    manager._upsert = broken_upsert
+    with pytest.raises(ConnectionError):
+        loop.run_until_complete(manager.acquire("9000000001"))
+    assert not manager._pending and not manager.held
+
+
+@requires_pg
+def test_concurrent_acquire_against_postgres(db, loop):
+    station = LeaseManager(holder="station-a")
+    other = LeaseManager(holder="station-b")
+
+    async def scenario():
+        await add_accounts(db, "9000000001")
+        try:
+            first = await asyncio.gather(station.acquire("9000000001"), station.acquire("9000000001"))
+            # действующую аренду не получает ни другая станция, ни повторный вызов этой
+            taken = [await other.acquire("9000000001"), await station.acquire("9000000001")]
+
+            await station.release("9000000001")
+            after_release = await other.acquire("9000000001")
+            await other.release("9000000001")
+            return first, taken, after_release
+        finally:
+            await _stop_heartbeat(station)
+            await _stop_heartbeat(other)
+
+    first, taken, after_release = loop.run_until_complete(scenario())
+
+    assert sorted(first) == [False, True]
+    assert taken == [False, False]
+    assert after_release is True
+
+
+@requires_pg
+def test_second_lease_context_raises(db, loop):
+    manager = LeaseManager(holder="station-a")
+
+    async def scenario():
+        await add_accounts(db, "9000000001")
+        try:
+            async with manager.lease("9000000001"):
+                with pytest.raises(LeaseError):
+                    async with manager.lease("9000000001"):
+                        pass
+                # неудачная вторая попытка не сняла аренду первой сессии
+                return "9000000001" in manager.held
+        finally:
+            await _stop_heartbeat(manager)
+
+    assert loop.run_until_complete(scenario())
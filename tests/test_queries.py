@@ -0,0 +1,75 @@
+import pytest
+
+from tests.conftest import requires_pg, add_accounts
+
+queries = pytest.importorskip("database.queries")
+
+pytestmark = requires_pg
+
+
+async def add_operator(database, login: str, phones: list[str]):
+    from database.models import User, UsersAccounts
+
+    async with database.get_session() as session:
+        session.add(User(login=login, password="-", name=login))
+        await session.flush()
+        session.add_all(UsersAccounts(user=login, phone=p, path=p) for p in phones)
+        await session.commit()
+
+
+@pytest.mark.parametrize("count", [1, 50])
+def test_list_accounts_with_users_has_no_n_plus_one(db, loop, count):
+    phones = [f"9{i:09d}" for i in range(count)]
+
+    async def scenario():
+        await add_accounts(db, *phones)
+        await add_operator(db, "operator", phones)
+
+        async with db.get_session() as session:
+            with db.count_queries(max_queries=3):
+                accounts = await queries.list_accounts_with_users(session, "operator")
+            # связи уже загружены: обращение к ним не делает запросов (lazy="raise" бы упал)
+            with db.count_queries(max_queries=0):
+                return [(a.phone, [u.login for u in a.users], len(a.users_link)) for a in accounts]
+
+    rows = loop.run_until_complete(scenario())
+
+    assert len(rows) == count
+    assert all(users == ["operator"] and links == 1 for _phone, users, links in rows)
+
+
+@pytest.mark.parametrize("count", [1, 50])
+def test_list_users_with_accounts_has_no_n_plus_one(db, loop, count):
+    async def scenario():
+        for i in range(count):
+            phone = f"9{i:09d}"
+            await add_accounts(db, phone)
+            await add_operator(db, f"op{i}", [phone])
+
+        async with db.get_session() as session:
+            with db.count_queries(max_queries=2):
+                users = await queries.list_users_with_accounts(session)
+            return {u.login: [a.phone for a in u.accounts] for u in users}
+
+    users = loop.run_until_complete(scenario())
+
+    assert len(users) == count
+
+
+@pytest.mark.parametrize("count", [1, 50])
+def test_snapshot_sync_query_count_does_not_grow(db, loop, tmp_path, count):
+    from core.account_snapshot import AccountSnapshot
+
+    phones = [f"9{i:09d}" for i in range(count)]
+
+    async def scenario():
+        await add_accounts(db, *phones)
+        await add_operator(db, "operator", phones)
+
+        snapshot = AccountSnapshot(tmp_path / "snapshot.sqlite3")
+        # дельта, ключи и догрузка привязанных без изменений — не больше трёх запросов
+        with db.count_queries(max_queries=3):
+            _updated, added, _removed = await snapshot.sync("operator", "operator")
+        return added
+
+    assert loop.run_until_complete(scenario()) == set(phones)
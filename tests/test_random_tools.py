@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from utils.random_tools import UASampler
+
+AGENTS = [f"Mozilla/5.0 test-agent-{i}" for i in range(12)]
+
+
+@pytest.fixture
+def ua_files(tmp_path):
+    path = tmp_path / "user_agents.txt"
+    # повторы и пустые строки в файле не должны давать лишних UA в кольце
+    path.write_text("\n".join(AGENTS + AGENTS[:3] + ["", "  "]) + "\n", encoding="utf-8")
+    return path, tmp_path / "ua_ring.sqlite3"
+
+
+def test_no_repeats_within_cycle_across_instances(ua_files):
+    path, state_path = ua_files
+    first, second = UASampler(path, state_path), UASampler(path, state_path)
+
+    cycle = [(first if i % 2 else second).draw() for i in range(len(AGENTS))]
+    assert sorted(cycle) == sorted(AGENTS)
+
+    # следующий цикл — снова каждый UA ровно один раз
+    next_cycle = [(second if i % 2 else first).draw() for i in range(len(AGENTS))]
+    assert sorted(next_cycle) == sorted(AGENTS)
+
+
+def test_position_survives_restart(ua_files):
+    path, state_path = ua_files
+    head = [UASampler(path, state_path).draw() for _ in range(5)]
+    tail = [UASampler(path, state_path).draw() for _ in range(len(AGENTS) - 5)]
+
+    assert sorted(head + tail) == sorted(AGENTS)
+
+
+def test_draw_excluding_skips_used(ua_files):
+    path, state_path = ua_files
+    sampler = UASampler(path, state_path)
+    used = set(AGENTS[:-1])
+
+    assert sampler.draw_excluding(used) == AGENTS[-1]
+    # все заняты — повтор разрешён, но UA всё равно выдаётся
+    assert sampler.draw_excluding(set(AGENTS)) in AGENTS
+
+
+def test_for_account_keeps_stored_agent(ua_files):
+    sampler = UASampler(*ua_files)
+
+    assert asyncio.run(sampler.for_account("stored-agent")) == "stored-agent"
+    assert asyncio.run(sampler.for_account("")) in AGENTS
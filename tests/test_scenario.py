@@ -0,0 +1,89 @@
+from urllib.parse import urlsplit
+
+import pytest
+
+from tests.conftest import ROOT
+
+playwright = pytest.importorskip("playwright.async_api")
+# core.scenario тянет core.browser, а с ним БД и config.py
+scenario_mod = pytest.importorskip("core.scenario")
+browser_mod = pytest.importorskip("core.browser")
+
+from core.humanize import Humanizer
+from core.session import BrowserSession
+from utils.fixture_server import FixtureServer
+
+YAML_SCENARIO = """
+name: purchase
+step_timeout: 10
+steps:
+  - action: open
+  - action: search
+    query: товар
+  - action: open_card
+    index: 0
+  - action: add_to_cart
+  - action: check_order_status
+"""
+
+
+@pytest.fixture
+def server():
+    with FixtureServer() as srv:
+        yield srv
+
+
+async def run_offline(scenario, server: FixtureServer, route_site: bool = False) -> BrowserSession:
+    """Выполнить сценарий в headless Chromium; route_site — запросы к сайту уходят на фикстуры."""
+    async with playwright.async_playwright() as p:
+        try:
+            browser = await p.chromium.launch(headless=True)
+        except playwright.Error as e:
+            pytest.skip(f"Chromium для Playwright не установлен: {e}")
+
+        try:
+            context = await browser.new_context()
+            if route_site:
+                async def to_fixtures(route):
+                    url = urlsplit(route.request.url)
+                    target = server.base_url + url.path + (f"?{url.query}" if url.query else "")
+                    await route.fulfill(response=await route.fetch(url=target))
+
+                await context.route(lambda url: url.startswith(scenario_mod.WB_URL), to_fixtures)
+
+            page = await context.new_page()
+            session = BrowserSession(context, page, step_timeout=10,
+                                     humanizer=Humanizer(seed=1, profile="fast"))
+            await session.run(scenario)
+            return session
+        finally:
+            await browser.close()
+
+
+def test_default_scenario_offline(server, loop):
+    session = loop.run_until_complete(run_offline(browser_mod.default_scenario, server, route_site=True))
+
+    assert [name for name, _elapsed in session.steps] == ["Открытие главной", "Прогрев"]
+
+
+def test_default_json_scenario_against_fixtures(server, loop):
+    scenario = scenario_mod.Scenario.from_file(ROOT / "templates" / "scenarios" / "default.json",
+                                               base_url=server.base_url)
+
+    session = loop.run_until_complete(run_offline(scenario, server))
+
+    assert session.finished
+    assert session.results["order_status"] == ["Готов к получению", "В пути"]
+
+
+def test_yaml_scenario_against_fixtures(server, loop, tmp_path):
+    pytest.importorskip("yaml")
+    path = tmp_path / "purchase.yaml"
+    path.write_text(YAML_SCENARIO, encoding="utf-8")
+    scenario = scenario_mod.Scenario.from_file(path, base_url=server.base_url)
+
+    session = loop.run_until_complete(run_offline(scenario, server))
+
+    assert session.results["cart_count"] == "1"
+    assert session.results["order_status"] == ["Готов к получению", "В пути"]
+    assert len(session.steps) == 5
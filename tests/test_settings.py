@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+import pytest
+
+import core.settings
+from core.settings import SettingsStore, Setting, LOGIN, RUN_CONCURRENCY
+
+
+@pytest.fixture
+def replaces(monkeypatch):
+    """Счётчик атомарных замен файла настроек."""
+    calls = []
+    real_replace = core.settings.os.replace
+
+    def replace(src, dst):
+        calls.append(dst)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(core.settings.os, "replace", replace)
+    return calls
+
+
+def test_changes_are_debounced_into_one_write(tmp_path, replaces):
+    path = tmp_path / "config.json"
+    store = SettingsStore(path, debounce=0.05)
+
+    async def scenario():
+        for i in range(10):
+            store.set(RUN_CONCURRENCY, i)
+        store.set(LOGIN, "operator")
+        assert not path.exists()  # до истечения задержки на диск ничего не пишется
+        await asyncio.sleep(0.15)
+
+    asyncio.run(scenario())
+
+    assert replaces == [path]
+    assert json.loads(path.read_text(encoding="utf-8")) == {"run_concurrency": 9, "login": "operator"}
+
+
+def test_write_is_atomic(tmp_path, monkeypatch):
+    path = tmp_path / "config.json"
+    store = SettingsStore(path)
+    store.set(LOGIN, "first")  # вне цикла событий — запись сразу
+
+    def broken_fsync(fd):
+        raise OSError("диск отвалился")
+
+    monkeypatch.setattr(core.settings.os, "fsync", broken_fsync)
+    with pytest.raises(OSError):
+        store.set(LOGIN, "second")
+
+    # прежний файл цел — незаконченная запись осталась во временном файле
+    assert json.loads(path.read_text(encoding="utf-8")) == {"login": "first"}
+    assert SettingsStore(path).get(LOGIN) == "first"
+
+
+def test_flush_leaves_no_temp_file(tmp_path):
+    path = tmp_path / "config.json"
+    SettingsStore(path).set(LOGIN, "operator")
+
+    assert [p.name for p in tmp_path.iterdir()] == ["config.json"]
+
+
+def test_legacy_path_is_migrated(tmp_path, monkeypatch):
+    legacy = tmp_path / "templates\\config.json"
+    legacy.write_text(json.dumps({"login": "old", "remember": True}), encoding="utf-8")
+    monkeypatch.setattr(core.settings, "LEGACY_CONFIG_PATH", legacy)
+
+    path = tmp_path / "templates" / "config.json"
+    path.parent.mkdir()
+    store = SettingsStore(path)
+
+    assert store.get(LOGIN) == "old"
+    assert path.exists() and not legacy.exists()
+
+
+def test_types_and_subscribers(tmp_path):
+    store = SettingsStore(tmp_path / "config.json")
+    seen = []
+    unsubscribe = store.subscribe(RUN_CONCURRENCY, lambda key, value: seen.append((key, value)))
+
+    store.set(RUN_CONCURRENCY, "6")
+    assert store.get(RUN_CONCURRENCY) == 6
+    store.set(RUN_CONCURRENCY, "не число")
+    assert store.get(RUN_CONCURRENCY) == RUN_CONCURRENCY.default
+    assert store.get(Setting("missing", int, 7)) == 7
+
+    unsubscribe()
+    store.set(RUN_CONCURRENCY, 8)
+    assert seen == [("run_concurrency", "6"), ("run_concurrency", "не число")]
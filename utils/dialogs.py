@@ -0,0 +1,86 @@
+import asyncio
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QDialog, QMessageBox
+
+# exec() запускает вложенный цикл событий прямо внутри цикла qasync: пока
+# открыт модальный диалог, фоновые задачи то стоят, то входят повторно.
+# Здесь всё построено на open() + сигнале finished — корутина просто ждёт результат.
+
+
+def dialog_result(dlg: QDialog) -> asyncio.Future:
+    """Открыть диалог (open(), окно-модально) и вернуть future с кодом результата."""
+    future = asyncio.get_running_loop().create_future()
+
+    def on_finished(result: int):
+        if not future.done():
+            future.set_result(result)
+
+    dlg.finished.connect(on_finished)
+    dlg.open()
+    return future
+
+
+async def exec_async(dlg: QDialog) -> int:
+    """Замена dlg.exec() для корутин: QDialog.Accepted / QDialog.Rejected."""
+    try:
+        return await dialog_result(dlg)
+    except asyncio.CancelledError:
+        # ожидающую задачу отменили — диалог без хозяина не оставляем
+        dlg.reject()
+        raise
+
+
+def _message_box(parent, icon, title: str, text: str, buttons, box_class) -> QMessageBox:
+    box = box_class(parent)
+    box.setIcon(icon)
+    box.setWindowTitle(title)
+    box.setText(text)
+    box.setStandardButtons(buttons)
+    box.setAttribute(Qt.WA_DeleteOnClose)
+    return box
+
+
+async def ask(parent, title: str, text: str,
+              buttons=QMessageBox.Yes | QMessageBox.No,
+              default=QMessageBox.No,
+              box_class=QMessageBox) -> QMessageBox.StandardButton:
+    """Неблокирующий аналог QMessageBox.question."""
+    box = _message_box(parent, QMessageBox.Question, title, text, buttons, box_class)
+    box.setDefaultButton(default)
+
+    # ответ запоминаем в момент нажатия: после finished коробка с WA_DeleteOnClose
+    # уже стоит в очереди на удаление, а корутина продолжится позже
+    answer = QMessageBox.NoButton
+
+    def on_clicked(button):
+        nonlocal answer
+        answer = box.standardButton(button)
+
+    box.buttonClicked.connect(on_clicked)
+    await exec_async(box)
+    return answer
+
+
+async def message(parent, title: str, text: str, icon=QMessageBox.Information, box_class=QMessageBox):
+    """Показать сообщение и дождаться, пока его закроют (например, перед выходом)."""
+    await exec_async(_message_box(parent, icon, title, text, QMessageBox.Ok, box_class))
+
+
+def show_message(parent, title: str, text: str, icon=QMessageBox.Information, box_class=QMessageBox) -> QMessageBox:
+    """Показать сообщение и сразу вернуть управление — ждать закрытия не нужно."""
+    box = _message_box(parent, icon, title, text, QMessageBox.Ok, box_class)
+    box.open()
+    return box
+
+
+def show_information(parent, title: str, text: str, **kw) -> QMessageBox:
+    return show_message(parent, title, text, QMessageBox.Information, **kw)
+
+
+def show_warning(parent, title: str, text: str, **kw) -> QMessageBox:
+    return show_message(parent, title, text, QMessageBox.Warning, **kw)
+
+
+def show_critical(parent, title: str, text: str, **kw) -> QMessageBox:
+    return show_message(parent, title, text, QMessageBox.Critical, **kw)
@@ -0,0 +1,70 @@
+import re
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlsplit
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "templates" / "fixtures" / "wildberries"
+
+# URL сайта -> страница-фикстура. Страницы написаны вручную: это не снятые копии
+# сайта, а минимальная разметка с теми же селекторами (core/scenario.py SELECTORS),
+# поэтому при смене вёрстки сайта их нужно править вместе с селекторами.
+ROUTES = [
+    (re.compile(r"^/$"), "index.html"),
+    (re.compile(r"^/catalog/0/search\.aspx$"), "search.html"),
+    (re.compile(r"^/catalog/\d+/detail\.aspx$"), "detail.html"),
+    (re.compile(r"^/lk/myorders/delivery$"), "orders.html"),
+]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    fixtures_dir = FIXTURES_DIR
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        for pattern, name in ROUTES:
+            if pattern.match(path):
+                body = (self.fixtures_dir / name).read_bytes()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+        self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """
+    Локальный HTTP-сервер со страницами-фикстурами — для прогона
+    сценариев без сети: Scenario(..., base_url=server.base_url).
+    """
+
+    def __init__(self, fixtures_dir: Path = FIXTURES_DIR, host: str = "127.0.0.1", port: int = 0):
+        handler = type("FixtureHandler", (_Handler,), {"fixtures_dir": Path(fixtures_dir)})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -1,16 +1,106 @@
+import asyncio
 import os
 import random
+import sqlite3
+import threading
+from pathlib import Path
 
-def random_ua(path="templates/files/user_agents.txt"):
-    """Генератор бесконечно выдаёт user-agent'ы."""
-    with open(os.path.join(os.getcwd(), path), "r", encoding="utf-8") as f:
-        user_agents = [line.strip() for line in f if line.strip()]
+UA_PATH = Path(os.getcwd()) / "templates" / "files" / "user_agents.txt"
+UA_STATE_PATH = Path(os.getcwd()) / "templates" / "ua_ring.sqlite3"
 
-    while True:
-        random.shuffle(user_agents)
 
-        for ua in user_agents:
-            yield ua
+class UASampler:
+    """
+    Выдача user-agent'ов из перемешанного кольца: за один цикл ни один UA
+    не повторяется. Позиция в кольце хранится в SQLite, поэтому несколько
+    процессов (и перезапуски) продолжают один и тот же цикл.
+    """
 
-def random_viewport():
-    return {"width": random.randint(1200, 1366), "height": random.randint(720, 900)}
+    def __init__(self, path: Path = UA_PATH, state_path: Path = UA_STATE_PATH):
+        with open(path, "r", encoding="utf-8") as f:
+            # dict.fromkeys убирает дубликаты, сохраняя порядок
+            self.agents = list(dict.fromkeys(line.strip() for line in f if line.strip()))
+
+        self._lock = threading.Lock()
+        self._ring_seed: int | None = None
+        self._ring: list[str] = []
+
+        self._db = sqlite3.connect(state_path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._db.execute("CREATE TABLE IF NOT EXISTS ua_ring (id INTEGER PRIMARY KEY, seed INTEGER, pos INTEGER)")
+        self._db.execute(
+            "INSERT OR IGNORE INTO ua_ring VALUES (1, ?, 0)", (random.SystemRandom().randrange(2 ** 31),)
+        )
+
+    def _ring_for(self, seed: int) -> list[str]:
+        """Перестановка для цикла; считается один раз на цикл, дальше выдача O(1)."""
+        if seed != self._ring_seed:
+            ring = list(self.agents)
+            random.Random(seed).shuffle(ring)
+            self._ring, self._ring_seed = ring, seed
+        return self._ring
+
+    # Методы ниже синхронные и под конкуренцией процессов ждут блокировку SQLite
+    # до timeout; из цикла событий их вызывают через *_async (asyncio.to_thread).
+
+    def draw(self) -> str:
+        return self.draw_excluding(())
+
+    def draw_excluding(self, used) -> str:
+        """
+        Следующий UA из кольца, которого нет в used; пропущенные тоже считаются выданными.
+        Всё одной транзакцией. Если свободных нет — просто следующий (повтор разрешён).
+        """
+        if not self.agents:
+            return ""
+
+        with self._lock:
+            # BEGIN IMMEDIATE — другие процессы ждут, пока мы сдвигаем курсор
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                seed, pos = self._db.execute("SELECT seed, pos FROM ua_ring WHERE id = 1").fetchone()
+                first = None
+                # за один цикл кольцо выдаёт каждый UA ровно раз — хватит одного прохода
+                for _ in range(len(self.agents)):
+                    if pos >= len(self.agents):
+                        # цикл закончился — новое перемешивание
+                        seed, pos = seed + 1, 0
+                    ua = self._ring_for(seed)[pos]
+                    pos += 1
+                    if first is None:
+                        first = (ua, seed, pos)
+                    if ua not in used:
+                        break
+                else:
+                    ua, seed, pos = first
+
+                self._db.execute("UPDATE ua_ring SET seed = ?, pos = ? WHERE id = 1", (seed, pos))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+            return ua
+
+    async def draw_async(self) -> str:
+        return await asyncio.to_thread(self.draw)
+
+    async def draw_excluding_async(self, used) -> str:
+        return await asyncio.to_thread(self.draw_excluding, used)
+
+    async def for_account(self, stored: str | None) -> str:
+        """UA аккаунта: сохранённый в Account.user_agent, иначе следующий из кольца."""
+        return stored or await self.draw_async()
+
+
+_sampler: UASampler | None = None
+
+
+def get_ua_sampler() -> UASampler:
+    global _sampler
+    if _sampler is None:
+        _sampler = UASampler()
+    return _sampler
+
+
+def random_ua() -> str:
+    return get_ua_sampler().draw()